@@ -0,0 +1,9 @@
+"""
+Reproducible benchmarks of the automation's hot paths.
+
+Each module runs on synthetic data or the saved pages in tests/fixtures,
+needs no browser, OpenAI key or network, and prints one JSON line per
+measurement. Run them from the project root:
+
+    python -m benchmarks.page_text
+"""
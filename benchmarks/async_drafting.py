@@ -0,0 +1,52 @@
+"""
+Emails drafted per second by generate_personal_emails at growing
+concurrency, on a fake chat model with a fixed latency per LLM call.
+
+    python -m benchmarks.async_drafting
+"""
+import time
+
+from benchmarks.common import report
+from benchmarks.common import temp_database
+from src.agents import email_writer
+from src.agents import linkedin_info
+from src.agents import subject_writer
+from src.agents.main import generate_personal_emails
+from tests.conftest import PageChatModel
+
+# Seconds per LLM call; each email takes three calls
+CALL_SECONDS = 0.05
+PAGES = 32
+CONCURRENCY = [1, 4, 8]
+
+
+def main():
+    model = PageChatModel(seconds=CALL_SECONDS)
+    for module in [email_writer, linkedin_info, subject_writer]:
+        module.get_llm = lambda: model
+
+    with temp_database():
+        for concurrency in CONCURRENCY:
+            pages = [
+                f"<page {concurrency}-{index}>" for index in range(PAGES)
+            ]
+            started = time.perf_counter()
+            results = generate_personal_emails(
+                pages, max_concurrency=concurrency, use_cache=False,
+            )
+            seconds = time.perf_counter() - started
+            failed = [
+                result for result in results if isinstance(result, Exception)
+            ]
+            report(
+                'async_drafting',
+                concurrency=concurrency,
+                emails=PAGES,
+                call_seconds=CALL_SECONDS,
+                failed=len(failed),
+                emails_per_sec=round(PAGES / seconds, 2),
+            )
+
+
+if __name__ == '__main__':
+    main()
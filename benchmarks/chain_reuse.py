@@ -0,0 +1,84 @@
+"""
+What each agent call spends outside the LLM when its chain is rebuilt per
+call, as the agents used to, against reusing the chain compiled once. The
+chat model is a PageChatModel answering at once, so the timings are the
+chains' own overhead.
+
+Also what building the shared ChatOpenAI client costs; each agent module
+used to build its own at import.
+
+    python -m benchmarks.chain_reuse
+"""
+from benchmarks.common import best_of
+from benchmarks.common import report
+from benchmarks.common import temp_database
+from src.agents import email_writer
+from src.agents import linkedin_info
+from src.agents import llm
+from src.agents import single_shot
+from src.agents import subject_writer
+from src.agents.email_writer import generate_email
+from src.agents.linkedin_info import generate_page_summary
+from src.agents.single_shot import generate_personal_email_single_shot
+from src.agents.subject_writer import generate_subject
+from tests.conftest import clear_chains
+from tests.conftest import PageChatModel
+
+CALLS = 200
+PAGE = 'Name:\nJane Doe\nTitle:\nCTO at Example'
+
+AGENTS = {
+    'page_summary': lambda: generate_page_summary(PAGE, use_cache=False),
+    'email': lambda: generate_email(PAGE, use_cache=False),
+    'subject': lambda: generate_subject(PAGE, use_cache=False),
+    'single_shot': lambda: generate_personal_email_single_shot(
+        PAGE, use_cache=False,
+    ),
+}
+
+
+def rebuilt(call):
+    """`call` with its chain compiled again, as every call used to."""
+    def call_with_new_chain():
+        clear_chains()
+        return call()
+    return call_with_new_chain
+
+
+def calls(call):
+    for _ in range(CALLS):
+        call()
+
+
+def main():
+    model = PageChatModel()
+    for module in [email_writer, linkedin_info, single_shot, subject_writer]:
+        module.get_llm = lambda: model
+
+    with temp_database():
+        for agent, call in AGENTS.items():
+            rebuilt_ms, reused_ms = (
+                best_of(lambda: calls(func), 3) / CALLS * 1000
+                for func in [rebuilt(call), call]
+            )
+            report(
+                'chain_reuse',
+                agent=agent,
+                calls=CALLS,
+                rebuilt_ms_per_call=round(rebuilt_ms, 3),
+                reused_ms_per_call=round(reused_ms, 3),
+            )
+    clear_chains()
+
+    report(
+        'chain_reuse',
+        step='build ChatOpenAI',
+        ms=round(best_of(llm.get_llm.__wrapped__) * 1000, 2),
+        # One per agent module before, shared now
+        clients_before=len(AGENTS),
+        clients_now=1,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Cold start of the desktop app, each sample in a new interpreter.
+
+'window' runs src/main.py --startup-report, which src/utils/startup.py
+times from process launch to the first painted window and RSS once idle.
+It needs a display, and is skipped without one.
+
+'import' times importing the main window module the way main() does, as
+the app loads it now and with the automation stacks imported up front as
+the Home page used to, along with the heavy modules loaded at the end.
+
+The app runs from a copy of src/ in a temporary directory, so its logs
+and database stay there.
+
+    python -m benchmarks.cold_start
+"""
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import report
+from src.utils.startup import HEAVY_MODULES
+
+ROOT = Path(__file__).parents[1]
+RUNS = 5
+
+IMPORT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from src.ui.main_window import LinkedInAutomationApp
+for name in sys.argv[1:]:
+    __import__(name)
+seconds = time.perf_counter() - started
+import psutil
+from src.utils.startup import get_loaded_heavy_modules
+print(json.dumps({
+    'seconds': seconds,
+    'rss_mb': psutil.Process().memory_info().rss / 2 ** 20,
+    'heavy_modules': get_loaded_heavy_modules(),
+}))
+"""
+
+
+def has_display() -> bool:
+    return sys.platform in ('win32', 'darwin') or bool(
+        os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'),
+    )
+
+
+def run(app_path, *args) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=app_path,
+        env={**os.environ, 'PYTHONPATH': str(app_path)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def import_sample(app_path, eager_modules) -> dict:
+    output = run(app_path, '-c', IMPORT_SCRIPT, *eager_modules).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def window_sample(app_path) -> dict:
+    run(app_path, str(app_path / 'src' / 'main.py'), '--startup-report')
+    lines = (app_path / 'logs' / 'startup.jsonl').read_text().splitlines()
+    return json.loads(lines[-1])
+
+
+def median(samples, key, digits=3):
+    return round(statistics.median(sample[key] for sample in samples), digits)
+
+
+def main():
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as path:
+        app_path = Path(path)
+        shutil.copytree(
+            ROOT / 'src', app_path / 'src',
+            ignore=shutil.ignore_patterns('__pycache__'),
+        )
+        # The first start compiles the copy's bytecode
+        import_sample(app_path, HEAVY_MODULES)
+
+        for mode, eager_modules in [
+            ('lazy', ()),
+            ('eager', HEAVY_MODULES),
+        ]:
+            samples = [
+                import_sample(app_path, eager_modules) for _ in range(RUNS)
+            ]
+            report(
+                'cold_start',
+                step='import',
+                mode=mode,
+                runs=RUNS,
+                seconds=median(samples, 'seconds'),
+                rss_mb=median(samples, 'rss_mb', 1),
+                heavy_modules=samples[-1]['heavy_modules'],
+            )
+
+        if not has_display():
+            report('cold_start', step='window', skipped='no display')
+            return
+        samples = [window_sample(app_path) for _ in range(RUNS)]
+        report(
+            'cold_start',
+            step='window',
+            runs=RUNS,
+            first_window_seconds=median(samples, 'first_window_seconds'),
+            idle_rss_mb=median(samples, 'idle_rss_mb', 1),
+            heavy_modules=samples[-1]['heavy_modules'],
+        )
+
+
+if __name__ == '__main__':
+    main()
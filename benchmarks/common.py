@@ -0,0 +1,98 @@
+import json
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from pathlib import Path
+
+from src.database.connection import database
+from src.database.migrations import initial_schema
+from src.database.migrations import migrate
+
+FIXTURES = Path(__file__).parents[1] / 'tests' / 'fixtures'
+
+STATUSES = ['Sent'] * 8 + ['Failed', 'Skipped']
+
+
+def best_of(func, repeat: int = 5) -> float:
+    """Fastest of `repeat` runs of `func()`, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def peak_memory_mb(func) -> float:
+    """Peak memory Python allocated while running `func()`, in MB."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def report(benchmark: str, **result):
+    print(json.dumps({'benchmark': benchmark, **result}))
+
+
+@contextmanager
+def temp_database():
+    """
+    Point the app's database at a new, migrated run_history.db in a
+    temporary directory. Use it before anything opens the database.
+    """
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as path:
+        database.db_path = str(Path(path) / 'run_history.db')
+        database.submit(migrate).result()
+        try:
+            yield database
+        finally:
+            database.flush()
+
+
+def build_history(path, emails, emails_per_run, days=365, text_size=50):
+    """
+    A run_history.db from before migrations, holding `emails` emails of
+    about `text_size` characters spread over the last `days` days, in runs
+    of `emails_per_run`.
+    """
+    now = datetime.now(timezone.utc)
+    step = timedelta(days=days) / emails
+    filler = 'We are hiring engineers like you. ' * (text_size // 34 + 1)
+
+    def timestamp(index):
+        return (now - (emails - index) * step).strftime('%Y-%m-%d %H:%M:%S')
+
+    connection = sqlite3.connect(path)
+    initial_schema(connection)
+    connection.executemany(
+        'INSERT INTO runs (run_id, timestamp, file_name, status) '
+        "VALUES (?, ?, ?, 'Completed')",
+        (
+            (run_id, timestamp((run_id - 1) * emails_per_run), 'leads.csv')
+            for run_id in range(1, -(-emails // emails_per_run) + 1)
+        ),
+    )
+    connection.executemany(
+        'INSERT INTO emails (run_id, linkedin_profile_url, email_text, '
+        'email_status, timestamp) VALUES (?, ?, ?, ?, ?)',
+        (
+            (
+                index // emails_per_run + 1,
+                f"https://www.linkedin.com/in/lead-{index}",
+                f"Hi lead {index}. {filler}"[:text_size],
+                STATUSES[index % len(STATUSES)],
+                timestamp(index),
+            )
+            for index in range(emails)
+        ),
+    )
+    connection.commit()
+    connection.close()
@@ -0,0 +1,185 @@
+"""
+Email logging throughput, and how the UI's reads and writes fare while a
+run logs emails.
+
+'connect_per_write' is how emails used to be logged: a new connection,
+an insert and a commit per email, in SQLite's default rollback journal
+mode. 'queued' is log_email on the shared WAL-mode database, whose writer
+thread commits queued writes in batches.
+
+UI latency is measured on the main thread while a background thread logs
+emails as fast as it can: reading the first history page of the run, and
+logging one email, as the Tk thread does.
+
+    python -m benchmarks.database
+"""
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.common import report
+from benchmarks.common import temp_database
+from src.database.handlers import fetch_emails_page
+from src.database.handlers import HISTORY_PAGE_SIZE
+from src.database.handlers import log_email
+from src.database.handlers import log_run_start
+from src.database.migrations import initial_schema
+
+EMAILS = 2000
+UI_SAMPLES = 50
+# Time between two UI actions, like Tk callbacks
+UI_INTERVAL = 0.005
+
+INSERT_QUERY = """
+INSERT INTO emails (run_id, linkedin_profile_url, email_text, email_status)
+VALUES (?, ?, ?, 'Sent')
+"""
+PAGE_QUERY = """
+SELECT email_id, run_id, linkedin_profile_url, email_status, error_message,
+    timestamp
+FROM emails
+WHERE run_id = ?
+ORDER BY timestamp DESC, email_id DESC LIMIT ?
+"""
+
+
+class ConnectPerWrite:
+    """The database calls as they were before the shared writer."""
+
+    def __init__(self, path):
+        self.path = path
+        with sqlite3.connect(path) as connection:
+            initial_schema(connection)
+            self.run_id = connection.execute(
+                "INSERT INTO runs (file_name, status) VALUES ('leads.csv', "
+                "'Running')",
+            ).lastrowid
+        connection.close()
+
+    def log(self, index):
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute(
+            INSERT_QUERY, (self.run_id, profile_url(index), email_text()),
+        )
+        connection.commit()
+        connection.close()
+
+    def flush(self):
+        pass
+
+    def read_page(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        rows = connection.execute(
+            PAGE_QUERY, (self.run_id, HISTORY_PAGE_SIZE),
+        ).fetchall()
+        connection.close()
+        return rows
+
+
+class Queued:
+    """log_email and the history page's reads on the shared database."""
+
+    def __init__(self, database):
+        self.database = database
+        self.run_id = log_run_start('leads.csv')
+
+    def log(self, index):
+        log_email(
+            run_id=self.run_id,
+            linkedin_profile_url=profile_url(index),
+            email_text=email_text(),
+            email_status='Sent',
+        )
+
+    def flush(self):
+        self.database.flush()
+
+    def read_page(self):
+        return fetch_emails_page(self.run_id)
+
+
+def profile_url(index):
+    return f"https://www.linkedin.com/in/lead-{index}"
+
+
+def email_text():
+    return 'Hi, we are hiring engineers like you. ' * 20
+
+
+def inserts_per_sec(backend):
+    started = time.perf_counter()
+    for index in range(EMAILS):
+        backend.log(index)
+    backend.flush()
+    return EMAILS / (time.perf_counter() - started)
+
+
+def ui_latency(backend):
+    """Milliseconds per UI read and write while emails are logged."""
+    stop = threading.Event()
+
+    def log_emails():
+        index = EMAILS
+        while not stop.is_set():
+            backend.log(index)
+            index += 1
+            # Keep the write queue from growing without bound
+            if index % 100 == 0:
+                backend.flush()
+
+    writer = threading.Thread(target=log_emails)
+    writer.start()
+    reads, writes = [], []
+    try:
+        for index in range(UI_SAMPLES):
+            started = time.perf_counter()
+            backend.read_page()
+            reads.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            backend.log(-index)
+            writes.append(time.perf_counter() - started)
+            time.sleep(UI_INTERVAL)
+    finally:
+        stop.set()
+        writer.join()
+    backend.flush()
+    return {
+        'read_ms_p50': percentile(reads, 50),
+        'read_ms_p95': percentile(reads, 95),
+        'write_ms_p50': percentile(writes, 50),
+        'write_ms_p95': percentile(writes, 95),
+    }
+
+
+def percentile(seconds, percent):
+    return round(
+        statistics.quantiles(seconds, n=100)[percent - 1] * 1000, 3,
+    )
+
+
+def main():
+    with (
+        tempfile.TemporaryDirectory() as path,
+        temp_database() as database,
+    ):
+        backends = {
+            'connect_per_write': ConnectPerWrite(
+                str(Path(path) / 'run_history.db'),
+            ),
+            'queued': Queued(database),
+        }
+        for mode, backend in backends.items():
+            report(
+                'database',
+                mode=mode,
+                emails=EMAILS,
+                inserts_per_sec=round(inserts_per_sec(backend)),
+                **ui_latency(backend),
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Cost of skipping profiles contacted by earlier runs, on a synthetic 1M-email
+history: what the contacted_profiles backfill takes, what iter_new_leads
+adds to streaming a 100k-lead CSV, and per-lead lookup times for checking
+the emails table directly, one primary-key lookup per lead, and the
+batched IN queries iter_new_leads runs.
+
+    python -m benchmarks.dedup
+"""
+import csv
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import best_of
+from benchmarks.common import build_history
+from benchmarks.common import report
+from src.database.checkpoints import normalize_profile_url
+from src.database.connection import database
+from src.database.contacts import get_cooldown_start
+from src.database.contacts import get_recently_contacted
+from src.database.migrations import migrate
+from src.inmail.leads import iter_leads
+from src.inmail.leads import iter_new_leads
+
+EMAILS = 1_000_000
+EMAILS_PER_RUN = 200
+LEADS = 100_000
+# Leads checked one query at a time
+SAMPLE = 1000
+SCAN_SAMPLE = 20
+
+
+def lead_url(index):
+    """Half the leads were emailed before, some under another spelling."""
+    if index % 2:
+        return f"https://www.linkedin.com/in/new-lead-{index}"
+    if index % 10 == 0:
+        return f"http://uk.linkedin.com/in/Lead-{index}/?trk=search"
+    return f"https://www.linkedin.com/in/lead-{index}"
+
+
+def write_leads(path):
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['Person Linkedin Url', 'Email'])
+        writer.writerows(
+            (lead_url(index), f"lead-{index}@example.com")
+            for index in range(LEADS)
+        )
+
+
+def stream_seconds(leads):
+    started = time.perf_counter()
+    count = sum(1 for _ in leads)
+    return count, time.perf_counter() - started
+
+
+def per_lead_ms(check, values):
+    started = time.perf_counter()
+    for value in values:
+        check(value)
+    return round((time.perf_counter() - started) / len(values) * 1000, 4)
+
+
+def main():
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as path:
+        database.db_path = str(Path(path) / 'run_history.db')
+        build_history(database.db_path, EMAILS, EMAILS_PER_RUN)
+        started = time.perf_counter()
+        database.submit(migrate).result()
+        report(
+            'dedup',
+            step='migrate and backfill',
+            emails=EMAILS,
+            contacted_profiles=database.query_one(
+                'SELECT COUNT(*) FROM contacted_profiles',
+            )[0],
+            seconds=round(time.perf_counter() - started, 1),
+        )
+
+        lead_file = Path(path) / 'leads.csv'
+        write_leads(lead_file)
+        for method, leads in [
+            ('iter_leads', lambda: iter_leads(lead_file)),
+            ('iter_new_leads', lambda: iter_new_leads(lead_file)),
+        ]:
+            kept, seconds = stream_seconds(leads())
+            report(
+                'dedup',
+                method=method,
+                leads=LEADS,
+                kept=kept,
+                seconds=round(seconds, 2),
+            )
+
+        urls = [lead_url(index) for index in range(SAMPLE)]
+        keys = [normalize_profile_url(url) for url in urls]
+        since = get_cooldown_start(365)
+        report(
+            'dedup',
+            step='per-lead lookup',
+            emails_scan_ms=per_lead_ms(
+                lambda url: database.query_one(
+                    'SELECT 1 FROM emails WHERE linkedin_profile_url = ? '
+                    "AND email_status = 'Sent' AND timestamp >= ? LIMIT 1",
+                    (url, since),
+                ),
+                urls[:SCAN_SAMPLE],
+            ),
+            primary_key_ms=per_lead_ms(
+                lambda key: get_recently_contacted([key]), keys,
+            ),
+            batched_ms=round(
+                best_of(lambda: get_recently_contacted(keys)) / SAMPLE
+                * 1000, 4,
+            ),
+            normalize_ms=round(
+                best_of(lambda: list(map(normalize_profile_url, urls)))
+                / SAMPLE * 1000, 4,
+            ),
+        )
+
+
+if __name__ == '__main__':
+    main()
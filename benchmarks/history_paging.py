@@ -0,0 +1,150 @@
+"""
+History page latency on a synthetic 500k-email database: loading whole
+tables as the page used to, against the keyset pages it now loads as the
+user scrolls, and OFFSET pages for comparison.
+
+    python -m benchmarks.history_paging
+"""
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import best_of
+from benchmarks.common import build_history
+from benchmarks.common import report
+from src.database.connection import database
+from src.database.handlers import fetch_emails_page
+from src.database.handlers import fetch_runs_page
+from src.database.handlers import get_email_text
+from src.database.handlers import HISTORY_PAGE_SIZE
+from src.database.migrations import migrate
+
+EMAILS = 500_000
+# Small runs make a long runs list; the last BIG_RUN emails are one run
+EMAILS_PER_RUN = 100
+BIG_RUN = 20_000
+TEXT_SIZE = 600
+
+RUNS_OFFSET_QUERY = """
+SELECT run_id, timestamp, file_name, status, error_message
+FROM runs
+ORDER BY timestamp DESC, run_id DESC LIMIT ? OFFSET ?
+"""
+EMAILS_OFFSET_QUERY = """
+SELECT
+    email_id, run_id, linkedin_profile_url, email_status, error_message,
+    timestamp
+FROM emails
+WHERE run_id = ?
+ORDER BY timestamp DESC, email_id DESC LIMIT ? OFFSET ?
+"""
+
+
+def page_cursors(fetch_page, cursor_of):
+    """The `after` cursor of every page, scrolling to the end."""
+    cursors = [None]
+    while rows := fetch_page(cursors[-1]):
+        cursors.append(cursor_of(rows[-1]))
+    # The last cursor is past the end
+    return cursors[:-1]
+
+
+def measure(operation, method, func, repeat=5):
+    rows = func()
+    report(
+        'history_paging',
+        operation=operation,
+        method=method,
+        rows=len(rows) if isinstance(rows, list) else 1,
+        ms=round(best_of(func, repeat=repeat) * 1000, 2),
+    )
+
+
+def main():
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as path:
+        database.db_path = str(Path(path) / 'run_history.db')
+        build_history(
+            database.db_path, EMAILS, EMAILS_PER_RUN, text_size=TEXT_SIZE,
+        )
+        database.submit(migrate).result()
+        big_run = database.query_one('SELECT MAX(run_id) FROM runs')[0]
+        database.write(
+            'UPDATE emails SET run_id = ? WHERE email_id > ?',
+            (big_run, EMAILS - BIG_RUN),
+        ).result()
+
+        def fetch_runs(after):
+            return fetch_runs_page(after=after)
+
+        def fetch_big_run(after):
+            return fetch_emails_page(big_run, after=after)
+
+        run_cursors = page_cursors(fetch_runs, lambda row: (row[1], row[0]))
+        email_cursors = page_cursors(
+            fetch_big_run, lambda row: (row[5], row[0]),
+        )
+        report(
+            'history_paging',
+            emails=EMAILS,
+            runs_pages=len(run_cursors),
+            big_run_pages=len(email_cursors),
+        )
+
+        measure(
+            'open history', 'whole table',
+            lambda: database.query(
+                'SELECT * FROM runs ORDER BY timestamp DESC',
+            ),
+        )
+        measure('open history', 'keyset page', fetch_runs_page)
+        measure(
+            'last runs page', 'offset',
+            lambda: database.query(
+                RUNS_OFFSET_QUERY,
+                (
+                    HISTORY_PAGE_SIZE,
+                    (len(run_cursors) - 1) * HISTORY_PAGE_SIZE,
+                ),
+            ),
+        )
+        measure(
+            'last runs page', 'keyset',
+            lambda: fetch_runs(run_cursors[-1]),
+        )
+
+        measure(
+            f"open a {BIG_RUN}-email run", 'whole run with text',
+            lambda: database.query(
+                'SELECT * FROM emails WHERE run_id = ? '
+                'ORDER BY timestamp DESC',
+                (big_run,),
+            ),
+            repeat=3,
+        )
+        measure(
+            f"open a {BIG_RUN}-email run", 'keyset page',
+            lambda: fetch_big_run(None),
+        )
+        measure(
+            'last emails page', 'offset',
+            lambda: database.query(
+                EMAILS_OFFSET_QUERY,
+                (
+                    big_run,
+                    HISTORY_PAGE_SIZE,
+                    (len(email_cursors) - 1) * HISTORY_PAGE_SIZE,
+                ),
+            ),
+        )
+        measure(
+            'last emails page', 'keyset',
+            lambda: fetch_big_run(email_cursors[-1]),
+        )
+        email_id = database.query_one('SELECT MAX(email_id) FROM emails')[0]
+        measure(
+            'show an email', 'text on selection',
+            lambda: get_email_text(email_id),
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Parse time and peak memory of getting the <main> tags of a profile page:
+a full html.parser tree, as the app used to build, against lxml and
+html.parser restricted to <main> with a SoupStrainer.
+
+Peak memory is what Python allocated, i.e. the BeautifulSoup tree; lxml's
+own C buffers are not counted.
+
+    python -m benchmarks.html_parsing
+"""
+from bs4 import BeautifulSoup
+
+from benchmarks.common import best_of
+from benchmarks.common import FIXTURES
+from benchmarks.common import peak_memory_mb
+from benchmarks.common import report
+from src.inmail.html_parsing import parse_main_tags
+from src.utils.latency import build_simulated_page
+
+
+def full_tree(page_source):
+    return BeautifulSoup(page_source, 'html.parser').find_all('main')
+
+
+VARIANTS = {
+    'html.parser full tree': full_tree,
+    'html.parser <main> only': lambda page_source: parse_main_tags(
+        page_source, parser='html.parser',
+    ),
+    'lxml <main> only': lambda page_source: parse_main_tags(
+        page_source, parser='lxml',
+    ),
+}
+
+
+def main():
+    pages = {
+        'profile_page.html': (FIXTURES / 'profile_page.html').read_text(
+            encoding='utf-8',
+        ),
+        'simulated': build_simulated_page(),
+    }
+    for name, page_source in pages.items():
+        for variant, parse in VARIANTS.items():
+            report(
+                'html_parsing',
+                page=name,
+                page_kb=round(len(page_source) / 1024, 1),
+                variant=variant,
+                parse_ms=round(best_of(lambda: parse(page_source)) * 1000, 2),
+                peak_mb=round(peak_memory_mb(lambda: parse(page_source)), 2),
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+What a day's chunk of leads costs to hold: pandas row Series, as the app
+used to pass around, against Lead records built from a LeadBatch. Also
+guessing missing emails row by row against the vectorized guess_emails.
+
+Memory is what Python allocated for the held rows, traced by tracemalloc.
+
+    python -m benchmarks.lead_records
+"""
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.common import best_of
+from benchmarks.common import report
+from src.inmail.leads import guess_emails
+from src.inmail.leads import LEAD_COLUMNS
+from src.inmail.leads import LeadBatch
+from tests.conftest import guess_email_per_row
+
+CHUNK = 10_000
+GUESSES = 100_000
+
+
+def lead_frame(rows, with_emails=True):
+    return pd.DataFrame(
+        {
+            'Person Linkedin Url': [
+                f"https://www.linkedin.com/in/lead-{index}"
+                for index in range(rows)
+            ],
+            'Email': [
+                f"lead-{index}@example.com" if with_emails else None
+                for index in range(rows)
+            ],
+            'First Name': [f"First{index}" for index in range(rows)],
+            'Last Name': [f"Last{index}" for index in range(rows)],
+            'Company': [f"Acme & Co {index % 500}" for index in range(rows)],
+        },
+        columns=list(LEAD_COLUMNS),
+    ).astype(object)
+
+
+def series_rows(frame):
+    return list(frame.iterrows())
+
+
+def lead_records(frame):
+    return list(LeadBatch.from_frame(frame))
+
+
+def held_bytes(func, frame):
+    """Memory still allocated by the rows `func(frame)` returns."""
+    tracemalloc.start()
+    try:
+        rows = func(frame)
+        held = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del rows
+    return held
+
+
+def main():
+    frame = lead_frame(CHUNK)
+    for method, func in [
+        ('pandas Series', series_rows),
+        ('Lead', lead_records),
+    ]:
+        held = held_bytes(func, frame)
+        report(
+            'lead_records',
+            method=method,
+            rows=CHUNK,
+            held_mb=round(held / 2 ** 20, 2),
+            bytes_per_row=round(held / CHUNK),
+            build_ms=round(best_of(lambda: func(frame), 3) * 1000, 1),
+        )
+
+    frame = lead_frame(GUESSES, with_emails=False)
+    report(
+        'lead_records',
+        step='guess emails',
+        rows=GUESSES,
+        per_row_ms=round(
+            best_of(
+                lambda: [
+                    guess_email_per_row(row) for _, row in frame.iterrows()
+                ],
+                3,
+            ) * 1000,
+        ),
+        vectorized_ms=round(
+            best_of(lambda: guess_emails(frame.astype('string')), 3) * 1000,
+        ),
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Reading a large lead CSV: loading the whole export with pandas and walking
+its rows, as the app used to, against streaming only the lead columns in
+chunks with iter_leads.
+
+The file is a synthetic 100k-row export with 46 columns, like Apollo's.
+Peak memory is what Python allocated, traced by tracemalloc.
+
+    python -m benchmarks.lead_streaming
+"""
+import csv
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.common import best_of
+from benchmarks.common import peak_memory_mb
+from benchmarks.common import report
+from src.inmail.leads import iter_leads
+from src.inmail.leads import LEAD_COLUMNS
+from src.inmail.leads import validate_lead_columns
+
+ROWS = 100_000
+EXTRA_COLUMNS = 46 - len(LEAD_COLUMNS)
+
+
+def write_export(path):
+    columns = list(LEAD_COLUMNS) + [
+        f"Extra {index}" for index in range(EXTRA_COLUMNS)
+    ]
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        for index in range(ROWS):
+            lead = [
+                f"https://www.linkedin.com/in/lead-{index}",
+                # Every tenth email is missing and guessed
+                '' if index % 10 == 0 else f"lead-{index}@example.com",
+                f"First{index}",
+                f"Last{index}",
+                f"Company {index % 500}",
+            ]
+            writer.writerow(
+                lead + [f"value {index}"] * EXTRA_COLUMNS,
+            )
+
+
+def read_whole_file(path):
+    """The file as the app used to load and iterate it."""
+    for _, row in pd.read_csv(path).iterrows():
+        row['Person Linkedin Url']
+
+
+def stream_leads(path):
+    for lead in iter_leads(path):
+        lead.linkedin_url
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'leads.csv'
+        write_export(path)
+        report(
+            'lead_streaming',
+            rows=ROWS,
+            columns=len(LEAD_COLUMNS) + EXTRA_COLUMNS,
+            file_mb=round(path.stat().st_size / 2 ** 20, 1),
+        )
+        report(
+            'lead_streaming',
+            step='open file',
+            read_csv_s=round(best_of(lambda: pd.read_csv(path), 3), 2),
+            header_only_s=round(
+                best_of(lambda: validate_lead_columns(path), 3), 4,
+            ),
+        )
+        for method, func, first_lead in [
+            (
+                'read_csv + iterrows', read_whole_file,
+                lambda: next(pd.read_csv(path).iterrows()),
+            ),
+            (
+                'iter_leads', stream_leads,
+                lambda: next(iter_leads(path)),
+            ),
+        ]:
+            report(
+                'lead_streaming',
+                method=method,
+                first_lead_s=round(best_of(first_lead, 1), 3),
+                full_pass_s=round(best_of(lambda: func(path), 1), 2),
+                peak_mb=round(peak_memory_mb(lambda: func(path)), 1),
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+History query times on a synthetic 1M-email database before and after the
+schema migrations, with the plan SQLite picks for each query.
+
+'before' runs the queries the app used to run on the unindexed tables of
+a database that predates migrations; 'after' migrates the same file and
+runs the queries the app runs now.
+
+    python -m benchmarks.migrations
+"""
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import best_of
+from benchmarks.common import build_history
+from benchmarks.common import report
+from src.database.connection import database
+from src.database.handlers import fetch_emails_page
+from src.database.handlers import fetch_runs_page
+from src.database.handlers import get_quota_state
+from src.database.migrations import migrate
+
+EMAILS = 1_000_000
+EMAILS_PER_RUN = 200
+DAYS = 365
+# A run halfway through the history
+RUN_ID = EMAILS // EMAILS_PER_RUN // 2
+
+BEFORE = {
+    'runs': ('SELECT * FROM runs ORDER BY timestamp DESC', ()),
+    'emails of a run': (
+        'SELECT * FROM emails WHERE run_id = ? ORDER BY timestamp DESC',
+        (RUN_ID,),
+    ),
+    'sent today': (
+        "SELECT COUNT(*) FROM emails "
+        "WHERE DATE(timestamp) = DATE('now', 'localtime')",
+        (),
+    ),
+}
+AFTER = {
+    'runs': fetch_runs_page,
+    'emails of a run': lambda: fetch_emails_page(RUN_ID),
+    'sent today': get_quota_state,
+}
+
+
+def query_plan(connection, sql, params=()):
+    return '; '.join(
+        row[-1]
+        for row in connection.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+    )
+
+
+def traced_statements(func):
+    """The SELECT statements `func` runs on the database's readers."""
+    statements = []
+    with database.reader() as connection:
+        # The pool hands this reader out again next
+        connection.set_trace_callback(statements.append)
+    try:
+        func()
+    finally:
+        with database.reader() as connection:
+            connection.set_trace_callback(None)
+    return [
+        statement for statement in statements
+        if statement.lstrip().upper().startswith('SELECT')
+    ]
+
+
+def main():
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as path:
+        db_path = str(Path(path) / 'run_history.db')
+        started = time.perf_counter()
+        build_history(db_path, EMAILS, EMAILS_PER_RUN, days=DAYS)
+        report(
+            'migrations',
+            step='build history',
+            emails=EMAILS,
+            seconds=round(time.perf_counter() - started, 1),
+        )
+
+        connection = sqlite3.connect(db_path)
+        for name, (sql, params) in BEFORE.items():
+            report(
+                'migrations',
+                query=name,
+                schema='before',
+                ms=round(
+                    best_of(
+                        lambda: connection.execute(sql, params).fetchall(),
+                        repeat=3,
+                    ) * 1000, 2,
+                ),
+                plan=query_plan(connection, sql, params),
+            )
+
+        database.db_path = db_path
+        started = time.perf_counter()
+        version = database.submit(migrate).result()
+        report(
+            'migrations',
+            step='migrate',
+            schema_version=version,
+            seconds=round(time.perf_counter() - started, 1),
+        )
+
+        connection.close()
+        for name, func in AFTER.items():
+            statements = traced_statements(func)
+            with database.reader() as reader:
+                plans = [query_plan(reader, sql) for sql in statements]
+            report(
+                'migrations',
+                query=name,
+                schema='after',
+                ms=round(best_of(func) * 1000, 2),
+                plan=' | '.join(plans),
+            )
+
+
+if __name__ == '__main__':
+    main()
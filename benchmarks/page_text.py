@@ -0,0 +1,61 @@
+"""
+Input tokens and parse time per profile page, whole <main> text against the
+trimmed profile sections.
+
+    python -m benchmarks.page_text
+"""
+from bs4 import BeautifulSoup
+
+from benchmarks.common import best_of
+from benchmarks.common import FIXTURES
+from benchmarks.common import report
+from src.inmail.html_parsing import parse_main_tags
+from src.inmail.page_text import estimate_tokens
+from src.inmail.page_text import extract_profile_text
+from src.utils.latency import build_simulated_page
+
+
+def whole_main_text(page_source):
+    """The text the summarizer used to get: every <main> tag, flattened."""
+    soup = BeautifulSoup(page_source, 'html.parser')
+    return '\n'.join(
+        main.get_text(separator=' ', strip=True)
+        for main in soup.find_all('main')
+    )
+
+
+def trimmed_text(page_source):
+    return extract_profile_text(parse_main_tags(page_source))
+
+
+def get_pages():
+    pages = {
+        path.name: path.read_text(encoding='utf-8')
+        for path in sorted(FIXTURES.glob('*.html'))
+    }
+    pages['simulated'] = build_simulated_page()
+    return pages
+
+
+def main():
+    for name, page_source in get_pages().items():
+        before = estimate_tokens(whole_main_text(page_source))
+        after = estimate_tokens(trimmed_text(page_source))
+        report(
+            'page_text',
+            page=name,
+            page_kb=round(len(page_source) / 1024, 1),
+            tokens_before=before,
+            tokens_after=after,
+            token_reduction=round(1 - after / before, 3),
+            parse_ms_before=round(
+                best_of(lambda: whole_main_text(page_source)) * 1000, 2,
+            ),
+            parse_ms_after=round(
+                best_of(lambda: trimmed_text(page_source)) * 1000, 2,
+            ),
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Email search on a synthetic 200k-email history: the FTS5 index against
+the LIKE scan used when SQLite has no FTS5, for rare and common words, a
+word still being typed and a profile URL. Also what the index's triggers
+cost each insert.
+
+    python -m benchmarks.search
+"""
+import random
+import string
+import time
+
+from benchmarks.common import best_of
+from benchmarks.common import report
+from benchmarks.common import temp_database
+from src.database.search import search_emails
+from src.database.search import search_emails_like
+
+EMAILS = 200_000
+INSERT_BATCH = 10_000
+WORDS_PER_EMAIL = 80
+# Skills and how often an email mentions them
+SKILLS = {
+    'python': 0.3,
+    'kubernetes': 0.05,
+    'kotlin': 0.005,
+    'haskell': 0.0005,
+}
+QUERIES = {
+    'rare word': 'haskell',
+    'common word': 'python',
+    'two words': 'python kubernetes',
+    'while typing': 'kotl',
+    'profile url': 'lead-123456',
+}
+
+INSERT_QUERY = """
+INSERT INTO emails (
+    run_id, linkedin_profile_url, email_text, subject, email_status
+) VALUES (1, ?, ?, ?, 'Sent')
+"""
+
+
+def build_emails(count, start=0, seed=0):
+    """Rows for INSERT_QUERY, from a vocabulary of made-up words."""
+    rng = random.Random(seed)
+    vocabulary = [
+        ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+        for _ in range(5000)
+    ]
+    for index in range(start, start + count):
+        words = rng.choices(vocabulary, k=WORDS_PER_EMAIL)
+        words += [
+            skill for skill, share in SKILLS.items() if rng.random() < share
+        ]
+        rng.shuffle(words)
+        yield (
+            f"https://www.linkedin.com/in/lead-{index}",
+            'Hi, ' + ' '.join(words),
+            f"Role for lead {index}",
+        )
+
+
+def insert_emails(database, count, start=0):
+    return database.submit(
+        lambda connection: connection.executemany(
+            INSERT_QUERY, build_emails(count, start),
+        ),
+    ).result()
+
+
+def insert_seconds(database, start):
+    started = time.perf_counter()
+    insert_emails(database, INSERT_BATCH, start)
+    return time.perf_counter() - started
+
+
+def main():
+    with temp_database() as database:
+        database.write(
+            "INSERT INTO runs (file_name, status) "
+            "VALUES ('leads.csv', 'Completed')",
+        )
+        started = time.perf_counter()
+        insert_emails(database, EMAILS)
+        report(
+            'search',
+            step='build indexed history',
+            emails=EMAILS,
+            seconds=round(time.perf_counter() - started, 1),
+        )
+
+        for name, text in QUERIES.items():
+            for method, func in [
+                ('fts5', search_emails),
+                ('like', search_emails_like),
+            ]:
+                report(
+                    'search',
+                    query=name,
+                    text=text,
+                    method=method,
+                    rows=len(func(text)),
+                    ms=round(best_of(lambda: func(text), repeat=3) * 1000, 2),
+                )
+
+        with_index = insert_seconds(database, EMAILS)
+        database.write('DROP TRIGGER emails_fts_insert').result()
+        without_index = insert_seconds(database, EMAILS + INSERT_BATCH)
+        report(
+            'search',
+            step='insert',
+            emails=INSERT_BATCH,
+            indexed_per_sec=round(INSERT_BATCH / with_index),
+            unindexed_per_sec=round(INSERT_BATCH / without_index),
+        )
+
+
+if __name__ == '__main__':
+    main()
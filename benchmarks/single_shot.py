@@ -0,0 +1,131 @@
+"""
+LLM calls, tokens and latency of drafting one email with the three-stage
+chain against the single structured call, replaying the responses in
+tests/fixtures/llm_responses.json for each saved page.
+
+Latency is modelled per call as FIRST_TOKEN_SECONDS plus the output tokens
+at OUTPUT_TOKENS_PER_SECOND, roughly gpt-4o-mini; the time the chains
+themselves take is measured.
+
+    python -m benchmarks.single_shot
+"""
+import json
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+from langchain_core.outputs import ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from benchmarks.common import best_of
+from benchmarks.common import FIXTURES
+from benchmarks.common import report
+from benchmarks.common import temp_database
+from src.agents import email_writer
+from src.agents import linkedin_info
+from src.agents import single_shot
+from src.agents import subject_writer
+from src.agents.main import generate_personal_email
+from src.inmail.page_text import estimate_tokens
+from src.inmail.personalized_email import extract_page_text
+
+FIRST_TOKEN_SECONDS = 0.5
+OUTPUT_TOKENS_PER_SECOND = 80
+
+# Which saved response each chain's system prompt asks for
+STAGES = {
+    linkedin_info.SYSTEM_PROMPT: 'summary',
+    email_writer.SYSTEM_PROMPT: 'body',
+    subject_writer.SYSTEM_PROMPT: 'subject',
+}
+
+
+class ReplayChatModel(FakeListChatModel):
+    """
+    Replies with the saved response for the chain that calls it and
+    records the (input, output) tokens of every call.
+    """
+
+    responses: list[str] = []
+    replies: dict[str, str] = {}
+    calls: list[tuple[int, int]] = []
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(
+            tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs,
+        )
+
+    def _generate(
+        self, messages, stop=None, run_manager=None, tools=None, **kwargs,
+    ):
+        prompt = '\n'.join(message.content for message in messages)
+        if tools:
+            # The function schema is sent along with the prompt
+            prompt += json.dumps(tools)
+            output = json.dumps(self.replies)
+            message = AIMessage(
+                content='',
+                tool_calls=[
+                    {
+                        'name': tools[0]['function']['name'],
+                        'args': self.replies,
+                        'id': 'call-1',
+                    },
+                ],
+            )
+        else:
+            output = self.replies[STAGES[messages[0].content]]
+            message = AIMessage(content=output)
+        self.calls.append((estimate_tokens(prompt), estimate_tokens(output)))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def modelled_seconds(calls):
+    return sum(
+        FIRST_TOKEN_SECONDS + output_tokens / OUTPUT_TOKENS_PER_SECOND
+        for _, output_tokens in calls
+    )
+
+
+def main():
+    responses = json.loads(
+        (FIXTURES / 'llm_responses.json').read_text(encoding='utf-8'),
+    )
+    model = ReplayChatModel()
+    for module in [email_writer, linkedin_info, single_shot, subject_writer]:
+        module.get_llm = lambda: model
+
+    with temp_database():
+        for page, replies in responses.items():
+            model.replies = replies
+            page_text = extract_page_text(
+                (FIXTURES / page).read_text(encoding='utf-8'),
+            )
+            for mode, is_single_shot in [
+                ('three_stage', False),
+                ('single_shot', True),
+            ]:
+                def draft():
+                    return generate_personal_email(
+                        page_text,
+                        use_cache=False,
+                        single_shot=is_single_shot,
+                    )
+
+                model.calls = []
+                draft()
+                calls = model.calls
+                report(
+                    'single_shot',
+                    page=page,
+                    mode=mode,
+                    llm_calls=len(calls),
+                    input_tokens=sum(tokens for tokens, _ in calls),
+                    output_tokens=sum(tokens for _, tokens in calls),
+                    modelled_seconds=round(modelled_seconds(calls), 2),
+                    chain_ms=round(best_of(draft) * 1000, 2),
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+
+from src.config import settings
+from src.database.connection import Database
+from src.database.connection import database
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """
+    Content-addressed cache of LLM chain outputs stored in run_history.db.
+
+    Entries are keyed by a hash of everything that determines the output
+    (model, prompts, input text), expire after `ttl` seconds and are evicted
+    least-recently-used first once the table holds more than `max_entries`.
+    Any database error is logged and treated as a miss so that the cache can
+    never break drafting. Async code uses `aget` and `aset`, which run the
+    database calls off the event loop.
+    """
+
+    def __init__(
+        self,
+        db: Database = database,
+        ttl: float = settings.LLM_CACHE_TTL_DAYS * 24 * 60 * 60,
+        max_entries: int = settings.LLM_CACHE_MAX_ENTRIES,
+    ):
+        self.db = db
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(str(part).encode('utf-8'))
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    def _count(self, chain: str, outcome: str):
+        with self._lock:
+            chain_stats = self.stats.setdefault(
+                chain, {'hits': 0, 'misses': 0},
+            )
+            chain_stats[outcome] += 1
+
+    def get(self, chain: str, key: str):
+        now = time.time()
+        try:
+            result = self.db.query_one(
+                'SELECT value, created_at FROM llm_cache WHERE cache_key = ?',
+                (key,),
+            )
+            if result and now - result[1] > self.ttl:
+                self.db.write(
+                    'DELETE FROM llm_cache WHERE cache_key = ?', (key,),
+                )
+                result = None
+            elif result:
+                self.db.write(
+                    'UPDATE llm_cache SET last_used_at = ? '
+                    'WHERE cache_key = ?',
+                    (now, key),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+            result = None
+
+        if result:
+            self._count(chain, 'hits')
+            logger.debug(f"LLM cache hit for {chain}.")
+            return result[0]
+        self._count(chain, 'misses')
+        return None
+
+    def set(self, chain: str, key: str, value: str):
+        now = time.time()
+
+        def store(connection):
+            connection.execute(
+                """
+                INSERT OR REPLACE INTO llm_cache (
+                    cache_key, chain, value, created_at, last_used_at
+                ) VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, chain, value, now, now),
+            )
+            self._evict(connection, now)
+
+        # Queued on the writer thread; a failure is logged there.
+        self.db.submit(store)
+
+    def _evict(self, connection, now):
+        connection.execute(
+            'DELETE FROM llm_cache WHERE created_at < ?',
+            (now - self.ttl,),
+        )
+        connection.execute(
+            """
+            DELETE FROM llm_cache WHERE cache_key IN (
+                SELECT cache_key FROM llm_cache
+                ORDER BY last_used_at DESC
+                LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        )
+
+    async def aget(self, chain: str, key: str):
+        return await asyncio.to_thread(self.get, chain, key)
+
+    async def aset(self, chain: str, key: str, value: str):
+        await asyncio.to_thread(self.set, chain, key, value)
+
+    def clear(self):
+        self.db.write('DELETE FROM llm_cache').result()
+
+
+llm_cache = LLMCache()
@@ -1,10 +1,12 @@
+from functools import lru_cache
+
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
-
-from src.config import settings
 
-llm = ChatOpenAI(model='gpt-4o-mini', api_key=settings.OPENAI_API_KEY)
+from src.agents.cache import llm_cache
+from src.agents.llm import CHAIN_CACHE_SIZE
+from src.agents.llm import get_llm
+from src.agents.llm import LLM_MODEL
 
 DEFAULT_EMAIL_INSTRUCTION = """
 Write an email to a prospective employer to introduce fitting candidates for their company based on the experience summary provided. A receiver profile will be given, so the email must be addressed directly to this person.
@@ -71,20 +73,71 @@ def generate_prompt_template(
     return prompt
 
 
+@lru_cache(maxsize=CHAIN_CACHE_SIZE)
+def get_email_chain(user_prompt: str, email_instructions: str):
+    """The email chain for a prompt pair, compiled once and reused."""
+    prompt = generate_prompt_template(
+        user_prompt=user_prompt,
+        email_instructions=email_instructions,
+    )
+    return prompt | get_llm() | StrOutputParser()
+
+
+def get_cache_key(
+    page_summary: str,
+    user_prompt: str,
+    email_instructions: str,
+) -> str:
+    return llm_cache.make_key(
+        LLM_MODEL,
+        SYSTEM_PROMPT,
+        email_instructions,
+        user_prompt,
+        page_summary,
+    )
+
+
 def generate_email(
     page_summary: str,
     user_prompt: str = DEFAULT_USER_PROMPT,
     email_instructions: str = DEFAULT_EMAIL_INSTRUCTION,
+    use_cache: bool = True,
 ) -> str:
-    prompt = generate_prompt_template(
-        user_prompt=user_prompt,
-        email_instructions=email_instructions,
-    )
-    email_chain = prompt | llm | StrOutputParser()
+    cache_key = get_cache_key(page_summary, user_prompt, email_instructions)
+    if use_cache:
+        email = llm_cache.get('email', cache_key)
+        if email is not None:
+            return email
+
+    email_chain = get_email_chain(user_prompt, email_instructions)
     email = email_chain.invoke(
         {
             'profile_summary': page_summary,
             'email_instructions': email_instructions,
         },
     )
+    llm_cache.set('email', cache_key, email)
+    return email
+
+
+async def agenerate_email(
+    page_summary: str,
+    user_prompt: str = DEFAULT_USER_PROMPT,
+    email_instructions: str = DEFAULT_EMAIL_INSTRUCTION,
+    use_cache: bool = True,
+) -> str:
+    cache_key = get_cache_key(page_summary, user_prompt, email_instructions)
+    if use_cache:
+        email = await llm_cache.aget('email', cache_key)
+        if email is not None:
+            return email
+
+    email_chain = get_email_chain(user_prompt, email_instructions)
+    email = await email_chain.ainvoke(
+        {
+            'profile_summary': page_summary,
+            'email_instructions': email_instructions,
+        },
+    )
+    await llm_cache.aset('email', cache_key, email)
     return email
@@ -1,10 +1,11 @@
+from functools import cache
+
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
-
-from src.config import settings
 
-llm = ChatOpenAI(model='gpt-4o-mini', api_key=settings.OPENAI_API_KEY)
+from src.agents.cache import llm_cache
+from src.agents.llm import get_llm
+from src.agents.llm import LLM_MODEL
 
 SYSTEM_PROMPT = """
 Transform the given LinkedIn page content into a concise professional description, focusing primarily on the technologies used. Ensure the specific technical details are highlighted while removing any unnecessary or irrelevant information. Do not include previous company names.
@@ -44,11 +45,48 @@ PROMPT_TEMPLATE = ChatPromptTemplate.from_messages(
 )
 
 
-def generate_page_summary(page_content: str) -> str:
-    page_summary_chain = PROMPT_TEMPLATE | llm | StrOutputParser()
+@cache
+def get_page_summary_chain():
+    """The page summary chain, compiled once and reused."""
+    return PROMPT_TEMPLATE | get_llm() | StrOutputParser()
+
+
+def get_cache_key(page_content: str) -> str:
+    return llm_cache.make_key(LLM_MODEL, SYSTEM_PROMPT, page_content)
+
+
+def generate_page_summary(page_content: str, use_cache: bool = True) -> str:
+    cache_key = get_cache_key(page_content)
+    if use_cache:
+        page_summary = llm_cache.get('page_summary', cache_key)
+        if page_summary is not None:
+            return page_summary
+
+    page_summary_chain = get_page_summary_chain()
     page_summary = page_summary_chain.invoke(
         {
             'page_content': page_content,
         },
     )
+    llm_cache.set('page_summary', cache_key, page_summary)
+    return page_summary
+
+
+async def agenerate_page_summary(
+    page_content: str,
+    use_cache: bool = True,
+) -> str:
+    cache_key = get_cache_key(page_content)
+    if use_cache:
+        page_summary = await llm_cache.aget('page_summary', cache_key)
+        if page_summary is not None:
+            return page_summary
+
+    page_summary_chain = get_page_summary_chain()
+    page_summary = await page_summary_chain.ainvoke(
+        {
+            'page_content': page_content,
+        },
+    )
+    await llm_cache.aset('page_summary', cache_key, page_summary)
     return page_summary
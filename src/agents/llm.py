@@ -0,0 +1,31 @@
+from functools import cache
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from src.config import settings
+
+LLM_MODEL = 'gpt-4o-mini'
+
+# Compiled chains kept per agent, one per distinct prompt configuration.
+CHAIN_CACHE_SIZE = 32
+
+
+@cache
+def get_llm() -> ChatOpenAI:
+    """
+    The chat model shared by every chain, so all LLM calls of the app go
+    through one pair of keep-alive HTTP connection pools.
+    """
+    limits = httpx.Limits(
+        max_connections=settings.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_MAX_CONNECTIONS,
+        keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(settings.LLM_REQUEST_TIMEOUT)
+    return ChatOpenAI(
+        model=LLM_MODEL,
+        api_key=settings.OPENAI_API_KEY,
+        http_client=httpx.Client(limits=limits, timeout=timeout),
+        http_async_client=httpx.AsyncClient(limits=limits, timeout=timeout),
+    )
@@ -1,14 +1,27 @@
+import asyncio
+import logging
+
+from src.agents.email_writer import agenerate_email
 from src.agents.email_writer import DEFAULT_EMAIL_INSTRUCTION
 from src.agents.email_writer import DEFAULT_USER_PROMPT
 from src.agents.email_writer import generate_email
+from src.agents.linkedin_info import agenerate_page_summary
 from src.agents.linkedin_info import generate_page_summary
+from src.agents.single_shot import agenerate_personal_email_single_shot
+from src.agents.single_shot import generate_personal_email_single_shot
+from src.agents.subject_writer import agenerate_subject
 from src.agents.subject_writer import generate_subject
+from src.config import settings
+
+logger = logging.getLogger(__name__)
 
 
 def generate_personal_email(
     page_summary: str,
     user_prompt: str = DEFAULT_USER_PROMPT,
     email_instructions: str = DEFAULT_EMAIL_INSTRUCTION,
+    use_cache: bool = True,
+    single_shot: bool = False,
 ) -> str:
     if not user_prompt:
         user_prompt = DEFAULT_USER_PROMPT
@@ -16,11 +29,129 @@ def generate_personal_email(
     if not email_instructions:
         email_instructions = DEFAULT_EMAIL_INSTRUCTION
 
-    page_summary = generate_page_summary(page_content=page_summary)
+    if single_shot:
+        personal_email = generate_personal_email_single_shot(
+            page_content=page_summary,
+            user_prompt=user_prompt,
+            email_instructions=email_instructions,
+            use_cache=use_cache,
+        )
+        return personal_email.body, personal_email.subject
+
+    page_summary = generate_page_summary(
+        page_content=page_summary,
+        use_cache=use_cache,
+    )
     email = generate_email(
         page_summary=page_summary,
         user_prompt=user_prompt,
         email_instructions=email_instructions,
+        use_cache=use_cache,
+    )
+    subject = generate_subject(email_body=email, use_cache=use_cache)
+    return email, subject
+
+
+async def agenerate_personal_email(
+    page_summary: str,
+    user_prompt: str = DEFAULT_USER_PROMPT,
+    email_instructions: str = DEFAULT_EMAIL_INSTRUCTION,
+    use_cache: bool = True,
+    single_shot: bool = False,
+) -> tuple[str, str]:
+    if not user_prompt:
+        user_prompt = DEFAULT_USER_PROMPT
+
+    if not email_instructions:
+        email_instructions = DEFAULT_EMAIL_INSTRUCTION
+
+    if single_shot:
+        personal_email = await agenerate_personal_email_single_shot(
+            page_content=page_summary,
+            user_prompt=user_prompt,
+            email_instructions=email_instructions,
+            use_cache=use_cache,
+        )
+        return personal_email.body, personal_email.subject
+
+    page_summary = await agenerate_page_summary(
+        page_content=page_summary,
+        use_cache=use_cache,
+    )
+    email = await agenerate_email(
+        page_summary=page_summary,
+        user_prompt=user_prompt,
+        email_instructions=email_instructions,
+        use_cache=use_cache,
     )
-    subject = generate_subject(email_body=email)
+    subject = await agenerate_subject(email_body=email, use_cache=use_cache)
     return email, subject
+
+
+async def agenerate_personal_emails(
+    pages: list[str],
+    user_prompt: str = DEFAULT_USER_PROMPT,
+    email_instructions: str = DEFAULT_EMAIL_INSTRUCTION,
+    max_concurrency: int = None,
+    timeout: float = None,
+    use_cache: bool = True,
+    single_shot: bool = False,
+) -> list:
+    """
+    Draft emails for many pages concurrently.
+
+    At most `max_concurrency` pages are in flight at once and each page gets
+    `timeout` seconds for its three LLM calls. Results keep the order of
+    `pages`; a page that failed or timed out yields its exception instead of
+    an (email, subject) tuple.
+    """
+    if max_concurrency is None:
+        max_concurrency = settings.LLM_MAX_CONCURRENCY
+    if timeout is None:
+        timeout = settings.LLM_REQUEST_TIMEOUT
+
+    semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+
+    async def draft(index, page):
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(
+                    agenerate_personal_email(
+                        page_summary=page,
+                        user_prompt=user_prompt,
+                        email_instructions=email_instructions,
+                        use_cache=use_cache,
+                        single_shot=single_shot,
+                    ),
+                    timeout=timeout,
+                )
+            except Exception as e:
+                logger.warning(f"Drafting page {index} failed: {e!r}")
+                return e
+
+    return await asyncio.gather(
+        *(draft(index, page) for index, page in enumerate(pages)),
+    )
+
+
+def generate_personal_emails(
+    pages: list[str],
+    user_prompt: str = DEFAULT_USER_PROMPT,
+    email_instructions: str = DEFAULT_EMAIL_INSTRUCTION,
+    max_concurrency: int = None,
+    timeout: float = None,
+    use_cache: bool = True,
+    single_shot: bool = False,
+) -> list:
+    """Blocking wrapper around agenerate_personal_emails."""
+    return asyncio.run(
+        agenerate_personal_emails(
+            pages=pages,
+            user_prompt=user_prompt,
+            email_instructions=email_instructions,
+            max_concurrency=max_concurrency,
+            timeout=timeout,
+            use_cache=use_cache,
+            single_shot=single_shot,
+        ),
+    )
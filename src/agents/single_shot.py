@@ -0,0 +1,130 @@
+import json
+from functools import lru_cache
+
+from langchain_core.prompts import ChatPromptTemplate
+from pydantic import BaseModel
+from pydantic import Field
+
+from src.agents import email_writer
+from src.agents import linkedin_info
+from src.agents import subject_writer
+from src.agents.cache import llm_cache
+from src.agents.llm import CHAIN_CACHE_SIZE
+from src.agents.llm import get_llm
+from src.agents.llm import LLM_MODEL
+
+
+class PersonalEmail(BaseModel):
+    summary: str = Field(
+        description='Structured professional summary of the receiver profile.',
+    )
+    body: str = Field(
+        description='Ready to send email body, no subject, no signature.',
+    )
+    subject: str = Field(
+        description='Subject line for the email body, under 10 words.',
+    )
+
+
+SYSTEM_PROMPT = f"""
+You prepare a personalized email from a LinkedIn page in three steps and
+return all three results at once.
+
+# Step 1: summary
+{linkedin_info.SYSTEM_PROMPT}
+
+# Step 2: body
+Use the summary from step 1 as the receiver profile_summary.
+{email_writer.SYSTEM_PROMPT}
+
+# Step 3: subject
+Use the email body from step 2 as the email content.
+{subject_writer.SYSTEM_PROMPT}
+"""
+
+
+def generate_prompt_template(
+    user_prompt: str,
+    email_instructions: str,
+) -> ChatPromptTemplate:
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            ('system', SYSTEM_PROMPT),
+            ('human', email_instructions),
+            ('human', user_prompt),
+            ('human', 'Here is receiver LinkedIn page: {page_content}'),
+        ],
+    )
+    return prompt
+
+
+@lru_cache(maxsize=CHAIN_CACHE_SIZE)
+def get_single_shot_chain(user_prompt: str, email_instructions: str):
+    """The single-shot chain for a prompt pair, compiled once and reused."""
+    prompt = generate_prompt_template(
+        user_prompt=user_prompt,
+        email_instructions=email_instructions,
+    )
+    return prompt | get_llm().with_structured_output(PersonalEmail)
+
+
+def get_cache_key(
+    page_content: str,
+    user_prompt: str,
+    email_instructions: str,
+) -> str:
+    return llm_cache.make_key(
+        LLM_MODEL,
+        SYSTEM_PROMPT,
+        email_instructions,
+        user_prompt,
+        page_content,
+    )
+
+
+def generate_personal_email_single_shot(
+    page_content: str,
+    user_prompt: str = email_writer.DEFAULT_USER_PROMPT,
+    email_instructions: str = email_writer.DEFAULT_EMAIL_INSTRUCTION,
+    use_cache: bool = True,
+) -> PersonalEmail:
+    cache_key = get_cache_key(page_content, user_prompt, email_instructions)
+    if use_cache:
+        cached = llm_cache.get('single_shot', cache_key)
+        if cached is not None:
+            return PersonalEmail(**json.loads(cached))
+
+    single_shot_chain = get_single_shot_chain(user_prompt, email_instructions)
+    personal_email = single_shot_chain.invoke(
+        {
+            'page_content': page_content,
+        },
+    )
+    llm_cache.set(
+        'single_shot', cache_key, personal_email.model_dump_json(),
+    )
+    return personal_email
+
+
+async def agenerate_personal_email_single_shot(
+    page_content: str,
+    user_prompt: str = email_writer.DEFAULT_USER_PROMPT,
+    email_instructions: str = email_writer.DEFAULT_EMAIL_INSTRUCTION,
+    use_cache: bool = True,
+) -> PersonalEmail:
+    cache_key = get_cache_key(page_content, user_prompt, email_instructions)
+    if use_cache:
+        cached = await llm_cache.aget('single_shot', cache_key)
+        if cached is not None:
+            return PersonalEmail(**json.loads(cached))
+
+    single_shot_chain = get_single_shot_chain(user_prompt, email_instructions)
+    personal_email = await single_shot_chain.ainvoke(
+        {
+            'page_content': page_content,
+        },
+    )
+    await llm_cache.aset(
+        'single_shot', cache_key, personal_email.model_dump_json(),
+    )
+    return personal_email
@@ -1,10 +1,14 @@
+import logging
+from functools import cache
+
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 
-from src.config import settings
+from src.agents.cache import llm_cache
+from src.agents.llm import get_llm
+from src.agents.llm import LLM_MODEL
 
-llm = ChatOpenAI(model='gpt-4o-mini', api_key=settings.OPENAI_API_KEY)
+logger = logging.getLogger(__name__)
 
 
 SYSTEM_PROMPT = """
@@ -42,15 +46,52 @@ def generate_prompt_template(
     return prompt
 
 
+@cache
+def get_subject_chain():
+    """The subject chain, compiled once and reused."""
+    return generate_prompt_template() | get_llm() | StrOutputParser()
+
+
+def get_cache_key(email_body: str) -> str:
+    return llm_cache.make_key(LLM_MODEL, SYSTEM_PROMPT, email_body)
+
+
 def generate_subject(
     email_body: str,
+    use_cache: bool = True,
 ) -> str:
-    print('Writing subject')
-    prompt = generate_prompt_template()
-    subject_chain = prompt | llm | StrOutputParser()
+    logger.debug('Writing subject')
+    cache_key = get_cache_key(email_body)
+    if use_cache:
+        subject = llm_cache.get('subject', cache_key)
+        if subject is not None:
+            return subject
+
+    subject_chain = get_subject_chain()
     subject = subject_chain.invoke(
         {
             'email_body': email_body,
         },
     )
+    llm_cache.set('subject', cache_key, subject)
+    return subject
+
+
+async def agenerate_subject(
+    email_body: str,
+    use_cache: bool = True,
+) -> str:
+    cache_key = get_cache_key(email_body)
+    if use_cache:
+        subject = await llm_cache.aget('subject', cache_key)
+        if subject is not None:
+            return subject
+
+    subject_chain = get_subject_chain()
+    subject = await subject_chain.ainvoke(
+        {
+            'email_body': email_body,
+        },
+    )
+    await llm_cache.aset('subject', cache_key, subject)
     return subject
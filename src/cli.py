@@ -0,0 +1,211 @@
+"""
+Command-line runner of the automation, for headless boxes and batch jobs.
+
+Runs a lead CSV through the same day-by-day campaign as the desktop app
+and logs to the same run_history.db, without importing Tk:
+
+    python -m src.cli leads.csv --prompt-file prompt.txt --daily-limit 50
+
+SIGINT and SIGTERM stop the run at its next wait or send; a second signal
+exits at once.
+
+Exit codes:
+    0   every lead of the file was handled
+    1   the automation failed
+    2   invalid arguments, CSV, prompt or reference file
+    130 stopped by a signal
+"""
+import argparse
+import logging
+import signal
+from pathlib import Path
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_INVALID = 2
+EXIT_INTERRUPTED = 130
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m src.cli',
+        description='Send personalized InMails to the leads of a CSV.',
+    )
+    parser.add_argument('csv', type=Path, help='lead CSV to process')
+    parser.add_argument(
+        '--prompt-file', type=Path,
+        help='file with the prompt for the email writer',
+    )
+    parser.add_argument(
+        '--reference-file', type=Path,
+        help='file with a reference email to follow',
+    )
+    parser.add_argument(
+        '--visible', action='store_true',
+        help='show the browser instead of running Chrome headless',
+    )
+    parser.add_argument(
+        '--control-sending', action='store_true',
+        help='wait for Enter or Shift in the browser before each send '
+        '(needs --visible)',
+    )
+    parser.add_argument(
+        '--daily-limit', type=int,
+        help='emails per day for a single profile '
+        '(default: the limit saved in the app)',
+    )
+    profiles = parser.add_mutually_exclusive_group()
+    profiles.add_argument(
+        '--profile-dir', type=Path,
+        help='Chrome user-data directory of the Recruiter account',
+    )
+    profiles.add_argument(
+        '--seat-profile-dir', type=Path, action='append',
+        help='Chrome user-data directory of one Recruiter seat; repeat to '
+        'send through several seats in parallel (default: '
+        'SEAT_PROFILE_DIRS)',
+    )
+    parser.add_argument(
+        '--seat-daily-limit', type=int,
+        help='emails per day for each seat (default: SEAT_DAILY_LIMIT)',
+    )
+    parser.add_argument(
+        '--resume', action='store_true',
+        help='continue the latest unfinished run of this CSV',
+    )
+    parser.add_argument(
+        '--no-cache', action='store_true',
+        help='do not reuse cached LLM outputs',
+    )
+    parser.add_argument(
+        '--single-shot', action='store_true',
+        help='draft summary, body and subject in one LLM call',
+    )
+    args = parser.parse_args(argv)
+    if args.control_sending and not args.visible:
+        parser.error('--control-sending needs --visible')
+    for limit in ('daily_limit', 'seat_daily_limit'):
+        if getattr(args, limit) is not None and getattr(args, limit) < 1:
+            parser.error(f"--{limit.replace('_', '-')} must be at least 1")
+    return args
+
+
+def read_text_file(path: Path | None) -> str | None:
+    if path is None:
+        return None
+    return path.read_text(encoding='utf-8').strip() or None
+
+
+def install_stop_handlers(campaign):
+    """Cancel `campaign` on SIGINT or SIGTERM; a second signal kills."""
+    def stop(signum, frame):
+        logger.warning(
+            f"{signal.Signals(signum).name} received, stopping the run at "
+            'its next wait or send.',
+        )
+        campaign.cancel()
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    # The app's modules are imported after parsing, so --help and argument
+    # errors return at once.
+    from src.main import setup_logging
+    setup_logging()
+
+    file_path = str(args.csv.resolve())
+    try:
+        prompt = read_text_file(args.prompt_file)
+        reference_email = read_text_file(args.reference_file)
+    except (OSError, UnicodeDecodeError) as e:
+        logger.error(f"Cannot read prompt or reference file: {e}")
+        return EXIT_INVALID
+
+    from src.database.checkpoints import get_resume_point
+    from src.database.checkpoints import save_checkpoint
+    from src.database.connection import database
+    from src.database.handlers import get_daily_limit
+    from src.database.handlers import log_run_end
+    from src.database.handlers import log_run_start
+    from src.database.handlers import reopen_run
+    from src.database.setup import create_database
+    from src.inmail.campaign import Campaign
+    from src.inmail.campaign import COMPLETED
+    from src.inmail.campaign import INTERRUPTED
+    from src.inmail.leads import validate_lead_columns
+    from src.inmail.seats import get_seats
+
+    create_database()
+    try:
+        validate_lead_columns(file_path)
+    except (OSError, ValueError) as e:
+        logger.error(f"Invalid lead CSV {file_path}: {e}")
+        return EXIT_INVALID
+
+    resume_point = get_resume_point(file_path) if args.resume else None
+    if resume_point:
+        run_id, start_row = resume_point
+        reopen_run(run_id)
+        logger.info(f"Resuming run {run_id} from row {start_row + 1}.")
+    else:
+        run_id, start_row = log_run_start(file_name=file_path), 0
+        save_checkpoint(run_id, file_path, next_row=0)
+        logger.info(f"Started run {run_id}.")
+
+    daily_limit = args.daily_limit
+    automation_kwargs = {}
+    if args.profile_dir:
+        # A single profile given here replaces any configured seats
+        automation_kwargs['user_data_dir'] = args.profile_dir
+        seats = []
+    else:
+        seats = get_seats(
+            profile_dirs=args.seat_profile_dir,
+            daily_limit=args.seat_daily_limit,
+        )
+    campaign = Campaign(
+        file_path,
+        run_id,
+        daily_limit=lambda: daily_limit or get_daily_limit(),
+        start_row=start_row,
+        seats=seats,
+        visible_mode=args.visible,
+        prompt=prompt,
+        reference_email=reference_email,
+        control_email_sending=args.control_sending,
+        use_cache=not args.no_cache,
+        single_shot=args.single_shot,
+        **automation_kwargs,
+    )
+    install_stop_handlers(campaign)
+
+    try:
+        status = campaign.run()
+    except Exception as e:
+        logger.exception(f"Run {run_id} failed: {e}")
+        log_run_end(run_id, status='Failed', error_message=str(e))
+        status = None
+    finally:
+        database.flush()
+
+    logger.info(
+        f"Run {run_id} ended ({status or 'Failed'}) after "
+        f"{campaign.processed_rows} rows.",
+    )
+    if status == COMPLETED:
+        return EXIT_OK
+    if status == INTERRUPTED:
+        return EXIT_INTERRUPTED
+    return EXIT_FAILED
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
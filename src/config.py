@@ -24,6 +24,35 @@ def get_env_path() -> Path:
 class AppSettings(BaseSettings):
     OPENAI_API_KEY: str = Field(default='ggg')
     CHECK: str = Field(default='check')
+    LLM_MAX_CONCURRENCY: int = Field(default=8)
+    LLM_REQUEST_TIMEOUT: float = Field(default=120)
+    LLM_MAX_CONNECTIONS: int = Field(default=16)
+    LLM_KEEPALIVE_EXPIRY: float = Field(default=60)
+    LLM_CACHE_TTL_DAYS: float = Field(default=30)
+    LLM_CACHE_MAX_ENTRIES: int = Field(default=20000)
+    PAGE_TEXT_TOKEN_BUDGET: int = Field(default=1500)
+    HTML_PARSER: str = Field(default='lxml')
+    CHROME_VERSION_MAIN: int = Field(default=133)
+    DRIVER_RECYCLE_ROWS: int = Field(default=25)
+    DRIVER_RECYCLE_MEMORY_GROWTH_MB: float = Field(default=1024)
+    DRIVER_RECYCLE_ERROR_STREAK: int = Field(default=3)
+    SEAT_PROFILE_DIRS: list[str] = Field(default=[])
+    SEAT_DAILY_LIMIT: int = Field(default=100)
+    HUMAN_JITTER_SCALE: float = Field(default=1.0)
+    # Timezone whose calendar day the daily limit counts (e.g. 'CET'),
+    # local time when empty.
+    QUOTA_TIMEZONE: str = Field(default='')
+    # Days after a sent email during which the profile is not contacted
+    # again by any run; 0 disables the check.
+    CONTACT_COOLDOWN_DAYS: float = Field(default=365)
+    # Send window ('HH:MM', end may be '24:00' or before the start to run
+    # past midnight) and the weekdays it opens on (Monday is 0) in
+    # SCHEDULE_TIMEZONE; the next day's sending starts at the window.
+    SCHEDULE_TIMEZONE: str = Field(default='CET')
+    SEND_WINDOW_START: str = Field(default='05:00')
+    SEND_WINDOW_END: str = Field(default='24:00')
+    SEND_WEEKDAYS: list[int] = Field(default=[0, 1, 2, 3, 4, 5, 6])
+    SPREAD_DAILY_QUOTA: bool = Field(default=False)
 
     model_config = SettingsConfigDict(
         env_file=get_env_path(),
@@ -0,0 +1,138 @@
+"""
+Resume points of runs.
+
+Every run over a lead CSV keeps a checkpoint with the next row to read,
+advanced after each daily chunk, and a per-lead state keyed by normalized
+profile URL. A restarted run seeks straight to its checkpoint and skips
+leads that were already sent or skipped.
+"""
+import re
+from urllib.parse import unquote
+
+from src.database.connection import database
+
+PENDING = 'pending'
+DRAFTED = 'drafted'
+SENT = 'sent'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+# Leads in these states are never processed again by the same run
+COMPLETED_STATES = (SENT, SKIPPED)
+
+# State of a lead for each email_status logged by log_email
+EMAIL_STATUS_STATES = {
+    'Sent': SENT,
+    'Skipped': SKIPPED,
+    'Failed': FAILED,
+}
+
+# Optional scheme and credentials, host, optional port, then the path up to
+# any query or fragment. Matches every string.
+PROFILE_URL_PATTERN = re.compile(
+    r'(?:[a-z][a-z0-9+.-]*://)?(?:[^@/?#]*@)?'
+    r'(?P<host>[^/:?#]*)(?::\d*)?(?P<path>[^?#]*)',
+    re.IGNORECASE,
+)
+
+upsert_lead_state_query = """
+INSERT INTO lead_state (run_id, profile_key, state)
+VALUES (?, ?, ?)
+ON CONFLICT (run_id, profile_key)
+DO UPDATE SET state = excluded.state, updated_at = CURRENT_TIMESTAMP
+"""
+
+
+def normalize_profile_url(url) -> str | None:
+    """
+    Key a LinkedIn profile URL so that spellings of the same profile match:
+    no scheme, query, fragment, www/country subdomain or trailing slash,
+    percent-decoded and lowercased, e.g. 'linkedin.com/in/jane-doe'.
+    """
+    if not isinstance(url, str):
+        return None
+    match = PROFILE_URL_PATTERN.match(url.strip())
+    host, path = match.group('host').lower(), match.group('path')
+    if not host and not path:
+        return None
+    if host.endswith('.linkedin.com'):
+        host = 'linkedin.com'
+    if '%' in path:
+        path = unquote(path)
+    return f"{host}{path.rstrip('/').lower()}"
+
+
+def save_checkpoint(run_id, file_name, next_row):
+    """Record that `run_id` is done with the rows before `next_row`."""
+    return database.write(
+        """
+        INSERT INTO run_checkpoints (run_id, file_name, next_row)
+        VALUES (?, ?, ?)
+        ON CONFLICT (run_id) DO UPDATE SET
+            next_row = excluded.next_row,
+            updated_at = CURRENT_TIMESTAMP
+        """,
+        (run_id, file_name, next_row),
+    )
+
+
+def finish_checkpoint(run_id):
+    """Mark a run as done with its file, so it is not offered for resume."""
+    return database.write(
+        'UPDATE run_checkpoints SET finished = 1, '
+        'updated_at = CURRENT_TIMESTAMP WHERE run_id = ?',
+        (run_id,),
+    )
+
+
+def get_resume_point(file_name):
+    """(run_id, next_row) of the latest unfinished run of `file_name`."""
+    database.flush()
+    return database.query_one(
+        """
+        SELECT run_id, next_row FROM run_checkpoints
+        WHERE file_name = ? AND finished = 0
+        ORDER BY run_id DESC
+        LIMIT 1
+        """,
+        (file_name,),
+    )
+
+
+def mark_leads_pending(run_id, leads):
+    """Register a chunk of leads; leads already known keep their state."""
+    rows = [
+        (run_id, normalize_profile_url(lead.linkedin_url), lead.index)
+        for lead in leads
+    ]
+    return database.submit(
+        lambda connection: connection.executemany(
+            f"""
+            INSERT OR IGNORE INTO lead_state (
+                run_id, profile_key, row_index, state
+            ) VALUES (?, ?, ?, '{PENDING}')
+            """,
+            rows,
+        ),
+    )
+
+
+def mark_lead_state(run_id, linkedin_profile_url, state):
+    return database.write(
+        upsert_lead_state_query,
+        (run_id, normalize_profile_url(linkedin_profile_url), state),
+    )
+
+
+def get_completed_profiles(run_id) -> set[str]:
+    """Profile keys the run has already sent to or skipped."""
+    database.flush()
+    placeholders = ', '.join('?' for _ in COMPLETED_STATES)
+    rows = database.query(
+        f"""
+        SELECT profile_key FROM lead_state
+        WHERE run_id = ? AND state IN ({placeholders})
+        """,
+        (run_id, *COMPLETED_STATES),
+    )
+    return {profile_key for profile_key, in rows}
@@ -0,0 +1,147 @@
+import logging
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = 'run_history.db'
+
+# Most writes queued at once are committed in a single transaction.
+MAX_WRITE_BATCH = 100
+
+# Read connections kept open for reuse. Readers opened beyond this while
+# many threads read at once are closed when they are given back.
+MAX_IDLE_READERS = 4
+
+
+class Database:
+    """
+    Shared access to run_history.db.
+
+    The database runs in WAL mode with synchronous=NORMAL, so readers never
+    block on the writer. Reads borrow a connection from a small pool of
+    long-lived ones (which also keeps sqlite3's prepared statement cache
+    warm), so short-lived threads leave nothing open behind them. All
+    writes go through one writer thread fed by a queue: callers on the
+    browser loop or the Tk thread only enqueue and move on, and queued
+    writes are committed together in batches.
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self._idle_readers = queue.LifoQueue(maxsize=MAX_IDLE_READERS)
+        self._queue = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+
+    def connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.db_path,
+            isolation_level=None,
+            check_same_thread=False,
+            timeout=30,
+        )
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute('PRAGMA foreign_keys=ON')
+        return connection
+
+    @contextmanager
+    def reader(self):
+        """A read connection from the pool, given back when done."""
+        try:
+            connection = self._idle_readers.get_nowait()
+        except queue.Empty:
+            connection = self.connect()
+        try:
+            yield connection
+        finally:
+            try:
+                self._idle_readers.put_nowait(connection)
+            except queue.Full:
+                connection.close()
+
+    def query(self, sql: str, params=()) -> list:
+        with self.reader() as connection:
+            return connection.execute(sql, params).fetchall()
+
+    def query_one(self, sql: str, params=()):
+        with self.reader() as connection:
+            return connection.execute(sql, params).fetchone()
+
+    def submit(self, func) -> Future:
+        """
+        Run `func(connection)` on the writer thread inside a transaction.
+
+        Returns a future with the function's result; callers that do not
+        need the result can ignore it.
+        """
+        self._ensure_writer()
+        future = Future()
+        self._queue.put((func, future))
+        return future
+
+    def write(self, sql: str, params=()) -> Future:
+        """Queue a single statement; the future resolves to its lastrowid."""
+        return self.submit(
+            lambda connection: connection.execute(sql, params).lastrowid,
+        )
+
+    def flush(self):
+        """Block until every write queued so far has been committed."""
+        self.submit(lambda connection: None).result()
+
+    def _ensure_writer(self):
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(
+                    target=self._write_loop,
+                    name='database-writer',
+                    daemon=True,
+                )
+                self._writer.start()
+
+    def _write_loop(self):
+        connection = self.connect()
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < MAX_WRITE_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write_batch(connection, batch)
+
+    def _write_batch(self, connection, batch):
+        results = []
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            for func, future in batch:
+                connection.execute('SAVEPOINT write')
+                try:
+                    result = func(connection)
+                except Exception as e:
+                    connection.execute('ROLLBACK TO write')
+                    results.append((future, None, e))
+                else:
+                    results.append((future, result, None))
+                connection.execute('RELEASE write')
+            connection.execute('COMMIT')
+        except sqlite3.Error as e:
+            logger.error(f"Database write batch failed: {e}")
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            results = [(future, None, e) for func, future in batch]
+
+        for future, result, error in results:
+            if error is not None:
+                logger.error(f"Database write failed: {error}")
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+database = Database()
@@ -0,0 +1,79 @@
+"""
+Profiles contacted by any run.
+
+contacted_profiles holds one row per normalized profile URL with the last
+time an email was sent to it (and its Recruiter profile ID once known),
+so leads can be checked against the whole history with primary-key
+lookups instead of scanning emails.
+"""
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+from src.config import settings
+from src.database.connection import database
+
+# Most profile keys looked up in one query
+LOOKUP_BATCH = 900
+
+upsert_contacted_profile_query = """
+INSERT INTO contacted_profiles (
+    profile_key, profile_id, run_id, last_contacted_at
+) VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+ON CONFLICT (profile_key) DO UPDATE SET
+    profile_id = COALESCE(excluded.profile_id, profile_id),
+    run_id = excluded.run_id,
+    last_contacted_at = excluded.last_contacted_at
+"""
+
+
+def get_cooldown_start(cooldown_days: float) -> str:
+    """UTC timestamp before which a contact no longer blocks a lead."""
+    start = datetime.now(timezone.utc) - timedelta(days=cooldown_days)
+    return start.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def get_recently_contacted(
+    profile_keys,
+    cooldown_days: float = settings.CONTACT_COOLDOWN_DAYS,
+) -> set[str]:
+    """
+    The profile keys among `profile_keys` contacted within the cool-down
+    window. A window of 0 disables the check.
+    """
+    if not cooldown_days:
+        return set()
+    profile_keys = list(dict.fromkeys(key for key in profile_keys if key))
+    since = get_cooldown_start(cooldown_days)
+    contacted = set()
+    for start in range(0, len(profile_keys), LOOKUP_BATCH):
+        batch = profile_keys[start: start + LOOKUP_BATCH]
+        placeholders = ', '.join('?' for _ in batch)
+        rows = database.query(
+            f"""
+            SELECT profile_key FROM contacted_profiles
+            WHERE profile_key IN ({placeholders})
+            AND last_contacted_at >= ?
+            """,
+            (*batch, since),
+        )
+        contacted.update(profile_key for profile_key, in rows)
+    return contacted
+
+
+def is_profile_id_contacted(
+    profile_id,
+    cooldown_days: float = settings.CONTACT_COOLDOWN_DAYS,
+) -> bool:
+    """Whether the Recruiter profile was contacted within the cool-down."""
+    if not cooldown_days or not profile_id:
+        return False
+    result = database.query_one(
+        """
+        SELECT 1 FROM contacted_profiles
+        WHERE profile_id = ? AND last_contacted_at >= ?
+        LIMIT 1
+        """,
+        (str(profile_id), get_cooldown_start(cooldown_days)),
+    )
+    return result is not None
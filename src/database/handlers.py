@@ -1,65 +1,218 @@
-import sqlite3
+from datetime import datetime
+from datetime import timezone
 
-DB_PATH = 'run_history.db'
+import pytz
 
-
-# src/modules/history_handler.py
+from src.config import settings
+from src.database.checkpoints import EMAIL_STATUS_STATES
+from src.database.checkpoints import normalize_profile_url
+from src.database.checkpoints import upsert_lead_state_query
+from src.database.connection import database
+from src.database.contacts import upsert_contacted_profile_query
 
 
-DB_PATH = 'run_history.db'
+# src/modules/history_handler.py
 
 
 def log_run_start(file_name):
-    connection = sqlite3.connect(DB_PATH)
-    cursor = connection.cursor()
     insert_query = """
     INSERT INTO runs (file_name, status)
     VALUES (?, ?)
     """
-    cursor.execute(insert_query, (file_name, 'Running'))
-    run_id = cursor.lastrowid  # Get the ID of the inserted run
-    connection.commit()
-    connection.close()
+    run_id = database.write(insert_query, (file_name, 'Running')).result()
     return run_id  # Return the run_id to associate emails with this run
 
 
+def reopen_run(run_id):
+    """Mark a stopped run as running again when it is resumed."""
+    update_query = """
+    UPDATE runs
+    SET status = 'Running', error_message = NULL
+    WHERE run_id = ?
+    """
+    return database.write(update_query, (run_id,))
+
+
 def log_run_end(run_id, status, error_message=None):
-    connection = sqlite3.connect(DB_PATH)
-    cursor = connection.cursor()
     update_query = """
     UPDATE runs
     SET status = ?, error_message = ?
     WHERE run_id = ?
     """
-    cursor.execute(update_query, (status, error_message, run_id))
-    connection.commit()
-    connection.close()
+    return database.write(update_query, (status, error_message, run_id))
 
 
 def log_email(
     run_id, linkedin_profile_url,
     email_text, email_status,
     error_message=None,
+    sender_seat=None,
+    subject=None,
+    profile_id=None,
 ):
-    connection = sqlite3.connect(DB_PATH)
-    cursor = connection.cursor()
     insert_query = """
     INSERT INTO emails (
         run_id,
         linkedin_profile_url,
         email_text,
         email_status,
-        error_message
-    ) VALUES (?, ?, ?, ?, ?)
-    """
-    cursor.execute(
-        insert_query, (
-            run_id,
-            linkedin_profile_url,
-            email_text,
-            email_status,
-            error_message,
-        ),
+        error_message,
+        sender_seat,
+        subject
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+    """
+    quota_query = """
+    INSERT INTO daily_quota (day, sender_seat, email_status, count)
+    VALUES (?, ?, ?, 1)
+    ON CONFLICT (day, sender_seat, email_status)
+    DO UPDATE SET count = count + 1
+    """
+    day = get_quota_day()
+    profile_key = normalize_profile_url(linkedin_profile_url)
+
+    def insert_email(connection):
+        email_id = connection.execute(
+            insert_query, (
+                run_id,
+                linkedin_profile_url,
+                email_text,
+                email_status,
+                error_message,
+                sender_seat,
+                subject,
+            ),
+        ).lastrowid
+        # Same transaction as the insert, so the counter cannot drift
+        connection.execute(
+            quota_query, (day, sender_seat or '', email_status or ''),
+        )
+        # and a lead is never resumed after its email was logged
+        if profile_key and email_status in EMAIL_STATUS_STATES:
+            connection.execute(
+                upsert_lead_state_query,
+                (run_id, profile_key, EMAIL_STATUS_STATES[email_status]),
+            )
+        if profile_key and email_status == 'Sent':
+            connection.execute(
+                upsert_contacted_profile_query,
+                (
+                    profile_key,
+                    str(profile_id) if profile_id else None,
+                    run_id,
+                ),
+            )
+        return email_id
+
+    return database.submit(insert_email)
+
+
+def get_quota_day(moment: datetime = None) -> str:
+    """
+    The calendar day a moment counts against for the daily limit, in
+    QUOTA_TIMEZONE (local time when unset).
+    """
+    if moment is None:
+        moment = datetime.now(timezone.utc)
+    quota_timezone = None
+    if settings.QUOTA_TIMEZONE:
+        quota_timezone = pytz.timezone(settings.QUOTA_TIMEZONE)
+    return moment.astimezone(quota_timezone).date().isoformat()
+
+
+def get_quota_state(sender_seat=None) -> dict:
+    """
+    Today's logged emails read from the daily_quota counters.
+
+    Returns the day, the total and the count per email status, for one
+    sender seat ('' is the default profile) or for all seats when
+    `sender_seat` is None.
+    """
+    # Include emails still waiting in the write queue
+    database.flush()
+    day = get_quota_day()
+    select_query = """
+    SELECT email_status, SUM(count) FROM daily_quota
+    WHERE day = ?
+    """
+    params = (day,)
+    if sender_seat is not None:
+        select_query += ' AND sender_seat = ?'
+        params += (sender_seat,)
+    select_query += ' GROUP BY email_status'
+    by_status = dict(database.query(select_query, params))
+    return {
+        'day': day,
+        'total': sum(by_status.values()),
+        'by_status': by_status,
+    }
+
+
+def count_emails_sent_today(sender_seat=None):
+    """Count today's logged emails, optionally for a single sender seat."""
+    return get_quota_state(sender_seat=sender_seat)['total']
+
+
+DEFAULT_DAILY_LIMIT = 100
+
+
+def get_daily_limit():
+    """The daily limit saved from the Home page, or the default."""
+    result = database.query_one(
+        "SELECT value FROM settings WHERE key = 'daily_limit'",
+    )
+    return int(result[0]) if result else DEFAULT_DAILY_LIMIT
+
+
+HISTORY_PAGE_SIZE = 200
+
+
+def fetch_runs_page(after=None, limit=HISTORY_PAGE_SIZE):
+    """
+    Newest runs first, one keyset page at a time.
+
+    `after` is the (timestamp, run_id) of the last run already shown, so
+    each page is a range scan on idx_runs_timestamp however deep the
+    archive is.
+    """
+    select_query = """
+    SELECT run_id, timestamp, file_name, status, error_message
+    FROM runs
+    """
+    params = ()
+    if after is not None:
+        select_query += ' WHERE (timestamp, run_id) < (?, ?)'
+        params = tuple(after)
+    select_query += ' ORDER BY timestamp DESC, run_id DESC LIMIT ?'
+    return database.query(select_query, params + (limit,))
+
+
+def fetch_emails_page(run_id, after=None, limit=HISTORY_PAGE_SIZE):
+    """
+    Newest emails of a run, without their text, one keyset page at a time.
+
+    `after` is the (timestamp, email_id) of the last email already shown.
+    """
+    select_query = """
+    SELECT
+        email_id,
+        run_id,
+        linkedin_profile_url,
+        email_status,
+        error_message,
+        timestamp
+    FROM emails
+    WHERE run_id = ?
+    """
+    params = (run_id,)
+    if after is not None:
+        select_query += ' AND (timestamp, email_id) < (?, ?)'
+        params += tuple(after)
+    select_query += ' ORDER BY timestamp DESC, email_id DESC LIMIT ?'
+    return database.query(select_query, params + (limit,))
+
+
+def get_email_text(email_id):
+    result = database.query_one(
+        'SELECT email_text FROM emails WHERE email_id = ?', (email_id,),
     )
-    connection.commit()
-    connection.close()
+    return result[0] if result else None
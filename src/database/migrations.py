@@ -0,0 +1,242 @@
+import logging
+import sqlite3
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+from src.database.checkpoints import normalize_profile_url
+from src.database.handlers import get_quota_day
+from src.database.search import create_email_search
+
+logger = logging.getLogger(__name__)
+
+
+def initial_schema(connection):
+    """Tables of databases created before versioned migrations."""
+    cursor = connection.cursor()
+
+    # Create runs table
+    create_runs_table_query = """
+    CREATE TABLE IF NOT EXISTS runs (
+        run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        file_name TEXT,
+        status TEXT,
+        error_message TEXT
+    )
+    """
+    cursor.execute(create_runs_table_query)
+
+    # Create emails table
+    create_emails_table_query = """
+    CREATE TABLE IF NOT EXISTS emails (
+        email_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_id INTEGER,
+        linkedin_profile_url TEXT,
+        email_text TEXT,
+        email_status TEXT,
+        error_message TEXT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        sender_seat TEXT,
+        FOREIGN KEY (run_id) REFERENCES runs(run_id)
+    )
+    """
+    cursor.execute(create_emails_table_query)
+
+    # Databases created before multi-seat runs lack the sender_seat column
+    cursor.execute('PRAGMA table_info(emails)')
+    email_columns = [column[1] for column in cursor.fetchall()]
+    if 'sender_seat' not in email_columns:
+        cursor.execute('ALTER TABLE emails ADD COLUMN sender_seat TEXT')
+
+    # Create settings table
+    create_settings_table_query = """
+    CREATE TABLE IF NOT EXISTS settings (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )
+    """
+    cursor.execute(create_settings_table_query)
+
+    # Create LLM cache table
+    create_llm_cache_table_query = """
+    CREATE TABLE IF NOT EXISTS llm_cache (
+        cache_key TEXT PRIMARY KEY,
+        chain TEXT,
+        value TEXT,
+        created_at REAL,
+        last_used_at REAL
+    )
+    """
+    cursor.execute(create_llm_cache_table_query)
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used_at '
+        'ON llm_cache (last_used_at)',
+    )
+
+
+def add_email_indexes(connection):
+    """Cover the History page queries on runs and emails."""
+    cursor = connection.cursor()
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_emails_run_id_timestamp '
+        'ON emails (run_id, timestamp)',
+    )
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_runs_timestamp '
+        'ON runs (timestamp)',
+    )
+
+
+def add_daily_quota(connection):
+    """
+    Per-day email counters, so the daily limit check reads one row instead
+    of counting emails. Recent emails are backfilled; older days never
+    matter for the limit.
+    """
+    cursor = connection.cursor()
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS daily_quota (
+            day TEXT,
+            sender_seat TEXT,
+            email_status TEXT,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, sender_seat, email_status)
+        ) WITHOUT ROWID
+        """,
+    )
+
+    since = datetime.now(timezone.utc) - timedelta(days=2)
+    cursor.execute(
+        'SELECT timestamp, sender_seat, email_status FROM emails '
+        'WHERE timestamp >= ?',
+        (since.strftime('%Y-%m-%d %H:%M:%S'),),
+    )
+    counts = {}
+    for timestamp, sender_seat, email_status in cursor.fetchall():
+        sent_at = datetime.strptime(
+            timestamp, '%Y-%m-%d %H:%M:%S',
+        ).replace(tzinfo=timezone.utc)
+        key = (get_quota_day(sent_at), sender_seat or '', email_status or '')
+        counts[key] = counts.get(key, 0) + 1
+    cursor.executemany(
+        'INSERT OR REPLACE INTO daily_quota '
+        '(day, sender_seat, email_status, count) VALUES (?, ?, ?, ?)',
+        [(*key, count) for key, count in counts.items()],
+    )
+
+
+def add_email_search(connection):
+    """Email subjects plus the full-text search index over emails."""
+    cursor = connection.cursor()
+    cursor.execute('ALTER TABLE emails ADD COLUMN subject TEXT')
+    try:
+        create_email_search(connection)
+    except sqlite3.OperationalError as e:
+        # SQLite builds without FTS5 fall back to LIKE searches
+        logger.warning(f"Email search index not created: {e}")
+        return
+    cursor.execute("INSERT INTO emails_fts (emails_fts) VALUES ('rebuild')")
+
+
+def add_resume_checkpoints(connection):
+    """Per-run resume cursor and per-lead state for restarted runs."""
+    cursor = connection.cursor()
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS run_checkpoints (
+            run_id INTEGER PRIMARY KEY,
+            file_name TEXT,
+            next_row INTEGER NOT NULL DEFAULT 0,
+            finished INTEGER NOT NULL DEFAULT 0,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (run_id) REFERENCES runs(run_id)
+        )
+        """,
+    )
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_run_checkpoints_file_name '
+        'ON run_checkpoints (file_name, finished)',
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS lead_state (
+            run_id INTEGER,
+            profile_key TEXT,
+            row_index INTEGER,
+            state TEXT,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (run_id, profile_key)
+        ) WITHOUT ROWID
+        """,
+    )
+
+
+def add_contacted_profiles(connection):
+    """Last contact per profile across runs, backfilled from sent emails."""
+    cursor = connection.cursor()
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS contacted_profiles (
+            profile_key TEXT PRIMARY KEY,
+            profile_id TEXT,
+            run_id INTEGER,
+            last_contacted_at DATETIME
+        ) WITHOUT ROWID
+        """,
+    )
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_contacted_profiles_profile_id '
+        'ON contacted_profiles (profile_id) WHERE profile_id IS NOT NULL',
+    )
+    connection.create_function(
+        'normalize_profile_url', 1, normalize_profile_url,
+        deterministic=True,
+    )
+    cursor.execute(
+        """
+        INSERT OR REPLACE INTO contacted_profiles (
+            profile_key, run_id, last_contacted_at
+        )
+        SELECT profile_key, run_id, MAX(timestamp)
+        FROM (
+            SELECT
+                normalize_profile_url(linkedin_profile_url) AS profile_key,
+                run_id,
+                timestamp
+            FROM emails
+            WHERE email_status = 'Sent'
+        )
+        WHERE profile_key IS NOT NULL
+        GROUP BY profile_key
+        """,
+    )
+
+
+# Applied in order; a database's PRAGMA user_version is the number of
+# migrations it has already applied. Only ever append to this list.
+MIGRATIONS = [
+    initial_schema,
+    add_email_indexes,
+    add_daily_quota,
+    add_email_search,
+    add_resume_checkpoints,
+    add_contacted_profiles,
+]
+
+
+def get_schema_version(connection) -> int:
+    return connection.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(connection):
+    """Apply pending migrations inside the caller's transaction."""
+    version = get_schema_version(connection)
+    for number, migration in enumerate(MIGRATIONS[version:], version + 1):
+        logger.info(
+            f"Applying database migration {number}: {migration.__name__}",
+        )
+        migration(connection)
+        connection.execute(f"PRAGMA user_version = {number}")
+    return get_schema_version(connection)
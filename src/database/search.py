@@ -0,0 +1,207 @@
+"""
+Full-text search over logged emails.
+
+emails_fts is an external-content FTS5 index over the email text, subject
+and profile URL of the emails table, kept in sync by triggers. Rebuild it
+from the command line with:
+
+    python -m src.database.search --rebuild
+"""
+import argparse
+import sqlite3
+import time
+
+from src.database.connection import database
+
+SEARCH_LIMIT = 200
+
+SNIPPET_TOKENS = 12
+
+create_email_search_queries = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS emails_fts USING fts5(
+        email_text,
+        subject,
+        linkedin_profile_url,
+        content='emails',
+        content_rowid='email_id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS emails_fts_insert AFTER INSERT ON emails
+    BEGIN
+        INSERT INTO emails_fts (
+            rowid, email_text, subject, linkedin_profile_url
+        ) VALUES (
+            new.email_id, new.email_text, new.subject,
+            new.linkedin_profile_url
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS emails_fts_delete AFTER DELETE ON emails
+    BEGIN
+        INSERT INTO emails_fts (
+            emails_fts, rowid, email_text, subject, linkedin_profile_url
+        ) VALUES (
+            'delete', old.email_id, old.email_text, old.subject,
+            old.linkedin_profile_url
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS emails_fts_update AFTER UPDATE ON emails
+    BEGIN
+        INSERT INTO emails_fts (
+            emails_fts, rowid, email_text, subject, linkedin_profile_url
+        ) VALUES (
+            'delete', old.email_id, old.email_text, old.subject,
+            old.linkedin_profile_url
+        );
+        INSERT INTO emails_fts (
+            rowid, email_text, subject, linkedin_profile_url
+        ) VALUES (
+            new.email_id, new.email_text, new.subject,
+            new.linkedin_profile_url
+        );
+    END
+    """,
+]
+
+
+def create_email_search(connection):
+    """Create the search index and its triggers if they are missing."""
+    for query in create_email_search_queries:
+        connection.execute(query)
+
+
+def has_email_search(connection) -> bool:
+    result = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' "
+        "AND name = 'emails_fts'",
+    ).fetchone()
+    return result is not None
+
+
+def rebuild_email_search():
+    """Recreate the search index from the emails table."""
+    def rebuild(connection):
+        create_email_search(connection)
+        connection.execute(
+            "INSERT INTO emails_fts (emails_fts) VALUES ('rebuild')",
+        )
+
+    database.submit(rebuild).result()
+
+
+def build_match_query(text: str) -> str | None:
+    """
+    Turn free text into an FTS5 query matching all of its words.
+
+    Every word is quoted so punctuation in the search box can never be
+    read as query syntax, and the last word also matches as a prefix so
+    results appear while typing.
+    """
+    terms = [
+        '"' + term.replace('"', '""') + '"' for term in text.split()
+    ]
+    if not terms:
+        return None
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_emails(text: str, limit: int = SEARCH_LIMIT) -> list:
+    """
+    Best-matching emails for `text`, ranked by bm25.
+
+    Rows are (email_id, run_id, linkedin_profile_url, email_status,
+    error_message, timestamp, snippet), where the snippet is the best
+    matching fragment of the email text (or subject or URL). Without an
+    index (SQLite built without FTS5) this falls back to a slow LIKE scan.
+    """
+    match_query = build_match_query(text)
+    if match_query is None:
+        return []
+    with database.reader() as connection:
+        indexed = has_email_search(connection)
+    if not indexed:
+        return search_emails_like(text, limit)
+    select_query = f"""
+    SELECT
+        emails.email_id,
+        emails.run_id,
+        emails.linkedin_profile_url,
+        emails.email_status,
+        emails.error_message,
+        emails.timestamp,
+        snippet(emails_fts, -1, '[', ']', '...', {SNIPPET_TOKENS})
+    FROM emails_fts
+    JOIN emails ON emails.email_id = emails_fts.rowid
+    WHERE emails_fts MATCH ?
+    ORDER BY rank
+    LIMIT ?
+    """
+    return database.query(select_query, (match_query, limit))
+
+
+def search_emails_like(text: str, limit: int = SEARCH_LIMIT) -> list:
+    """Unranked substring search over the emails table."""
+    conditions = []
+    params = []
+    for term in text.split():
+        conditions.append(
+            "(email_text LIKE ? ESCAPE '\\' OR subject LIKE ? ESCAPE '\\' "
+            "OR linkedin_profile_url LIKE ? ESCAPE '\\')",
+        )
+        pattern = '%' + (
+            term.replace('\\', '\\\\')
+            .replace('%', '\\%')
+            .replace('_', '\\_')
+        ) + '%'
+        params += [pattern] * 3
+    select_query = f"""
+    SELECT
+        email_id,
+        run_id,
+        linkedin_profile_url,
+        email_status,
+        error_message,
+        timestamp,
+        substr(email_text, 1, 80)
+    FROM emails
+    WHERE {' AND '.join(conditions)}
+    ORDER BY timestamp DESC, email_id DESC
+    LIMIT ?
+    """
+    return database.query(select_query, (*params, limit))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Search or rebuild the email search index.',
+    )
+    parser.add_argument(
+        '--rebuild', action='store_true',
+        help='rebuild the index from the emails table',
+    )
+    parser.add_argument('text', nargs='*', help='words to search for')
+    args = parser.parse_args()
+
+    if args.rebuild:
+        started = time.perf_counter()
+        rebuild_email_search()
+        print(
+            'Email search index rebuilt in '
+            f'{time.perf_counter() - started:.2f}s',
+        )
+    if args.text:
+        try:
+            for row in search_emails(' '.join(args.text)):
+                print(row[0], row[5], row[2], row[6], sep=' | ')
+        except sqlite3.OperationalError as e:
+            parser.exit(1, f'Search failed: {e}\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+"""
+Day-by-day runs over a lead CSV.
+
+A campaign streams the leads of a file and sends up to the day's quota,
+then waits for the next day's send window and carries on until the file
+is done, the automation fails or its scheduler is cancelled. It reports
+through callbacks and never touches a UI, so the desktop app and the
+command-line runner drive the same loop.
+"""
+import logging
+
+from src.database.checkpoints import finish_checkpoint
+from src.database.checkpoints import get_completed_profiles
+from src.database.checkpoints import mark_leads_pending
+from src.database.checkpoints import save_checkpoint
+from src.database.handlers import count_emails_sent_today
+from src.database.handlers import log_run_end
+from src.inmail.leads import count_lead_rows
+from src.inmail.leads import iter_new_leads
+from src.inmail.leads import LeadStream
+from src.inmail.personalized_email import run_selenium_automation
+from src.inmail.progress import ignore_progress
+from src.inmail.progress import LeadsDropped
+from src.inmail.progress import RunPlanned
+from src.inmail.progress import WaitingForQuota
+from src.inmail.scheduler import Scheduler
+from src.inmail.seats import run_seat_pool
+
+logger = logging.getLogger(__name__)
+
+# Outcomes of Campaign.run
+COMPLETED = 'Completed'
+INTERRUPTED = 'Interrupted'
+FAILED = 'Failed'
+
+
+class Campaign:
+    """
+    Sends a lead CSV through the automation, one day's quota at a time.
+
+    Parameters:
+    - daily_limit: function returning the daily limit of a single-profile
+      run, read before every chunk so a change applies to a running
+      campaign.
+    - seats: Recruiter seats each day's leads are sharded over; empty for
+      a single profile.
+    - on_notice: function(title, message) told about daily-limit waits.
+    - on_error: function(message) told when the automation fails.
+    - on_sent_count: function(count) given today's sent count after every
+      chunk.
+    - on_progress: function(event) given the run's plan, its waits for
+      quota and the ProgressEvents of every lead.
+    - automation_kwargs: passed on to run_selenium_automation, e.g.
+      visible_mode, control_email_sending, prompt, reference_email.
+
+    The checkpoint advances after every chunk and leads the run already
+    sent to or skipped are dropped, so a restarted run resumes. Only the
+    current day's chunk is held in memory.
+    """
+
+    def __init__(
+        self,
+        file_path,
+        run_id,
+        daily_limit,
+        scheduler: Scheduler = None,
+        start_row: int = 0,
+        seats=(),
+        on_notice=None,
+        on_error=None,
+        on_sent_count=None,
+        on_progress=None,
+        **automation_kwargs,
+    ):
+        self.file_path = file_path
+        self.run_id = run_id
+        self.daily_limit = daily_limit
+        self.scheduler = scheduler or Scheduler()
+        self.start_row = start_row
+        self.seats = list(seats)
+        self.on_notice = on_notice
+        self.on_error = on_error
+        self.on_sent_count = on_sent_count
+        self.on_progress = on_progress or ignore_progress
+        self.automation_kwargs = dict(
+            automation_kwargs, on_progress=self.on_progress,
+        )
+        self.processed_rows = 0
+        self.error = None
+
+    def cancel(self):
+        """Stop the campaign at its next wait or send."""
+        self.scheduler.cancel()
+
+    def notice(self, title, message):
+        logger.info(message)
+        if self.on_notice:
+            self.on_notice(title, message)
+
+    def report_sent_count(self) -> int:
+        emails_sent_today = count_emails_sent_today()
+        if self.on_sent_count:
+            self.on_sent_count(emails_sent_today)
+        return emails_sent_today
+
+    def get_quota(self) -> int:
+        if self.seats:
+            return sum(seat.daily_limit for seat in self.seats)
+        return self.daily_limit()
+
+    def before_send(self):
+        # Spread what is left of today's quota over the send window
+        remaining = self.get_quota() - count_emails_sent_today()
+        return self.scheduler.wait_for_send_slot(max(remaining, 1))
+
+    def wait_for_window(self) -> bool:
+        start = self.scheduler.next_window_start()
+        if start > self.scheduler.now():
+            self.on_progress(
+                WaitingForQuota(until=start.timestamp(), reason='send_window'),
+            )
+        return self.scheduler.wait_for_window()
+
+    def wait_for_next_day(self) -> bool:
+        self.on_progress(
+            WaitingForQuota(
+                until=self.scheduler.next_day_start().timestamp(),
+                reason='daily_limit',
+            ),
+        )
+        return self.scheduler.wait_for_next_day()
+
+    def automation_done(self, success, message):
+        if not success and not self.scheduler.cancelled:
+            self.error = message
+            if self.on_error:
+                self.on_error(message)
+
+    def checkpoint(self, handled_leads):
+        # A stopped or failed chunk may have leads left; their states cover
+        # them and the next start re-reads the chunk.
+        if handled_leads and not self.scheduler.cancelled and not self.error:
+            save_checkpoint(
+                self.run_id,
+                self.file_path,
+                next_row=handled_leads[-1].index + 1,
+            )
+
+    def run(self) -> str:
+        """
+        Process the whole file. Returns COMPLETED, INTERRUPTED (cancelled)
+        or FAILED (the automation reported an error).
+        """
+        self.on_progress(
+            RunPlanned(
+                total_rows=count_lead_rows(self.file_path),
+                start_row=self.start_row,
+                daily_quota=self.get_quota() if self.seats else None,
+            ),
+        )
+        leads = LeadStream(
+            iter_new_leads(
+                self.file_path,
+                start_row=self.start_row,
+                completed=get_completed_profiles(self.run_id),
+                on_dropped=lambda count: self.on_progress(
+                    LeadsDropped(count=count),
+                ),
+            ),
+        )
+        while leads.has_more() and not self.scheduler.cancelled:
+            if not self.wait_for_window():
+                break
+            if self.seats:
+                self.run_seats_day(leads)
+            else:
+                self.run_day(leads)
+            if self.error:
+                return FAILED
+
+        if self.scheduler.cancelled:
+            log_run_end(
+                self.run_id, status=INTERRUPTED,
+                error_message='Run was stopped.',
+            )
+            return INTERRUPTED
+
+        finish_checkpoint(self.run_id)
+        return COMPLETED
+
+    def run_day(self, leads):
+        """Send as many leads as today's limit allows from one profile."""
+        emails_sent_today = self.report_sent_count()
+        daily_limit = self.daily_limit()
+
+        # If we are already at or above today's limit, wait until next day
+        if emails_sent_today >= daily_limit:
+            self.notice(
+                'Daily Limit Reached',
+                f"You've reached today's limit of {daily_limit}. "
+                'Waiting until next day to continue...',
+            )
+            self.wait_for_next_day()
+            return
+
+        chunk_data = leads.take(daily_limit - emails_sent_today)
+        mark_leads_pending(self.run_id, chunk_data)
+        run_selenium_automation(
+            data=chunk_data,
+            run_id=self.run_id,
+            callback=self.automation_done,
+            before_send=self.before_send,
+            **self.automation_kwargs,
+        )
+        self.checkpoint(chunk_data)
+        self.processed_rows += len(chunk_data)
+
+        emails_sent_today = self.report_sent_count()
+        if self.error or not leads.has_more():
+            return
+        # Check how many we have now (in case chunk < daily_limit)
+        if emails_sent_today >= daily_limit:
+            logger.info("Today's limit is fully used. Waiting until next day.")
+            self.wait_for_next_day()
+
+    def run_seats_day(self, leads):
+        """
+        Shard a day's leads over the seats; each seat's own daily limit
+        decides how many go out today.
+        """
+        batch = leads.take(self.get_quota())
+        mark_leads_pending(self.run_id, batch)
+        handled = run_seat_pool(
+            data=batch,
+            seats=self.seats,
+            run_id=self.run_id,
+            callback=self.automation_done,
+            before_send=self.before_send,
+            **self.automation_kwargs,
+        )
+        leads.put_back(batch[handled:])
+        self.checkpoint(batch[:handled])
+        self.processed_rows += handled
+        self.report_sent_count()
+        if leads.has_more() and not self.error:
+            self.notice(
+                'Daily Limit Reached',
+                'All seats reached their daily limit. '
+                'Waiting until next day to continue...',
+            )
+            self.wait_for_next_day()
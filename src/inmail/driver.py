@@ -0,0 +1,173 @@
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+import psutil
+import undetected_chromedriver as uc
+
+from src.config import settings
+from src.inmail.utils import get_user_data_dir
+
+logger = logging.getLogger(__name__)
+
+# undetected_chromedriver patches a shared chromedriver binary on launch,
+# so parallel seats must not start Chrome at the same time.
+_launch_lock = threading.Lock()
+
+
+def create_driver(visible_mode, user_data_dir=None):
+    """Launch Chrome with the automation profile and stealth patches."""
+    if user_data_dir is None:
+        user_data_dir = get_user_data_dir()
+
+    # Set up Selenium WebDriver options
+    options = uc.ChromeOptions()
+
+    if not visible_mode:
+        options.add_argument('--headless')
+    logger.info(f"Chrome directory: {user_data_dir}")
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--start-maximized')
+    options.add_argument(f"--user-data-dir={user_data_dir}")
+
+    with _launch_lock:
+        driver = uc.Chrome(
+            options=options,
+            version_main=settings.CHROME_VERSION_MAIN,
+        )
+
+    from selenium_stealth import stealth
+
+    stealth(
+        driver,
+        languages=['en-US', 'en'],
+        vendor='Google Inc.',
+        platform='Win32',
+        webgl_vendor='Intel Inc.',
+        renderer='Intel Iris OpenGL Engine',
+        fix_hairline=True,
+    )
+    time.sleep(random.uniform(2, 10))
+    return driver
+
+
+def get_browser_memory_mb(driver) -> float | None:
+    """Resident memory of the Chrome process tree, None if unknown."""
+    pid = getattr(driver, 'browser_pid', None)
+    if not pid:
+        return None
+    try:
+        process = psutil.Process(pid)
+        processes = [process, *process.children(recursive=True)]
+        rss = 0
+        for proc in processes:
+            try:
+                rss += proc.memory_info().rss
+            except psutil.Error:
+                continue
+        return rss / (1024 * 1024)
+    except psutil.Error:
+        return None
+
+
+@dataclass
+class RecyclePolicy:
+    max_rows: int = settings.DRIVER_RECYCLE_ROWS
+    max_memory_growth_mb: float = settings.DRIVER_RECYCLE_MEMORY_GROWTH_MB
+    max_error_streak: int = settings.DRIVER_RECYCLE_ERROR_STREAK
+
+
+class DriverManager:
+    """
+    Owns the Chrome session of a run and decides when to recycle it.
+
+    The browser is relaunched when the session has handled `max_rows` rows,
+    when Chrome has grown by more than `max_memory_growth_mb` since launch,
+    or after `max_error_streak` consecutive failed rows. A limit of 0
+    disables that check.
+    """
+
+    def __init__(
+        self,
+        visible_mode,
+        user_data_dir=None,
+        policy: RecyclePolicy = None,
+        factory=create_driver,
+    ):
+        self.visible_mode = visible_mode
+        self.user_data_dir = user_data_dir
+        self.policy = policy or RecyclePolicy()
+        self.factory = factory
+        self.driver = None
+        self.rows_since_launch = 0
+        self.error_streak = 0
+        self.baseline_memory_mb = None
+        self.launch_times = []
+        self.recycle_count = 0
+
+    def start(self):
+        started = time.perf_counter()
+        self.driver = self.factory(
+            self.visible_mode,
+            user_data_dir=self.user_data_dir,
+        )
+        self.launch_times.append(time.perf_counter() - started)
+        self.rows_since_launch = 0
+        self.error_streak = 0
+        self.baseline_memory_mb = get_browser_memory_mb(self.driver)
+        logger.info(
+            f"ChromeDriver launched in {self.launch_times[-1]:.1f}s.",
+        )
+        return self.driver
+
+    def quit(self):
+        if self.driver:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                logger.warning(f"Failed to quit ChromeDriver: {e}")
+            self.driver = None
+
+    def record_row(self, success: bool):
+        self.rows_since_launch += 1
+        self.error_streak = 0 if success else self.error_streak + 1
+
+    def recycle_reason(self) -> str | None:
+        policy = self.policy
+        if policy.max_rows and self.rows_since_launch >= policy.max_rows:
+            return f"{self.rows_since_launch} rows processed"
+        if (
+            policy.max_error_streak and
+            self.error_streak >= policy.max_error_streak
+        ):
+            return f"{self.error_streak} consecutive errors"
+        if policy.max_memory_growth_mb and self.baseline_memory_mb:
+            memory_mb = get_browser_memory_mb(self.driver)
+            if memory_mb is not None:
+                growth_mb = memory_mb - self.baseline_memory_mb
+                if growth_mb >= policy.max_memory_growth_mb:
+                    return f"memory grew by {growth_mb:.0f} MB"
+        return None
+
+    def maybe_recycle(self):
+        """Relaunch the browser if any recycle policy is triggered."""
+        reason = self.recycle_reason()
+        if reason is None:
+            return self.driver
+        logger.info(f"Restarting ChromeDriver: {reason}.")
+        self.quit()
+        self.recycle_count += 1
+        return self.start()
+
+    def metrics(self) -> dict:
+        launches = len(self.launch_times)
+        return {
+            'launches': launches,
+            'recycles': self.recycle_count,
+            'mean_launch_seconds': (
+                sum(self.launch_times) / launches if launches else 0
+            ),
+        }
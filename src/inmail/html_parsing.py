@@ -0,0 +1,66 @@
+import html
+import logging
+import re
+from functools import cache
+
+from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# BeautifulSoup tree builders in order of preference.
+PARSER_BACKENDS = ['lxml', 'html.parser']
+
+CODE_BLOB_PATTERN = re.compile(r'<code\b[^>]*>(.*?)</code>', re.DOTALL)
+
+
+@cache
+def get_parser(preferred: str = settings.HTML_PARSER) -> str:
+    """
+    Return the tree builder to use, falling back to the pure Python
+    html.parser when the preferred C-based one is not installed.
+    """
+    for parser in [preferred, *PARSER_BACKENDS]:
+        try:
+            BeautifulSoup('', parser)
+        except Exception:
+            logger.warning(f"HTML parser {parser!r} is not available.")
+            continue
+        logger.info(f"Using HTML parser {parser!r}.")
+        return parser
+    return 'html.parser'
+
+
+def parse_tags(page_source: str, tag_name: str, parser: str = None):
+    """
+    Parse only the `tag_name` subtrees of a page.
+
+    Everything outside them is skipped by the tree builder instead of being
+    materialized and thrown away.
+    """
+    soup = BeautifulSoup(
+        page_source,
+        parser or get_parser(),
+        parse_only=SoupStrainer(tag_name),
+    )
+    return soup.find_all(tag_name)
+
+
+def parse_main_tags(page_source: str, parser: str = None):
+    return parse_tags(page_source, 'main', parser=parser)
+
+
+def find_code_blobs(page_source: str, marker: str) -> list[str]:
+    """
+    Return the unescaped contents of the <code> tags containing `marker`.
+
+    A regex scan over the raw source is enough here and skips building a
+    tree; blobs without the marker are never unescaped or decoded.
+    """
+    return [
+        html.unescape(match.group(1))
+        for match in CODE_BLOB_PATTERN.finditer(page_source)
+        if marker in match.group(1)
+    ]
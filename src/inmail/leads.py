@@ -0,0 +1,262 @@
+import logging
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+
+import pandas as pd
+
+from src.config import settings
+from src.database.checkpoints import normalize_profile_url
+from src.database.contacts import get_recently_contacted
+
+logger = logging.getLogger(__name__)
+
+# Columns of the Apollo-style export the automation uses; everything else
+# in the file is never read.
+LEAD_COLUMNS = {
+    'Person Linkedin Url': str,
+    'Email': str,
+    'First Name': str,
+    'Last Name': str,
+    'Company': str,
+}
+
+REQUIRED_COLUMNS = ['Person Linkedin Url']
+
+CSV_CHUNK_SIZE = 1000
+
+
+def validate_lead_columns(file_path) -> list[str]:
+    """
+    Check the CSV header for the required columns without reading rows.
+
+    Returns the lead columns present in the file, raises ValueError if a
+    required one is missing.
+    """
+    header = pd.read_csv(file_path, nrows=0).columns
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise ValueError(
+            f"CSV must contain {', '.join(map(repr, missing))} column.",
+        )
+    return [column for column in LEAD_COLUMNS if column in header]
+
+
+@dataclass(slots=True)
+class Lead:
+    """One row of a lead CSV, as the automation needs it."""
+
+    # Position of the row in the file, as pandas would number it
+    index: int
+    linkedin_url: str
+    email: str | None = None
+    first_name: str | None = None
+    last_name: str | None = None
+    company: str | None = None
+    # True when `email` was guessed as first.last@company.com
+    email_guessed: bool = False
+
+
+def slugify_companies(companies: pd.Series) -> pd.Series:
+    """
+    Lowercase company names with spaces turned into dashes and other
+    special characters removed, as used in guessed email domains.
+    """
+    return (
+        companies.str.replace(r'[^\w\s-]', '', regex=True)
+        .str.lower()
+        .str.replace(' ', '-', regex=False)
+    )
+
+
+def guess_emails(frame: pd.DataFrame) -> pd.Series:
+    """
+    first.last@company.com for every row; missing where a name part or the
+    company is missing.
+    """
+    return (
+        frame['First Name'].str.lower() + '.' +
+        frame['Last Name'].str.lower() + '@' +
+        slugify_companies(frame['Company']) + '.com'
+    )
+
+
+@dataclass
+class LeadBatch:
+    """
+    A chunk of leads stored column by column.
+
+    Validation and email guessing run once over whole columns when the
+    batch is built; iterating it hands out one `Lead` per row.
+    """
+
+    index: list[int]
+    linkedin_url: list[str]
+    email: list[str | None]
+    first_name: list[str | None]
+    last_name: list[str | None]
+    company: list[str | None]
+    email_guessed: list[bool]
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, start: int = None):
+        """
+        Build a batch from lead rows, dropping rows without a LinkedIn URL.
+
+        Rows keep the frame's index unless `start` renumbers them.
+        """
+        frame = frame.reindex(columns=list(LEAD_COLUMNS)).astype(object)
+        if start is not None:
+            frame.index = range(start, start + len(frame))
+
+        has_url = frame['Person Linkedin Url'].notna()
+        for index in frame.index[~has_url]:
+            logger.warning(f"Skipping row {index}: no LinkedIn URL.")
+        frame = frame[has_url]
+
+        email = frame['Email']
+        email_guessed = email.isna()
+        if email_guessed.any():
+            guessed = guess_emails(frame[email_guessed].astype('string'))
+            email = email.where(~email_guessed, guessed.astype(object))
+            email_guessed &= email.notna()
+
+        def column(values: pd.Series) -> list:
+            return values.astype(object).where(values.notna(), None).tolist()
+
+        return cls(
+            index=frame.index.tolist(),
+            linkedin_url=frame['Person Linkedin Url'].tolist(),
+            email=column(email),
+            first_name=column(frame['First Name']),
+            last_name=column(frame['Last Name']),
+            company=column(frame['Company']),
+            email_guessed=email_guessed.tolist(),
+        )
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return map(
+            Lead,
+            self.index,
+            self.linkedin_url,
+            self.email,
+            self.first_name,
+            self.last_name,
+            self.company,
+            self.email_guessed,
+        )
+
+
+def iter_lead_batches(
+    file_path,
+    chunksize: int = CSV_CHUNK_SIZE,
+    start_row: int = 0,
+):
+    """
+    Stream a lead CSV as `LeadBatch`es, one chunk at a time, from row
+    `start_row` on.
+
+    Only the lead columns are parsed, as strings; lead columns the file
+    lacks are empty. Skipped rows are not parsed at all.
+    """
+    columns = validate_lead_columns(file_path)
+    start = start_row
+    for chunk in pd.read_csv(
+        file_path,
+        usecols=columns,
+        dtype={column: LEAD_COLUMNS[column] for column in columns},
+        chunksize=chunksize,
+        # Line 0 is the header
+        skiprows=range(1, start_row + 1),
+    ):
+        yield LeadBatch.from_frame(chunk, start=start)
+        start += len(chunk)
+
+
+def count_lead_rows(file_path, chunksize: int = CSV_CHUNK_SIZE * 50) -> int:
+    """Number of data rows in a lead CSV, parsing only the URL column."""
+    return sum(
+        len(chunk)
+        for chunk in pd.read_csv(
+            file_path,
+            usecols=REQUIRED_COLUMNS,
+            dtype=str,
+            chunksize=chunksize,
+        )
+    )
+
+
+def iter_leads(
+    file_path,
+    chunksize: int = CSV_CHUNK_SIZE,
+    start_row: int = 0,
+):
+    """Stream the `Lead`s of a lead CSV from row `start_row` on."""
+    for batch in iter_lead_batches(
+        file_path, chunksize=chunksize, start_row=start_row,
+    ):
+        yield from batch
+
+
+def iter_new_leads(
+    file_path,
+    start_row: int = 0,
+    completed=frozenset(),
+    cooldown_days: float = settings.CONTACT_COOLDOWN_DAYS,
+    on_dropped=None,
+):
+    """
+    Stream the leads of a CSV that still need an email.
+
+    Drops leads whose profile is in `completed` (already handled by this
+    run), repeats of a profile earlier in the file, and profiles any run
+    contacted within the cool-down window, checked one batch at a time.
+    `on_dropped(count)` is told how many leads each batch dropped.
+    """
+    seen = set(completed)
+    for batch in iter_lead_batches(file_path, start_row=start_row):
+        profile_keys = list(map(normalize_profile_url, batch.linkedin_url))
+        contacted = get_recently_contacted(profile_keys, cooldown_days)
+        dropped = 0
+        for lead, profile_key in zip(batch, profile_keys):
+            if profile_key in seen or profile_key in contacted:
+                dropped += 1
+                continue
+            seen.add(profile_key)
+            yield lead
+        if dropped:
+            logger.info(
+                f"Skipped {dropped} already handled or recently contacted "
+                'leads.',
+            )
+            if on_dropped:
+                on_dropped(dropped)
+
+
+class LeadStream:
+    """
+    Leads handed out in batches, with a look-ahead to tell whether any are
+    left and a way to return the ones a batch did not get to.
+    """
+
+    def __init__(self, leads):
+        self._leads = iter(leads)
+        self._buffer = deque()
+
+    def has_more(self) -> bool:
+        if not self._buffer:
+            self._buffer.extend(islice(self._leads, 1))
+        return bool(self._buffer)
+
+    def take(self, count: int) -> list:
+        batch = []
+        while self._buffer and len(batch) < count:
+            batch.append(self._buffer.popleft())
+        batch.extend(islice(self._leads, count - len(batch)))
+        return batch
+
+    def put_back(self, leads):
+        self._buffer.extendleft(reversed(leads))
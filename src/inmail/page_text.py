@@ -0,0 +1,184 @@
+import logging
+import re
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Rough OpenAI average for English text, good enough for budgeting.
+CHARS_PER_TOKEN = 4
+
+# Sections kept for the summarizer, in priority order for the budget.
+PROFILE_SECTIONS = ['about', 'experience', 'skills']
+
+# Lines at least this long are de-duplicated across the whole page.
+MIN_DEDUPLICATED_LENGTH = 30
+
+NOISE_LINES = {
+    'connect',
+    'endorse',
+    'follow',
+    'message',
+    'more',
+    'see more',
+    'show all',
+    'show more',
+    'show less',
+    'contact info',
+    '…see more',
+    '...see more',
+    '·',
+}
+NOISE_PATTERNS = [
+    re.compile(r'^show all \d+ .*$', re.IGNORECASE),
+    re.compile(r'^\d+ endorsements?$', re.IGNORECASE),
+    re.compile(r'^endorsed by .*$', re.IGNORECASE),
+    re.compile(
+        r'^\d+(st|nd|rd|th)?\+? (degree )?connections?$', re.IGNORECASE,
+    ),
+]
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN
+
+
+def is_noise(line: str) -> bool:
+    lowered = line.lower()
+    if lowered in NOISE_LINES:
+        return True
+    return any(pattern.match(line) for pattern in NOISE_PATTERNS)
+
+
+def clean_lines(text: str, seen: set, title: str = None) -> list[str]:
+    """
+    Split text into stripped lines, dropping noise and repeated lines.
+
+    Short lines (company names, dates) are only dropped when they repeat
+    back to back; longer lines are dropped if they appeared anywhere before.
+    """
+    lines = []
+    for line in text.splitlines():
+        line = ' '.join(line.split())
+        if not line or is_noise(line):
+            continue
+        if title and line.lower() == title:
+            continue
+        if lines and lines[-1] == line:
+            continue
+        if len(line) >= MIN_DEDUPLICATED_LENGTH:
+            if line in seen:
+                continue
+            seen.add(line)
+        lines.append(line)
+    return lines
+
+
+def get_section_name(section) -> str | None:
+    """Identify a profile <section> by its anchor id or heading text."""
+    anchor = section.find(id=True)
+    if anchor and anchor['id'].lower() in PROFILE_SECTIONS:
+        return anchor['id'].lower()
+    heading = section.find(['h2', 'h3'])
+    if heading:
+        heading_text = heading.get_text(' ', strip=True).lower()
+        for name in PROFILE_SECTIONS:
+            if heading_text.startswith(name):
+                return name
+    return None
+
+
+def fit_to_budget(blocks: list[tuple[str, list[str]]], token_budget: int):
+    """
+    Keep whole lines of each block in order until the budget is spent,
+    counting the block titles and separators too.
+    """
+    remaining = token_budget * CHARS_PER_TOKEN
+    fitted = []
+    for title, lines in blocks:
+        # 'Title:\n', after a blank line unless it is the first block
+        left = remaining - len(title) - 2 - (2 if fitted else 0)
+        kept = []
+        for line in lines:
+            if len(line) + 1 > left:
+                break
+            kept.append(line)
+            left -= len(line) + 1
+        if kept:
+            fitted.append((title, kept))
+            remaining = left
+        if remaining <= 0:
+            break
+    return fitted
+
+
+def extract_profile_text(
+    main_tags,
+    token_budget: int = settings.PAGE_TEXT_TOKEN_BUDGET,
+) -> str:
+    """
+    Reduce the <main> tags of a profile page to the parts the summarizer
+    needs: name, headline, about, experience and skills.
+
+    Screen-reader duplicates, buttons and repeated lines are dropped and the
+    result is cut to roughly `token_budget` tokens. If no known sections are
+    found the de-duplicated text of the whole tag is used instead.
+    """
+    seen = set()
+    blocks = []
+    fallback_lines = []
+    for main in main_tags:
+        for hidden in main.select('.visually-hidden'):
+            hidden.decompose()
+
+        name = main.find('h1')
+        if name:
+            blocks.append(
+                ('Name', clean_lines(name.get_text(' ', strip=True), seen)),
+            )
+            headline = name.find_next(class_='text-body-medium')
+            if headline:
+                blocks.append(
+                    (
+                        'Headline',
+                        clean_lines(headline.get_text(' ', strip=True), seen),
+                    ),
+                )
+
+        sections = {}
+        for section in main.find_all('section'):
+            section_name = get_section_name(section)
+            if section_name and section_name not in sections:
+                sections[section_name] = section
+
+        for section_name in PROFILE_SECTIONS:
+            section = sections.get(section_name)
+            if section is None:
+                continue
+            text = section.get_text('\n', strip=True)
+            blocks.append(
+                (
+                    section_name.title(),
+                    clean_lines(text, seen, title=section_name),
+                ),
+            )
+
+        if not sections:
+            text = main.get_text('\n', strip=True)
+            fallback_lines += clean_lines(text, seen)
+
+    has_sections = any(
+        lines for title, lines in blocks
+        if title.lower() in PROFILE_SECTIONS
+    )
+    if not has_sections:
+        blocks.append(('Profile', fallback_lines))
+
+    fitted = fit_to_budget(blocks, token_budget)
+    profile_text = '\n\n'.join(
+        f"{title}:\n" + '\n'.join(lines) for title, lines in fitted
+    )
+    logger.debug(
+        f"Trimmed profile text to ~{estimate_tokens(profile_text)} tokens.",
+    )
+    return profile_text
@@ -1,517 +1,772 @@
 import json
 import logging
-import random
 import time
 import traceback
 
 import pandas as pd
-import undetected_chromedriver as uc
 from selenium.common.exceptions import NoSuchElementException
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 
-from src.agents.main import generate_personal_email
+from src.agents.cache import llm_cache
+from src.database.checkpoints import DRAFTED
+from src.database.checkpoints import mark_lead_state
+from src.database.checkpoints import SKIPPED
+from src.database.contacts import is_profile_id_contacted
 from src.database.handlers import log_email
 from src.database.handlers import log_run_end
-from src.inmail.utils import get_user_data_dir
+from src.inmail.driver import DriverManager
+from src.inmail.html_parsing import find_code_blobs
+from src.inmail.html_parsing import parse_main_tags
+from src.inmail.leads import Lead
+from src.inmail.leads import LeadBatch
+from src.inmail.page_text import extract_profile_text
+from src.inmail.pipeline import DEFAULT_LOOKAHEAD
+from src.inmail.pipeline import DraftPipeline
+from src.inmail.progress import ignore_progress
+from src.inmail.progress import RowDrafted
+from src.inmail.progress import RowFailed
+from src.inmail.progress import RowScraped
+from src.inmail.progress import RowSent
+from src.inmail.progress import RowSkipped
+from src.inmail.progress import RowStarted
 from src.inmail.utils import inject_key_listeners
-from src.inmail.utils import slugify_company
 from src.inmail.utils import wait_for_key_signal
+from src.inmail.waits import current_page
+from src.inmail.waits import page_replaced
+from src.inmail.waits import WaitPolicy
 
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
 
-def run_selenium_automation(
-    data,
-    visible_mode,
-    control_email_sending,
-    prompt: str = None,
-    reference_email: str = None,
-    run_id: int = None,
-    callback=None,
+def extract_page_text(page_source):
+    """Collect the profile sections of the <main> tags of a profile page."""
+    return extract_profile_text(parse_main_tags(page_source))
+
+
+def extract_profile_id(page_source):
+    """Extract the Recruiter profile ID from the page's <code> JSON blobs."""
+    profile_id = None
+    for code_content in find_code_blobs(
+        page_source,
+        'identityDashProfilesByMemberIdentity',
+    ):
+        try:
+            data_json = json.loads(code_content)
+            profile_urn = data_json['data']['data'][
+                'identityDashProfilesByMemberIdentity'
+            ]['*elements'][
+                0
+            ]  # noqa:E501
+            profile_id = profile_urn.split(':')[-1]
+            break
+        except (json.JSONDecodeError, KeyError, IndexError) as e:
+            logger.warning(f"JSON parsing error: {e}")
+            continue
+
+    if profile_id:
+        logger.info(f"Extracted Profile ID: {profile_id}")
+    else:
+        logger.warning('Profile ID not found.')
+        raise ValueError('Profile ID extraction failed.')
+    return profile_id
+
+
+def scrape_row(
+    driver,
+    pipeline,
+    lead: Lead,
+    run_id,
+    sender_seat=None,
+    waits: WaitPolicy = None,
+    on_progress=None,
 ):
     """
-    Runs the Selenium automation process.
+    Visit the lead's LinkedIn profile and queue its email draft.
 
-    Parameters:
-    - data: pandas DataFrame containing the data to process.
-    - visible_mode: bool indicating whether to run in visible mode.
-    - control_email_sending: bool indicating whether to control email sending.
-    - prompt: str containing the user prompt.
-    - reference_email: str containing the email instructions.
-    - run_id: int containing the unique run identifier.
-    - callback: function to call upon completion or error (optional).
+    Failures are logged against the lead, which is then dropped.
+    Returns False if the lead failed.
     """
-    logger.info(f"Run ID: {run_id} - Automation started.")
-    driver = None
-    run_status = 'Running'
-    error_message = None
-    iteration_count = 0
-
+    waits = waits or WaitPolicy()
+    on_progress = on_progress or ignore_progress
+    linkedin_profile = lead.linkedin_url
+    started = time.perf_counter()
+    on_progress(RowStarted(index=lead.index, profile_url=linkedin_profile))
     try:
-        # Set up Selenium WebDriver options
-        options = uc.ChromeOptions()
-
-        if not visible_mode:
-            options.add_argument('--headless')
-        logger.info(f"Chrome directory: {get_user_data_dir()}")
-        options.add_argument('--disable-gpu')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--start-maximized')
-        options.add_argument(f"--user-data-dir={get_user_data_dir()}")
-
-        # Initialize the WebDriver
-        try:
-            driver = uc.Chrome(options=options, version_main=133)
-
-            from selenium_stealth import stealth
-
-            stealth(
-                driver,
-                languages=['en-US', 'en'],
-                vendor='Google Inc.',
-                platform='Win32',
-                webgl_vendor='Intel Inc.',
-                renderer='Intel Iris OpenGL Engine',
-                fix_hairline=True,
+        logger.info(f"Processing row {lead.index}: {linkedin_profile=}")
+        profile_email_address = lead.email
+        if profile_email_address is None:
+            raise ValueError(
+                'No email address, and no name and company to guess one.',
             )
-            time.sleep(random.uniform(2, 10))
-
-            logger.info('ChromeDriver initialized successfully.')
-        except Exception as e:
-            logger.error(
-                f"Failed to initialize ChromeDriver automatically: {e}",
-            )
-            run_status = 'Failed'
-            error_message = f"ChromeDriver Initialization Error: {e}"
-            log_run_end(
-                run_id=run_id,
-                status=run_status,
-                error_message=error_message,
+        if lead.email_guessed:
+            logger.info(
+                f"Guessed {profile_email_address=} for row {lead.index}.",
             )
-            if callback:
-                callback(success=False, message=error_message)
-            return  # Exit the function as WebDriver is essential
 
-        # Process each item in the data
-        for index, row in data.iterrows():
-            iteration_count += 1
-            if iteration_count % 2 == 0:
-                logger.info(f"Restarting ChromeDriver. {iteration_count=}")
-                driver.quit()
-                # Set up Selenium WebDriver options
-                options = uc.ChromeOptions()
-
-                if not visible_mode:
-                    options.add_argument('--headless')
-                logger.info(f"Chrome directory: {get_user_data_dir()}")
-                options.add_argument('--disable-gpu')
-                options.add_argument('--no-sandbox')
-                options.add_argument('--start-maximized')
-                options.add_argument(f"--user-data-dir={get_user_data_dir()}")
-
-                driver = uc.Chrome(options=options)
-
-                from selenium_stealth import stealth
-
-                stealth(
-                    driver,
-                    languages=['en-US', 'en'],
-                    vendor='Google Inc.',
-                    platform='Win32',
-                    webgl_vendor='Intel Inc.',
-                    renderer='Intel Iris OpenGL Engine',
-                    fix_hairline=True,
-                )
-                time.sleep(random.uniform(2, 10))
-            try:
-                email = None
-                email_status = None
-                error_message = None
-                linkedin_profile = row['Person Linkedin Url']
-                logger.info(f"Processing row {index}: {linkedin_profile=}")
-                profile_email_address = row['Email']
-                if pd.isna(profile_email_address):
-                    logger.warning(
-                        f"Guessing email for row {
-                            index
-                        } due to missing email address.",
-                    )
-                    first_name = row['First Name'].lower()
-                    last_name = row['Last Name'].lower()
-                    company_slug = slugify_company(row['Company'])
-                    profile_email_address = (
-                        f"{first_name}.{last_name}@{company_slug}.com"
-                    )
-                    logger.info(f"Guessed {profile_email_address=}")
-
-                # Force a hard reload
-                driver.execute_script('location.reload(true);')
-                time.sleep(random.uniform(4, 7))
+        # Force a hard reload
+        old_page = current_page(driver)
+        driver.execute_script('location.reload(true);')
+        waits.until(driver, 'profile_reload', page_replaced(old_page))
+
+        old_page = current_page(driver)
+        with waits.timed('profile_get'):
+            driver.get(linkedin_profile)
+        waits.until(
+            driver,
+            'profile_page',
+            EC.all_of(
+                page_replaced(old_page),
+                EC.presence_of_element_located((By.TAG_NAME, 'main')),
+            ),
+        )
 
-                driver.get(linkedin_profile)
+        page_source = driver.page_source
+        cleaned_text = extract_page_text(page_source)
+        # Log a snippet
+        logger.debug(f"Cleaned Text: {cleaned_text[:100]}...")
+
+        profile_id = extract_profile_id(page_source)
+        # The URL may differ from the one a previous run contacted
+        if is_profile_id_contacted(profile_id):
+            logger.info(
+                f"Skipping row {lead.index}: profile {profile_id} was "
+                'contacted recently.',
+            )
+            mark_lead_state(run_id, linkedin_profile, SKIPPED)
+            on_progress(
+                RowSkipped(index=lead.index, reason='Contacted recently.'),
+            )
+            return True
 
-                from bs4 import BeautifulSoup
+        on_progress(
+            RowScraped(
+                index=lead.index, seconds=time.perf_counter() - started,
+            ),
+        )
+        pipeline.submit(
+            index=lead.index,
+            linkedin_profile=linkedin_profile,
+            profile_email_address=profile_email_address,
+            profile_id=profile_id,
+            page_text=cleaned_text,
+        )
+        return True
+    except Exception as e:
+        logger.error(
+            f"Error processing profile {linkedin_profile}: {e}",
+        )  # noqa:E501
+        logger.debug(traceback.format_exc())
+        log_email(
+            run_id=run_id,
+            sender_seat=sender_seat,
+            linkedin_profile_url=linkedin_profile,
+            email_text='',
+            email_status='Failed',
+            error_message=str(e),
+        )
+        on_progress(
+            RowFailed(index=lead.index, stage='scrape', message=str(e)),
+        )
+        # Force a hard reload
+        driver.execute_script('location.reload(true);')
+        logger.info('Page refreshed.')
+        return False
 
-                full_html = driver.page_source
-                soup = BeautifulSoup(full_html, 'html.parser')
 
-                desired_tags = ['main']
-                text_from_desired_tags = []
-                for tag in soup.find_all(desired_tags):
-                    tag_text = tag.get_text(separator=' ', strip=True)
-                    if tag_text:
-                        text_from_desired_tags.append(tag_text)
+def send_row(
+    driver,
+    scraped,
+    control_email_sending,
+    run_id,
+    sender_seat=None,
+    waits: WaitPolicy = None,
+    on_progress=None,
+):
+    """
+    Wait for the drafted email of a scraped profile and send it.
 
-                cleaned_text = '\n'.join(text_from_desired_tags)
-                # Log a snippet
-                logger.debug(f"Cleaned Text: {cleaned_text[:100]}...")
+    Failures are logged against the row. Returns False if the row failed.
+    """
+    waits = waits or WaitPolicy()
+    on_progress = on_progress or ignore_progress
+    email = subject = None
+    linkedin_profile = scraped.linkedin_profile
+    try:
+        # Blocks only if the draft is not ready yet
+        with waits.timed('draft'):
+            email, subject = scraped.draft.result()
+        mark_lead_state(run_id, linkedin_profile, DRAFTED)
+        on_progress(
+            RowDrafted(index=scraped.index, seconds=scraped.draft_seconds),
+        )
 
-                # Generate the personal email
-                email, subject = generate_personal_email(
-                    page_summary=cleaned_text,
-                    user_prompt=prompt,
-                    email_instructions=reference_email,
-                )
+        started = time.perf_counter()
+        email_status, error_message = send_personal_email(
+            driver=driver,
+            run_id=run_id,
+            linkedin_profile=linkedin_profile,
+            profile_id=scraped.profile_id,
+            profile_email_address=scraped.profile_email_address,
+            email=email,
+            subject=subject,
+            control_email_sending=control_email_sending,
+            sender_seat=sender_seat,
+            waits=waits,
+        )
+        if email_status == 'Sent':
+            on_progress(
+                RowSent(
+                    index=scraped.index,
+                    seconds=time.perf_counter() - started,
+                ),
+            )
+        elif email_status == 'Skipped':
+            on_progress(RowSkipped(index=scraped.index, reason=error_message))
+        else:
+            on_progress(
+                RowFailed(
+                    index=scraped.index, stage='send', message=error_message,
+                ),
+            )
+        if email_status != 'Sent':
+            return True
 
-                # Extract profile ID from <code> elements
-                code_elements = driver.find_elements(By.TAG_NAME, 'code')
-                profile_id = None
-                for code_element in code_elements:
-                    code_content = code_element.get_attribute('innerHTML')
-                    if 'identityDashProfilesByMemberIdentity' in code_content:
-                        try:
-                            data_json = json.loads(code_content)
-                            profile_urn = data_json['data']['data'][
-                                'identityDashProfilesByMemberIdentity'
-                            ]['*elements'][
-                                0
-                            ]  # noqa:E501
-                            profile_id = profile_urn.split(':')[-1]
-                            break
-                        except (json.JSONDecodeError, KeyError) as e:
-                            logger.warning(f"JSON parsing error: {e}")
-                            continue
-
-                if profile_id:
-                    logger.info(f"Extracted Profile ID: {profile_id}")
-                else:
-                    logger.warning('Profile ID not found.')
-                    raise ValueError('Profile ID extraction failed.')
-
-                # Navigate to the messaging composer
-                logger.debug(
-                    f"Navigate to https://www.linkedin.com/talent/profile/{
-                        profile_id
-                    }",
-                )
-                driver.get(
-                    f"https://www.linkedin.com/talent/profile/{profile_id}",
-                )
+        waits.pause('pacing')
+        # Force a hard reload
+        driver.execute_script('location.reload(true);')
+        logger.info('Page refreshed.')
+        return True
 
-                time.sleep(random.uniform(10, 20))
+    except Exception as e:
+        email_status = 'Failed'
+        error_message = str(e)
+        logger.error(
+            f"Error processing profile {linkedin_profile}: {e}",
+        )  # noqa:E501
+        logger.debug(traceback.format_exc())
+        # Log the error for this email
+        log_email(
+            run_id=run_id,
+            sender_seat=sender_seat,
+            linkedin_profile_url=linkedin_profile,
+            email_text=email if email else '',
+            subject=subject,
+            email_status=email_status,
+            error_message=error_message,
+        )
+        on_progress(
+            RowFailed(index=scraped.index, stage='send', message=str(e)),
+        )
+        # Force a hard reload
+        driver.execute_script('location.reload(true);')
+        logger.info('Page refreshed.')
+        return False
+
+
+def send_personal_email(
+    driver,
+    run_id,
+    linkedin_profile,
+    profile_id,
+    profile_email_address,
+    email,
+    subject,
+    control_email_sending,
+    sender_seat=None,
+    waits: WaitPolicy = None,
+):
+    """
+    Open the Recruiter composer for a profile, fill it in and send it.
 
-                # Wait for the contact info element to load
-                contact_info = driver.find_element(
-                    By.CLASS_NAME,
-                    'contact-info',
-                )
+    Returns the email_status logged for the row ('Sent', 'Failed' or
+    'Skipped'; None if nothing was logged) and its error message.
+    """
+    waits = waits or WaitPolicy()
+    email_status = None
+    error_message = None
 
-                # Check if an email already exists
-                try:
-                    existing_email = contact_info.find_element(
-                        By.XPATH,
-                        './/span[@data-test-contact-email-address]',
-                    )
-                    logger.debug(f"Email found: {existing_email.text}")
-                except NoSuchElementException:
-                    # If no email exists, look for the "Add email" button
-                    logger.debug(
-                        "No email found. Looking for 'Add email' button...",
-                    )
-                    add_email_button = driver.find_element(
-                        By.XPATH,
-                        ".//button[@class='button-small-muted-tertiary contact-info__add']",  # noqa:E501
-                    )
-                    logger.debug("Clicking on the 'Add email' button...")
-                    add_email_button.click()
-                    # Wait for the email input field to appear
-                    email_input = driver.find_element(
-                        By.XPATH,
-                        ".//input[@type='email']",
-                    )
+    # Navigate to the messaging composer
+    logger.debug(
+        f"Navigate to https://www.linkedin.com/talent/profile/{
+            profile_id
+        }",
+    )
+    with waits.timed('talent_profile_get'):
+        driver.get(
+            f"https://www.linkedin.com/talent/profile/{profile_id}",
+        )
 
-                    logger.debug('Email input field found. Sending keys...')
-                    email_input.send_keys(profile_email_address)
-                    logger.debug("Clicking on the 'Save' button...")
+    # Wait for the contact info element to load
+    contact_info = waits.until(
+        driver,
+        'talent_profile',
+        EC.presence_of_element_located((By.CLASS_NAME, 'contact-info')),
+    )
 
-                    # Simulate pressing the Enter key
-                    email_input.send_keys(Keys.ENTER)
-                    logger.debug('Email saved')
-                    # Wait for the email to be saved
-                    time.sleep(random.uniform(4, 7))
+    # Check if an email already exists
+    try:
+        existing_email = contact_info.find_element(
+            By.XPATH,
+            './/span[@data-test-contact-email-address]',
+        )
+        logger.debug(f"Email found: {existing_email.text}")
+    except NoSuchElementException:
+        # If no email exists, look for the "Add email" button
+        logger.debug(
+            "No email found. Looking for 'Add email' button...",
+        )
+        add_email_button = waits.until(
+            driver,
+            'add_email_button',
+            EC.element_to_be_clickable(
+                (
+                    By.XPATH,
+                    ".//button[@class='button-small-muted-tertiary contact-info__add']",  # noqa:E501
+                ),
+            ),
+        )
+        logger.debug("Clicking on the 'Add email' button...")
+        add_email_button.click()
+        # Wait for the email input field to appear
+        email_input = waits.until(
+            driver,
+            'add_email',
+            EC.visibility_of_element_located(
+                (By.XPATH, ".//input[@type='email']"),
+            ),
+        )
 
-                driver.refresh()
-                time.sleep(random.uniform(4, 7))
+        logger.debug('Email input field found. Sending keys...')
+        email_input.send_keys(profile_email_address)
+        logger.debug("Clicking on the 'Save' button...")
+
+        # Simulate pressing the Enter key
+        email_input.send_keys(Keys.ENTER)
+        logger.debug('Email saved')
+        # Wait for the email to be saved
+        waits.until(
+            driver,
+            'save_email',
+            EC.invisibility_of_element(email_input),
+            required=False,
+        )
 
-                email_button = driver.find_element(
+    driver.refresh()
+
+    email_button = waits.until(
+        driver,
+        'message_button',
+        EC.element_to_be_clickable(
+            (
+                By.XPATH,
+                "//button[contains(@class, 'artdeco-button') and contains(@data-live-test-component, 'message-icon-btn')]",  # noqa:E501
+            ),
+        ),
+    )
+    email_button.click()
+
+    # Locate the parent element
+    send_info = waits.until(
+        driver,
+        'composer',
+        EC.visibility_of_element_located(
+            (
+                By.XPATH,
+                "//div[contains(@class, 'single-message-composer__trigger-message')]",  # noqa:E501
+            ),
+        ),
+    )
+
+    # Extract the text
+    text_content = send_info.text.strip()
+
+    # Check the content
+    if 'Send immediately via InMail' in text_content:
+        logger.info(
+            'The text indicates "Send immediately via InMail".',
+        )
+        # Wait for the settings button and click it
+        settings_button = waits.until(
+            driver,
+            'settings_button',
+            EC.element_to_be_clickable(
+                (
                     By.XPATH,
-                    "//button[contains(@class, 'artdeco-button') and contains(@data-live-test-component, 'message-icon-btn')]",  # noqa:E501
-                )
-                email_button.click()
-                time.sleep(random.uniform(4, 7))
+                    "//button[contains(@class, 'single-message-composer__trigger-message-gear-icon')]",  # noqa:E501
+                ),
+            ),
+        )
+        settings_button.click()
+
+        # Wait for the modal to become visible
+        waits.until(
+            driver,
+            'channel_settings',
+            EC.visibility_of_element_located(
+                (By.XPATH, "//div[contains(@class, 'inline-modal__overlay')]"),
+            ),
+        )
 
-                # Locate the parent element
-                send_info = driver.find_element(
+        # Locate the "Email" radio button by its value and click it
+        # email_radio_button = WebDriverWait(driver, 10).until(
+        #     EC.presence_of_element_located(
+        #         (
+        #             By.XPATH,
+        #             "//input[@type='radio' and @value='EMAIL']",
+        #         ),
+        #     ),
+        # )
+        # Locate the label by ensuring its 'for' attribute starts with "EMAIL-" and its visible text is "Email"
+        email_radio_button = waits.until(
+            driver,
+            'email_channel',
+            EC.element_to_be_clickable(
+                (
                     By.XPATH,
-                    "//div[contains(@class, 'single-message-composer__trigger-message')]",  # noqa:E501
-                )
-
-                # Extract the text
-                text_content = send_info.text.strip()
-
-                # Check the content
-                if 'Send immediately via InMail' in text_content:
-                    logger.info(
-                        'The text indicates "Send immediately via InMail".',
-                    )
-                    # Locate the button using find_element and click it
-                    settings_button = driver.find_element(
-                        By.XPATH,
-                        "//button[contains(@class, 'single-message-composer__trigger-message-gear-icon')]",  # noqa:E501
-                    )
-                    settings_button.click()
-                    time.sleep(random.uniform(3, 6))
-
-                    # Wait for the modal to become visible
-
-                    modal = driver.find_element(
-                        By.XPATH,
-                        "//div[contains(@class, 'inline-modal__overlay')]",
-                    )
-                    time.sleep(random.uniform(4, 6))
-
-                    # Locate the "Email" radio button by its value and click it
-                    # email_radio_button = WebDriverWait(driver, 10).until(
-                    #     EC.presence_of_element_located(
-                    #         (
-                    #             By.XPATH,
-                    #             "//input[@type='radio' and @value='EMAIL']",
-                    #         ),
-                    #     ),
-                    # )
-                    # Locate the label by ensuring its 'for' attribute starts with "EMAIL-" and its visible text is "Email"
-                    email_radio_button = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable(
-                            (
-                                By.XPATH,
-                                "//label[starts-with(@for, 'EMAIL-') and normalize-space(text())='Email']",
-                            ),
-                        ),
-                    )
-                    # Scroll the element into view
-                    driver.execute_script(
-                        "arguments[0].scrollIntoView({block: 'center'});",
-                        email_radio_button,
-                    )
-
-                    time.sleep(random.uniform(4, 6))
+                    "//label[starts-with(@for, 'EMAIL-') and normalize-space(text())='Email']",
+                ),
+            ),
+        )
+        # Scroll the element into view
+        driver.execute_script(
+            "arguments[0].scrollIntoView({block: 'center'});",
+            email_radio_button,
+        )
 
-                    # Use JavaScript to ensure the exact element is clicked
-                    driver.execute_script(
-                        'arguments[0].click();',
-                        email_radio_button,
-                    )
+        # Use JavaScript to ensure the exact element is clicked
+        driver.execute_script(
+            'arguments[0].click();',
+            email_radio_button,
+        )
 
-                    # # Optional: Click the "Save" button in the modal
-                    # save_button = modal.find_element(
-                    #     By.XPATH,
-                    #     "//button[contains(@class, 'artdeco-button--secondary') and span[text()='Save']]",  # noqa:E501
-                    # )
-                    # save_button.click()
-                    # Locate the Save button by finding the <span> with text "Save" and then its parent <button>
-                    save_button = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable(
-                            (
-                                By.XPATH,
-                                "//span[normalize-space(text())='Save']/ancestor::button",
-                            ),
-                        ),
-                    )
+        # # Optional: Click the "Save" button in the modal
+        # save_button = modal.find_element(
+        #     By.XPATH,
+        #     "//button[contains(@class, 'artdeco-button--secondary') and span[text()='Save']]",  # noqa:E501
+        # )
+        # save_button.click()
+        # Locate the Save button by finding the <span> with text "Save" and then its parent <button>
+        save_button = waits.until(
+            driver,
+            'save_channel',
+            EC.element_to_be_clickable(
+                (
+                    By.XPATH,
+                    "//span[normalize-space(text())='Save']/ancestor::button",
+                ),
+            ),
+        )
 
-                    # Scroll the Save button into view
-                    driver.execute_script(
-                        "arguments[0].scrollIntoView({block: 'center'});", save_button,
-                    )
+        # Scroll the Save button into view
+        driver.execute_script(
+            "arguments[0].scrollIntoView({block: 'center'});", save_button,
+        )
 
-                    # Click the Save button
-                    save_button.click()
+        # Click the Save button
+        save_button.click()
 
-                    try:
-                        # Locate the <h3> element
-                        error_message_element = driver.find_element(
-                            By.XPATH,
-                            "//h3[contains(@class, 'trigger-conditions-modal__message-channel-error')]",  # noqa:E501
-                        )
-
-                        # Check if the element is visible
-                        if error_message_element.is_displayed():
-                            logger.warning(
-                                'Error message. No recipient email found. Select InMail instead.',  # noqa:E501
-                            )
-                            # Force a hard reload
-                            driver.execute_script('location.reload(true);')
-                            continue
-                        else:
-                            logger.info(
-                                'Error message is not visible. Continue with Email.',  # noqa:E501
-                            )
-                    except NoSuchElementException:
-                        logger.debug('Error message element not found.')
-
-                elif 'Send immediately via Email' in text_content:
-                    logger.info(
-                        "The text indicates 'Send immediately via Email'.",
-                    )
-                else:
-                    logger.warning('The text for send is changed.')
+        try:
+            # Locate the <h3> element
+            error_message_element = driver.find_element(
+                By.XPATH,
+                "//h3[contains(@class, 'trigger-conditions-modal__message-channel-error')]",  # noqa:E501
+            )
 
-                # Locate and interact with the subject input field
-                subject_input = driver.find_element(
-                    By.CSS_SELECTOR,
-                    "input[aria-label='Message subject'][placeholder='Add a subject']",  # noqa:E501
+            # Check if the element is visible
+            if error_message_element.is_displayed():
+                logger.warning(
+                    'Error message. No recipient email found. Select InMail instead.',  # noqa:E501
                 )
-                subject_input.click()
-                subject_input.send_keys(subject)
-
-                # Locate and interact with the email editor
-                editor = driver.find_element(
-                    By.CSS_SELECTOR,
-                    ".ql-editor[contenteditable='true']",
+                # Force a hard reload
+                driver.execute_script('location.reload(true);')
+                return None, 'No recipient email found.'
+            else:
+                logger.info(
+                    'Error message is not visible. Continue with Email.',  # noqa:E501
                 )
-                editor.click()
+        except NoSuchElementException:
+            logger.debug('Error message element not found.')
 
-                # Type the email in chunks to mimic human typing
-                chunk_size = 20
-                for i in range(0, len(email), chunk_size):
-                    editor.send_keys(email[i: i + chunk_size])
+    elif 'Send immediately via Email' in text_content:
+        logger.info(
+            "The text indicates 'Send immediately via Email'.",
+        )
+    else:
+        logger.warning('The text for send is changed.')
+
+    # Locate and interact with the subject input field
+    subject_input = waits.until(
+        driver,
+        'subject',
+        EC.element_to_be_clickable(
+            (
+                By.CSS_SELECTOR,
+                "input[aria-label='Message subject'][placeholder='Add a subject']",  # noqa:E501
+            ),
+        ),
+    )
+    subject_input.click()
+    subject_input.send_keys(subject)
+
+    # Locate and interact with the email editor
+    editor = waits.until(
+        driver,
+        'editor',
+        EC.element_to_be_clickable(
+            (By.CSS_SELECTOR, ".ql-editor[contenteditable='true']"),
+        ),
+    )
+    editor.click()
+
+    # Type the email in chunks to mimic human typing
+    chunk_size = 20
+    with waits.timed('typing'):
+        for i in range(0, len(email), chunk_size):
+            editor.send_keys(email[i: i + chunk_size])
+
+    # Control email sending if required
+    if control_email_sending:
+        inject_key_listeners(driver)
 
-                # Control email sending if required
-                if control_email_sending:
-                    inject_key_listeners(driver)
+        try:
+            pressed_key = wait_for_key_signal(
+                driver,
+                timeout=300,
+            )  # 5 minutes
+            logger.info(f"Key pressed: {pressed_key}")
 
-                    try:
-                        pressed_key = wait_for_key_signal(
-                            driver,
-                            timeout=300,
-                        )  # 5 minutes
-                        logger.info(f"Key pressed: {pressed_key}")
-
-                        if pressed_key == 'Enter':
-                            logger.info(
-                                'Enter key was pressed. Proceeding with email sending.',  # noqa:E501
-                            )
-                        elif pressed_key == 'Backspace':
-                            logger.info(
-                                'Backspace key was pressed. Skipping email sending.',  # noqa:E501
-                            )
-                            email_status = 'Skipped'
-                            log_email(
-                                run_id=run_id,
-                                linkedin_profile_url=linkedin_profile,
-                                email_text=email,
-                                email_status=email_status,
-                                error_message='User skipped sending.',
-                            )
-                            continue
-                        else:
-                            logger.warning('Unrecognized key press detected.')
-                            email_status = 'Failed'
-                            error_message = 'Unrecognized key press.'
-                            log_email(
-                                run_id=run_id,
-                                linkedin_profile_url=linkedin_profile,
-                                email_text=email,
-                                email_status=email_status,
-                                error_message=error_message,
-                            )
-                            continue
-                    except TimeoutException:
-                        logger.error(
-                            'Timeout: No key press detected within the timeout period.',  # noqa:E501
-                        )
-                        email_status = 'Failed'
-                        error_message = 'Timeout waiting for user input.'
-                        log_email(
-                            run_id=run_id,
-                            linkedin_profile_url=linkedin_profile,
-                            email_text=email,
-                            email_status=email_status,
-                            error_message=error_message,
-                        )
-                        continue
-
-                # Locate and interact with the send button
-                send_button = driver.find_element(
-                    By.CSS_SELECTOR,
-                    'button[data-live-test-messaging-submit-btn]',
+            if pressed_key == 'Enter':
+                logger.info(
+                    'Enter key was pressed. Proceeding with email sending.',  # noqa:E501
                 )
-
-                if send_button.get_attribute('disabled'):
-                    email_status = 'Failed'
-                    error_message = 'Send button disabled.'
-                    logger.warning('Send button is disabled.')
-                else:
-                    send_button.click()
-                    email_status = 'Sent'
-                    logger.info('Message sent successfully.')
-                    time.sleep(random.uniform(4, 7))
-
-                # Log the email sending result
+            elif pressed_key == 'Backspace':
+                logger.info(
+                    'Backspace key was pressed. Skipping email sending.',  # noqa:E501
+                )
+                email_status = 'Skipped'
                 log_email(
                     run_id=run_id,
+                    sender_seat=sender_seat,
+                    subject=subject,
                     linkedin_profile_url=linkedin_profile,
                     email_text=email,
                     email_status=email_status,
-                    error_message=error_message,
+                    error_message='User skipped sending.',
                 )
-                time.sleep(random.uniform(61, 82))
-                # Force a hard reload
-                driver.execute_script('location.reload(true);')
-                logger.info('Page refreshed.')
-
-            except Exception as e:
+                return email_status, 'User skipped sending.'
+            else:
+                logger.warning('Unrecognized key press detected.')
                 email_status = 'Failed'
-                error_message = str(e)
-                logger.error(
-                    f"Error processing profile {linkedin_profile}: {e}",
-                )  # noqa:E501
-                logger.debug(traceback.format_exc())
-                # Log the error for this email
+                error_message = 'Unrecognized key press.'
                 log_email(
                     run_id=run_id,
+                    sender_seat=sender_seat,
+                    subject=subject,
                     linkedin_profile_url=linkedin_profile,
-                    email_text=email if email else '',
+                    email_text=email,
                     email_status=email_status,
                     error_message=error_message,
                 )
-                # Force a hard reload
-                driver.execute_script('location.reload(true);')
-                logger.info('Page refreshed.')
-                continue
+                return email_status, error_message
+        except TimeoutException:
+            logger.error(
+                'Timeout: No key press detected within the timeout period.',  # noqa:E501
+            )
+            email_status = 'Failed'
+            error_message = 'Timeout waiting for user input.'
+            log_email(
+                run_id=run_id,
+                sender_seat=sender_seat,
+                subject=subject,
+                linkedin_profile_url=linkedin_profile,
+                email_text=email,
+                email_status=email_status,
+                error_message=error_message,
+            )
+            return email_status, error_message
+
+    # Locate and interact with the send button
+    send_button = waits.until(
+        driver,
+        'send_button',
+        EC.presence_of_element_located(
+            (By.CSS_SELECTOR, 'button[data-live-test-messaging-submit-btn]'),
+        ),
+    )
+
+    if send_button.get_attribute('disabled'):
+        email_status = 'Failed'
+        error_message = 'Send button disabled.'
+        logger.warning('Send button is disabled.')
+    else:
+        send_button.click()
+        email_status = 'Sent'
+        logger.info('Message sent successfully.')
+        waits.pause('send')
+
+    # Log the email sending result
+    log_email(
+        run_id=run_id,
+        sender_seat=sender_seat,
+        subject=subject,
+        profile_id=profile_id,
+        linkedin_profile_url=linkedin_profile,
+        email_text=email,
+        email_status=email_status,
+        error_message=error_message,
+    )
+    return email_status, error_message
+
+
+def run_selenium_automation(
+    data,
+    visible_mode,
+    control_email_sending,
+    prompt: str = None,
+    reference_email: str = None,
+    run_id: int = None,
+    callback=None,
+    lookahead: int = DEFAULT_LOOKAHEAD,
+    use_cache: bool = True,
+    single_shot: bool = False,
+    user_data_dir=None,
+    sender_seat: str = None,
+    finalize_run: bool = True,
+    before_send=None,
+    on_progress=None,
+):
+    """
+    Runs the Selenium automation process.
+
+    Parameters:
+    - data: Leads to process, e.g. from iter_leads (a pandas DataFrame of
+      lead rows is also accepted).
+    - visible_mode: bool indicating whether to run in visible mode.
+    - control_email_sending: bool indicating whether to control email sending.
+    - prompt: str containing the user prompt.
+    - reference_email: str containing the email instructions.
+    - run_id: int containing the unique run identifier.
+    - callback: function to call upon completion or error (optional).
+    - lookahead: int number of profiles scraped and drafted ahead of the
+      one being sent.
+    - use_cache: bool indicating whether cached LLM outputs may be reused.
+    - single_shot: bool indicating whether to draft summary, body and
+      subject in one structured LLM call.
+    - user_data_dir: Chrome profile directory (defaults to the automation
+      profile).
+    - sender_seat: str name of the Recruiter seat recorded with each email.
+    - finalize_run: bool indicating whether to record the run's end status;
+      False when several workers share the run.
+    - before_send: function called before each send that may wait (e.g.
+      for the send window) and returns False to stop the run.
+    - on_progress: function called with a ProgressEvent as each lead is
+      started, scraped, drafted and sent, failed or skipped.
+    """
+    logger.info(f"Run ID: {run_id} - Automation started.")
+    driver_manager = DriverManager(
+        visible_mode=visible_mode,
+        user_data_dir=user_data_dir,
+    )
+
+    def end_run(status, message):
+        if finalize_run:
+            log_run_end(run_id=run_id, status=status, error_message=message)
+
+    waits = WaitPolicy()
+    run_status = 'Running'
+    error_message = None
+
+    try:
+        # Initialize the WebDriver
+        try:
+            driver_manager.start()
+
+            logger.info('ChromeDriver initialized successfully.')
+        except Exception as e:
+            logger.error(
+                f"Failed to initialize ChromeDriver automatically: {e}",
+            )
+            run_status = 'Failed'
+            error_message = f"ChromeDriver Initialization Error: {e}"
+            end_run(run_status, error_message)
+            if callback:
+                callback(success=False, message=error_message)
+            return  # Exit the function as WebDriver is essential
+
+        # Scrape ahead of the row being sent so its draft is generated on
+        # the worker pool while the browser composes and sends this one.
+        with DraftPipeline(
+            prompt=prompt,
+            reference_email=reference_email,
+            lookahead=lookahead,
+            use_cache=use_cache,
+            single_shot=single_shot,
+        ) as pipeline:
+            if isinstance(data, pd.DataFrame):
+                data = LeadBatch.from_frame(data)
+            leads = iter(data)
+            leads_exhausted = False
+            stopped = False
+            while True:
+                while not leads_exhausted and not pipeline.is_full():
+                    try:
+                        lead = next(leads)
+                    except StopIteration:
+                        leads_exhausted = True
+                        break
+
+                    driver = driver_manager.maybe_recycle()
+                    scraped_ok = scrape_row(
+                        driver=driver,
+                        pipeline=pipeline,
+                        lead=lead,
+                        run_id=run_id,
+                        sender_seat=sender_seat,
+                        waits=waits,
+                        on_progress=on_progress,
+                    )
+                    if not scraped_ok:
+                        driver_manager.record_row(success=False)
+
+                if not pipeline:
+                    break
+                if before_send and not before_send():
+                    stopped = True
+                    break
+
+                scraped = pipeline.pop()
+                sent_ok = send_row(
+                    driver=driver_manager.driver,
+                    scraped=scraped,
+                    control_email_sending=control_email_sending,
+                    run_id=run_id,
+                    sender_seat=sender_seat,
+                    waits=waits,
+                    on_progress=on_progress,
+                )
+                driver_manager.record_row(success=sent_ok)
+
+        logger.info(f"LLM cache stats: {llm_cache.stats}")
+        logger.info(f"ChromeDriver stats: {driver_manager.metrics()}")
+        logger.info(f"Step timings: {waits.summary()}")
+
+        if stopped:
+            run_status = 'Interrupted'
+            error_message = 'Run was stopped before sending all emails.'
+            logger.warning(error_message)
+            end_run(run_status, error_message)
+            if callback:
+                callback(success=False, message=error_message)
+            return
 
         # Update run status to Completed
         run_status = 'Completed'
-        log_run_end(
-            run_id=run_id,
-            status=run_status,
-            error_message='Run completed successfully.',
-        )
+        end_run(run_status, 'Run completed successfully.')
         logger.info(f"Run ID: {run_id} - Automation completed successfully.")
 
         # Invoke the callback to indicate success
@@ -525,11 +780,7 @@ def run_selenium_automation(
         run_status = 'Interrupted'
         error_message = 'Run was interrupted by the user (KeyboardInterrupt).'
         logger.warning(error_message)
-        log_run_end(
-            run_id=run_id,
-            status=run_status,
-            error_message=error_message,
-        )
+        end_run(run_status, error_message)
 
         if callback:
             callback(
@@ -542,11 +793,7 @@ def run_selenium_automation(
         error_message = f"An unexpected error occurred: {e}"
         logger.error(error_message)
         logger.debug(traceback.format_exc())
-        log_run_end(
-            run_id=run_id,
-            status=run_status,
-            error_message=error_message,
-        )
+        end_run(run_status, error_message)
 
         if callback:
             callback(
@@ -556,19 +803,15 @@ def run_selenium_automation(
 
     finally:
         # Ensure the WebDriver is properly closed
-        if driver:
-            driver.quit()
+        if driver_manager.driver:
+            driver_manager.quit()
             logger.info('WebDriver has been closed.')
 
         # If the run was interrupted or failed, ensure the run end is logged
         if run_id and run_status not in ['Completed', 'Failed', 'Interrupted']:
             run_status = 'Failed'
             error_message = 'Run ended unexpectedly.'
-            log_run_end(
-                run_id=run_id,
-                status=run_status,
-                error_message=error_message,
-            )
+            end_run(run_status, error_message)
             if callback:
                 callback(
                     success=False,
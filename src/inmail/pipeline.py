@@ -0,0 +1,116 @@
+import logging
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from dataclasses import field
+
+from src.agents.main import generate_personal_email
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOOKAHEAD = 2
+DEFAULT_DRAFT_WORKERS = 2
+
+
+@dataclass
+class ScrapedProfile:
+    index: int
+    linkedin_profile: str
+    profile_email_address: str
+    profile_id: str
+    draft: Future = field(default=None, repr=False)
+    # Seconds the draft took, queueing included, once it is done
+    draft_seconds: float | None = None
+
+
+class DraftPipeline:
+    """
+    Drafts emails on a worker pool while the browser keeps working.
+
+    Scraped profiles are queued together with the future of their draft.
+    The browser loop keeps at most `lookahead` profiles scraped ahead of the
+    one it is currently sending, so LLM latency overlaps with composing,
+    sending and the pacing sleep of the previous rows.
+    """
+
+    def __init__(
+        self,
+        prompt: str = None,
+        reference_email: str = None,
+        lookahead: int = DEFAULT_LOOKAHEAD,
+        max_workers: int = DEFAULT_DRAFT_WORKERS,
+        draft_func=generate_personal_email,
+        use_cache: bool = True,
+        single_shot: bool = False,
+    ):
+        self.prompt = prompt
+        self.reference_email = reference_email
+        self.use_cache = use_cache
+        self.single_shot = single_shot
+        self.lookahead = max(lookahead, 0)
+        self.draft_func = draft_func
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='draft',
+        )
+        self.pending = deque()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.shutdown()
+
+    def is_full(self) -> bool:
+        """True when the queue holds the current row plus the lookahead."""
+        return len(self.pending) > self.lookahead
+
+    def __len__(self):
+        return len(self.pending)
+
+    def submit(
+        self,
+        index,
+        linkedin_profile,
+        profile_email_address,
+        profile_id,
+        page_text,
+    ) -> ScrapedProfile:
+        """Start drafting the email for a scraped profile."""
+        scraped = ScrapedProfile(
+            index=index,
+            linkedin_profile=linkedin_profile,
+            profile_email_address=profile_email_address,
+            profile_id=profile_id,
+        )
+        scraped.draft = self.executor.submit(
+            self.timed_draft, scraped, page_text, time.perf_counter(),
+        )
+        self.pending.append(scraped)
+        logger.debug(f"Queued draft for row {index}. {len(self.pending)=}")
+        return scraped
+
+    def timed_draft(self, scraped, page_text, submitted_at):
+        try:
+            return self.draft_func(
+                page_summary=page_text,
+                user_prompt=self.prompt,
+                email_instructions=self.reference_email,
+                use_cache=self.use_cache,
+                single_shot=self.single_shot,
+            )
+        finally:
+            # Set before the future resolves, so it is there for result()
+            scraped.draft_seconds = time.perf_counter() - submitted_at
+
+    def pop(self) -> ScrapedProfile:
+        """The oldest scraped profile; its draft may still be running."""
+        return self.pending.popleft()
+
+    def shutdown(self):
+        for scraped in self.pending:
+            scraped.draft.cancel()
+        self.pending.clear()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,228 @@
+"""
+Progress events of a run and the statistics the UI derives from them.
+
+The automation reports each lead as it goes through the stages (started,
+scraped, drafted, then sent, failed or skipped) and the campaign reports
+its plan, the leads it drops before they reach the browser and its waits
+for quota. ProgressStats folds these events into
+counts, throughput, per-stage latency percentiles and an ETA that follows
+the daily limit and the send window.
+"""
+import time
+from collections import deque
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+from datetime import timedelta
+
+# Latest stage durations kept for the percentiles
+LATENCY_SAMPLES = 200
+
+# Latest completed rows the throughput is measured over
+RATE_SAMPLES = 50
+
+# Days an ETA is looked for before it is reported as unknown
+MAX_ETA_DAYS = 366
+
+
+@dataclass(frozen=True, slots=True)
+class ProgressEvent:
+    # Epoch seconds the event happened at
+    at: float = field(default_factory=time.time, kw_only=True)
+
+
+@dataclass(frozen=True, slots=True)
+class RunPlanned(ProgressEvent):
+    total_rows: int
+    start_row: int
+    # Emails per day across all seats; None when the UI's limit applies
+    daily_quota: int | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class LeadsDropped(ProgressEvent):
+    # Leads of a batch that were never started: repeats, profiles the run
+    # already handled and recently contacted ones
+    count: int
+
+
+@dataclass(frozen=True, slots=True)
+class RowStarted(ProgressEvent):
+    index: int
+    profile_url: str
+
+
+@dataclass(frozen=True, slots=True)
+class RowScraped(ProgressEvent):
+    index: int
+    seconds: float
+
+
+@dataclass(frozen=True, slots=True)
+class RowDrafted(ProgressEvent):
+    index: int
+    seconds: float
+
+
+@dataclass(frozen=True, slots=True)
+class RowSent(ProgressEvent):
+    index: int
+    seconds: float
+
+
+@dataclass(frozen=True, slots=True)
+class RowFailed(ProgressEvent):
+    index: int
+    # 'scrape' or 'send'
+    stage: str
+    message: str
+
+
+@dataclass(frozen=True, slots=True)
+class RowSkipped(ProgressEvent):
+    index: int
+    reason: str
+
+
+@dataclass(frozen=True, slots=True)
+class WaitingForQuota(ProgressEvent):
+    # Epoch seconds sending resumes at
+    until: float
+    # 'daily_limit' or 'send_window'
+    reason: str
+
+
+def ignore_progress(event: ProgressEvent):
+    """The default progress callback."""
+
+
+def percentile(values, fraction: float) -> float | None:
+    """Nearest-rank percentile, None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class ProgressStats:
+    """Running totals of one run's progress events."""
+
+    STAGES = {RowScraped: 'scrape', RowDrafted: 'draft', RowSent: 'send'}
+
+    def __init__(self):
+        self.total_rows = None
+        self.start_row = 0
+        self.daily_quota = None
+        self.started = 0
+        self.sent = 0
+        self.failed = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.waiting = None
+        self.latencies = {
+            stage: deque(maxlen=LATENCY_SAMPLES)
+            for stage in self.STAGES.values()
+        }
+        # Completion times since the last wait for quota
+        self.completed_at = deque(maxlen=RATE_SAMPLES)
+
+    @property
+    def completed(self) -> int:
+        """Rows handled so far, dropped leads included."""
+        return self.sent + self.failed + self.skipped + self.dropped
+
+    @property
+    def remaining_rows(self) -> int | None:
+        """
+        Rows of the file not handled yet; leads that will be dropped count
+        until their batch is read.
+        """
+        if self.total_rows is None:
+            return None
+        return max(self.total_rows - self.start_row - self.completed, 0)
+
+    def add(self, event: ProgressEvent):
+        if isinstance(event, RunPlanned):
+            self.total_rows = event.total_rows
+            self.start_row = event.start_row
+            self.daily_quota = event.daily_quota
+            return
+        if isinstance(event, LeadsDropped):
+            # Never sent, so they count as done but not towards throughput
+            self.dropped += event.count
+            return
+        if isinstance(event, WaitingForQuota):
+            self.waiting = event
+            # Throughput is measured while sending, not across waits
+            self.completed_at.clear()
+            return
+        self.waiting = None
+        stage = self.STAGES.get(type(event))
+        if stage:
+            self.latencies[stage].append(event.seconds)
+        if isinstance(event, RowStarted):
+            self.started += 1
+        elif isinstance(event, (RowSent, RowFailed, RowSkipped)):
+            self.completed_at.append(event.at)
+            if isinstance(event, RowSent):
+                self.sent += 1
+            elif isinstance(event, RowFailed):
+                self.failed += 1
+            else:
+                self.skipped += 1
+
+    def rows_per_hour(self) -> float | None:
+        """Completed rows per hour since the last wait, None if unknown."""
+        if len(self.completed_at) < 2:
+            return None
+        elapsed = self.completed_at[-1] - self.completed_at[0]
+        if elapsed <= 0:
+            return None
+        return (len(self.completed_at) - 1) * 3600 / elapsed
+
+    def stage_latency(self, stage: str) -> tuple[float, float] | None:
+        """p50 and p95 seconds of a stage, None before its first row."""
+        values = self.latencies[stage]
+        if not values:
+            return None
+        return percentile(values, 0.5), percentile(values, 0.95)
+
+    def eta(
+        self,
+        scheduler,
+        daily_limit: int,
+        sent_today: int,
+        now: datetime = None,
+    ) -> datetime | None:
+        """
+        When the remaining rows should be done at the current throughput,
+        sending at most the daily limit per day and only inside the
+        scheduler's send window. None while that cannot be estimated.
+        """
+        rate = self.rows_per_hour()
+        remaining = self.remaining_rows
+        if rate is None or remaining is None:
+            return None
+        if self.daily_quota is not None:
+            daily_limit = self.daily_quota
+        if remaining == 0:
+            return now or scheduler.now()
+        if daily_limit <= 0:
+            return None
+
+        moment = now or scheduler.now()
+        capacity = max(daily_limit - sent_today, 0)
+        day = moment.date()
+        for _ in range(MAX_ETA_DAYS):
+            moment = scheduler.next_window_start(moment)
+            if moment.date() != day:
+                day, capacity = moment.date(), daily_limit
+            window_end = scheduler.current_window(moment)[1]
+            hours_left = (window_end - moment).total_seconds() / 3600
+            sendable = min(capacity, rate * hours_left)
+            if remaining <= sendable:
+                return moment + timedelta(hours=remaining / rate)
+            remaining -= sendable
+            capacity -= sendable
+            moment = scheduler.next_day_start(moment)
+        return None
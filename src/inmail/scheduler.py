@@ -0,0 +1,247 @@
+import logging
+import threading
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+from datetime import time
+from datetime import timedelta
+
+import pytz
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Longest single wait, so a changed system clock (e.g. after the machine
+# slept) is noticed within this many seconds.
+MAX_WAIT_STEP = 60
+
+
+def parse_clock_time(value: str) -> time | None:
+    """'HH:MM' as a time of day; '24:00' (end of day) as None."""
+    if value.strip() == '24:00':
+        return None
+    return datetime.strptime(value.strip(), '%H:%M').time()
+
+
+@dataclass(frozen=True)
+class SendWindow:
+    # Time of day sending may start, in the scheduler's timezone.
+    start: time = time(0, 0)
+    # Time of day sending must stop; None is the end of the day. An end
+    # before the start closes the window on the next day (e.g. 22:00 to
+    # 06:00).
+    end: time | None = None
+    # Days a window opens on, Monday is 0.
+    weekdays: frozenset[int] = field(
+        default_factory=lambda: frozenset(range(7)),
+    )
+
+    def __post_init__(self):
+        if self.start == self.end:
+            raise ValueError(
+                f"The send window opens and closes at {self.start}.",
+            )
+
+    @property
+    def wraps(self) -> bool:
+        """Whether the window runs past midnight."""
+        return self.end is not None and self.end < self.start
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            start=parse_clock_time(settings.SEND_WINDOW_START),
+            end=parse_clock_time(settings.SEND_WINDOW_END),
+            weekdays=frozenset(settings.SEND_WEEKDAYS),
+        )
+
+
+class SystemClock:
+    def now(self, timezone) -> datetime:
+        return datetime.now(timezone)
+
+    def wait(self, event: threading.Event, seconds: float) -> bool:
+        """Sleep up to `seconds`; True if `event` was set meanwhile."""
+        return event.wait(seconds)
+
+
+class Scheduler:
+    """
+    Decides when the automation may send, and waits for it without
+    blocking shutdown.
+
+    Sending is allowed inside the send window (a time range on selected
+    weekdays in `timezone`) while the scheduler is not paused. Every wait
+    can be cancelled, which makes it return False at once, or woken, which
+    makes it return True early so the caller can re-check its limits.
+    With `spread_quota`, sends are paced so the remaining daily quota is
+    spread evenly over what is left of the window. The clock is injectable
+    so tests can run on fake time.
+    """
+
+    def __init__(
+        self,
+        window: SendWindow = None,
+        timezone: str = settings.SCHEDULE_TIMEZONE,
+        spread_quota: bool = settings.SPREAD_DAILY_QUOTA,
+        clock=None,
+    ):
+        self.window = window or SendWindow.from_settings()
+        self.timezone = pytz.timezone(timezone)
+        self.spread_quota = spread_quota
+        self.clock = clock or SystemClock()
+        self._cancelled = threading.Event()
+        self._wake = threading.Event()
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._lock = threading.Lock()
+        self._next_send_at = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Stop every current and future wait."""
+        self._cancelled.set()
+        self._wake.set()
+        self._resumed.set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._resumed.is_set()
+
+    def pause(self):
+        """Hold every send until `resume`; waits in progress carry on."""
+        self._resumed.clear()
+
+    def resume(self):
+        self._resumed.set()
+
+    def wait_while_paused(self) -> bool:
+        """Wait until resumed. Returns False if cancelled."""
+        if self.paused:
+            logger.info('Sending paused.')
+        while self.paused:
+            self.clock.wait(self._resumed, MAX_WAIT_STEP)
+        return not self.cancelled
+
+    def wake(self):
+        """End the current waits early, e.g. after the daily limit changed."""
+        self._wake.set()
+
+    def now(self) -> datetime:
+        return self.clock.now(self.timezone)
+
+    def _at(self, day, clock_time: time | None) -> datetime:
+        """`clock_time` on `day` in the scheduler's timezone."""
+        if clock_time is None:
+            day, clock_time = day + timedelta(days=1), time(0, 0)
+        return self.timezone.localize(datetime.combine(day, clock_time))
+
+    def window_bounds(self, day) -> tuple[datetime, datetime] | None:
+        """Start and end of the send window opening on `day`, if any."""
+        if day.weekday() not in self.window.weekdays:
+            return None
+        end_day = day + timedelta(days=1) if self.window.wraps else day
+        return (
+            self._at(day, self.window.start),
+            self._at(end_day, self.window.end),
+        )
+
+    def current_window(
+        self, moment: datetime = None,
+    ) -> tuple[datetime, datetime] | None:
+        """Bounds of the window `moment` falls in, None outside of one."""
+        moment = moment or self.now()
+        # A window that wraps past midnight may have opened the day before
+        for offset in (0, -1):
+            bounds = self.window_bounds(moment.date() + timedelta(days=offset))
+            if bounds and bounds[0] <= moment < bounds[1]:
+                return bounds
+        return None
+
+    def in_window(self, moment: datetime = None) -> bool:
+        return self.current_window(moment) is not None
+
+    def next_day_start(self, moment: datetime = None) -> datetime:
+        """
+        Start of the next window that opens after `moment`: later today if
+        today's has not opened yet, otherwise on the next sending day.
+        """
+        moment = moment or self.now()
+        for offset in range(8):
+            bounds = self.window_bounds(moment.date() + timedelta(days=offset))
+            if bounds and bounds[0] > moment:
+                return bounds[0]
+        raise ValueError('The send window has no weekdays.')
+
+    def next_window_start(self, moment: datetime = None) -> datetime:
+        """`moment` itself when inside the window, else the next start."""
+        moment = moment or self.now()
+        if self.in_window(moment):
+            return moment
+        return self.next_day_start(moment)
+
+    def wait_until(self, moment: datetime) -> bool:
+        """
+        Wait until `moment`. Returns False if cancelled, True when the time
+        came or the wait was woken. A wake from before the wait is ignored.
+        """
+        self._wake.clear()
+        while not self.cancelled:
+            remaining = (moment - self.now()).total_seconds()
+            if remaining <= 0:
+                return True
+            if self.clock.wait(self._wake, min(remaining, MAX_WAIT_STEP)):
+                if self.cancelled:
+                    break
+                self._wake.clear()
+                return True
+        return False
+
+    def wait_for_window(self) -> bool:
+        start = self.next_window_start()
+        if start > self.now():
+            logger.info(f"Waiting for the send window at {start}.")
+        return self.wait_until(start)
+
+    def wait_for_next_day(self) -> bool:
+        start = self.next_day_start()
+        logger.info(f"Daily limit reached, waiting until {start}.")
+        return self.wait_until(start)
+
+    def send_interval(
+        self, remaining_quota: int, moment: datetime = None,
+    ) -> float:
+        """
+        Seconds between sends that spread the quota over what is left of
+        the window at `moment` (now by default).
+        """
+        moment = moment or self.now()
+        bounds = self.current_window(moment)
+        if not bounds or remaining_quota <= 0:
+            return 0
+        return max((bounds[1] - moment).total_seconds(), 0) / remaining_quota
+
+    def wait_for_send_slot(self, remaining_quota: int) -> bool:
+        """
+        Wait until the next send may start: not paused, inside the window
+        and, with `spread_quota`, not before this send's even share of the
+        window. Safe to call from several seats at once. Returns False if
+        cancelled.
+        """
+        if not self.wait_while_paused() or not self.wait_for_window():
+            return False
+        if not self.spread_quota:
+            return True
+        with self._lock:
+            now = self.now()
+            slot = max(now, self._next_send_at or now)
+            # Spread what is left after the slot, which may be later than
+            # now when the previous send reserved it
+            self._next_send_at = slot + timedelta(
+                seconds=self.send_interval(remaining_quota, slot),
+            )
+        return self.wait_until(slot)
@@ -0,0 +1,147 @@
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.config import settings
+from src.database.handlers import count_emails_sent_today
+from src.database.handlers import log_run_end
+from src.inmail.personalized_email import run_selenium_automation
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Seat:
+    name: str
+    user_data_dir: Path
+    daily_limit: int
+
+
+def get_seats(profile_dirs=None, daily_limit: int = None) -> list[Seat]:
+    """
+    Recruiter seats configured through SEAT_PROFILE_DIRS (or given as
+    `profile_dirs`), one Chrome user-data directory each. Empty when the
+    app runs a single profile.
+    """
+    if profile_dirs is None:
+        profile_dirs = settings.SEAT_PROFILE_DIRS
+    return [
+        Seat(
+            name=Path(profile_dir).name,
+            user_data_dir=Path(profile_dir),
+            daily_limit=daily_limit or settings.SEAT_DAILY_LIMIT,
+        )
+        for profile_dir in profile_dirs
+    ]
+
+
+def shard_rows(data, capacities: dict[str, int]):
+    """
+    Deal rows round-robin to the seats that still have capacity today.
+
+    Returns the per-seat row positions and the number of leading rows of
+    `data` that were assigned; rows past that point wait for the next day.
+    """
+    positions = {name: [] for name in capacities}
+    remaining = dict(capacities)
+    assigned = 0
+    while assigned < len(data):
+        open_seats = [name for name in positions if remaining[name] > 0]
+        if not open_seats:
+            break
+        for name in open_seats:
+            if assigned >= len(data):
+                break
+            positions[name].append(assigned)
+            remaining[name] -= 1
+            assigned += 1
+    return positions, assigned
+
+
+def run_seat_pool(
+    data,
+    seats: list[Seat],
+    visible_mode,
+    control_email_sending,
+    prompt: str = None,
+    reference_email: str = None,
+    run_id: int = None,
+    callback=None,
+    **automation_kwargs,
+) -> int:
+    """
+    Send `data` through several Recruiter seats in parallel.
+
+    Each seat gets its own worker thread, Chrome profile and driver, and
+    processes at most its remaining daily limit. All workers log to the same
+    run, whose end status is recorded once every worker has finished.
+    Returns the number of leading rows of `data` that were handled.
+    """
+    capacities = {
+        seat.name: max(
+            seat.daily_limit - count_emails_sent_today(sender_seat=seat.name),
+            0,
+        )
+        for seat in seats
+    }
+    positions, assigned = shard_rows(data, capacities)
+    logger.info(f"Sharded {assigned} rows across seats: {capacities=}")
+    if not assigned:
+        return 0
+
+    results = {}
+
+    def worker(seat, shard):
+        def worker_callback(success, message):
+            results[seat.name] = (success, message)
+
+        run_selenium_automation(
+            data=shard,
+            visible_mode=visible_mode,
+            control_email_sending=control_email_sending,
+            prompt=prompt,
+            reference_email=reference_email,
+            run_id=run_id,
+            callback=worker_callback,
+            user_data_dir=seat.user_data_dir,
+            sender_seat=seat.name,
+            finalize_run=False,
+            **automation_kwargs,
+        )
+
+    threads = []
+    for seat in seats:
+        if not positions[seat.name]:
+            continue
+        thread = threading.Thread(
+            target=worker,
+            args=(
+                seat,
+                [data[position] for position in positions[seat.name]],
+            ),
+            name=f"seat-{seat.name}",
+            daemon=True,
+        )
+        thread.start()
+        threads.append(thread)
+
+    for thread in threads:
+        thread.join()
+
+    failures = [
+        f"{name}: {message}"
+        for name, (success, message) in results.items()
+        if not success
+    ]
+    if failures:
+        run_status = 'Failed'
+        message = '; '.join(failures)
+    else:
+        run_status = 'Completed'
+        message = 'Run completed successfully.'
+    log_run_end(run_id=run_id, status=run_status, error_message=message)
+
+    if callback:
+        callback(success=not failures, message=message)
+    return assigned
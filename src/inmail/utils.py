@@ -1,6 +1,5 @@
 import logging
 import platform
-import re
 import sys
 from pathlib import Path
 
@@ -170,8 +169,8 @@ def get_user_data_dir():
         # Path for Windows
         profile_dir = Path(__file__).resolve(
         ).parent.parent / 'automation_profile'
-    elif os_type == 'Darwin':
-        # Path for macOS
+    elif os_type in ('Darwin', 'Linux'):
+        # Path for macOS and Linux (e.g. a headless server)
         profile_dir = Path(__file__).resolve(
         ).parent.parent / 'automation_profile'
     else:
@@ -179,9 +178,3 @@ def get_user_data_dir():
         sys.exit(1)
 
     return profile_dir
-
-
-def slugify_company(company_name):
-    # Lowercase and replace spaces and special characters with a dash
-    slug = re.sub(r'[^\w\s-]', '', company_name).lower().replace(' ', '-')
-    return slug
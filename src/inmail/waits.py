@@ -0,0 +1,142 @@
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StepPolicy:
+    # Seconds to wait for the step's readiness condition.
+    timeout: float = 15
+    # Extra human-like pause (min, max) after the step is ready, only for
+    # steps where anti-bot pacing matters.
+    jitter: tuple[float, float] = (0, 0)
+
+
+STEP_POLICIES = {
+    'profile_reload': StepPolicy(timeout=20, jitter=(1, 3)),
+    'profile_page': StepPolicy(timeout=20),
+    'talent_profile': StepPolicy(timeout=30, jitter=(3, 6)),
+    'add_email_button': StepPolicy(timeout=10),
+    'add_email': StepPolicy(timeout=10, jitter=(1, 2)),
+    'save_email': StepPolicy(timeout=7, jitter=(1, 3)),
+    'message_button': StepPolicy(timeout=20, jitter=(1, 3)),
+    'composer': StepPolicy(timeout=20, jitter=(1, 3)),
+    'settings_button': StepPolicy(timeout=10),
+    'channel_settings': StepPolicy(timeout=10, jitter=(1, 2)),
+    'email_channel': StepPolicy(timeout=10, jitter=(1, 3)),
+    'save_channel': StepPolicy(timeout=10),
+    'subject': StepPolicy(timeout=10),
+    'editor': StepPolicy(timeout=10),
+    'send': StepPolicy(timeout=10, jitter=(4, 7)),
+    'pacing': StepPolicy(jitter=(61, 82)),
+}
+
+
+def document_ready(driver):
+    return driver.execute_script('return document.readyState') == 'complete'
+
+
+def current_page(driver):
+    """The <html> element of the current document, to tell it was left."""
+    return driver.find_element(By.TAG_NAME, 'html')
+
+
+def page_replaced(old_page):
+    """
+    Condition that the document holding `old_page` was replaced by a new
+    one that has finished loading. readyState alone can still read the old
+    document's 'complete' before the navigation starts.
+    """
+    def condition(driver):
+        return EC.staleness_of(old_page)(driver) and document_ready(driver)
+    return condition
+
+
+class WaitPolicy:
+    """
+    Event-driven waits for the composer flow with an optional human jitter
+    budget per step, plus per-step timing to see which step dominates. A
+    step's jitter is timed apart from it, as '<step> jitter'.
+
+    `jitter_scale` multiplies every jitter range, so 0 disables the extra
+    pauses entirely (e.g. for fake drivers) without touching readiness.
+    """
+
+    def __init__(
+        self,
+        steps: dict[str, StepPolicy] = None,
+        jitter_scale: float = settings.HUMAN_JITTER_SCALE,
+        sleep=time.sleep,
+    ):
+        self.steps = {**STEP_POLICIES, **(steps or {})}
+        self.jitter_scale = jitter_scale
+        self.sleep = sleep
+        self.timings = {}
+        self._lock = threading.Lock()
+
+    def policy(self, step: str) -> StepPolicy:
+        return self.steps.get(step, StepPolicy())
+
+    def until(self, driver, step: str, condition, required: bool = True):
+        """
+        Wait for `condition`, then apply the step's jitter.
+
+        When `required` is False a timeout is logged and None returned.
+        """
+        with self.timed(step):
+            try:
+                result = WebDriverWait(
+                    driver, self.policy(step).timeout,
+                ).until(condition)
+            except TimeoutException:
+                if required:
+                    raise
+                logger.warning(f"Timed out waiting for step {step!r}.")
+                result = None
+        self.pause(step)
+        return result
+
+    def pause(self, step: str):
+        low, high = self.policy(step).jitter
+        if self.jitter_scale and high:
+            with self.timed(f"{step} jitter"):
+                self.sleep(random.uniform(low, high) * self.jitter_scale)
+
+    @contextmanager
+    def timed(self, step: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.timings.setdefault(step, []).append(elapsed)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            timings = {
+                step: list(values) for step, values in self.timings.items()
+            }
+        return {
+            step: {
+                'count': len(values),
+                'mean': sum(values) / len(values),
+                'max': max(values),
+                'total': sum(values),
+            }
+            for step, values in sorted(
+                timings.items(), key=lambda item: -sum(item[1]),
+            )
+        }
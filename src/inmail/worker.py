@@ -0,0 +1,203 @@
+"""
+The automation in a child process.
+
+AutomationProcess runs a Campaign in a spawned process and talks to it
+over two queues: commands go in (pause, resume, stop, a new daily limit)
+and events come out (log records, notices, errors, today's sent count, the
+progress of every lead and the outcome). The UI polls the events from
+its own loop, so HTML parsing, pandas and LLM client work never compete
+with it for the GIL, and a crashed browser cannot take the window down.
+
+This module imports nothing heavy itself; the child loads the automation
+stack.
+"""
+import logging
+import multiprocessing
+import queue
+import threading
+from logging.handlers import QueueHandler
+
+logger = logging.getLogger(__name__)
+
+# Commands, sent as (command, *values) tuples
+PAUSE = 'pause'
+RESUME = 'resume'
+STOP = 'stop'
+DAILY_LIMIT = 'daily_limit'  # (DAILY_LIMIT, limit)
+
+# Events, sent as (event, *values) tuples
+LOG = 'log'                # (LOG, record)
+NOTICE = 'notice'          # (NOTICE, title, message)
+ERROR = 'error'            # (ERROR, message)
+SENT_COUNT = 'sent_count'  # (SENT_COUNT, emails_sent_today)
+PROGRESS = 'progress'      # (PROGRESS, ProgressEvent)
+DONE = 'done'              # (DONE, run status, processed rows)
+
+# How often the UI takes the waiting events, and the most it handles at
+# once so a burst cannot stall it
+POLL_INTERVAL_MS = 50
+POLL_BATCH = 100
+
+# Seconds a stopped worker gets to log its run end before it is killed
+STOP_TIMEOUT = 30
+
+
+class EventLogHandler(QueueHandler):
+    """Forwards the child's log records to the parent as LOG events."""
+
+    def enqueue(self, record):
+        self.queue.put_nowait((LOG, record))
+
+
+def forward_logs(events):
+    root = logging.getLogger()
+    root.handlers[:] = [EventLogHandler(events)]
+    root.setLevel(logging.INFO)
+    logging.getLogger('undetected_chromedriver').setLevel(logging.WARNING)
+
+
+def follow_commands(commands, scheduler, on_daily_limit):
+    """Apply the parent's commands until it stops the run."""
+    while True:
+        command, *values = commands.get()
+        if command == PAUSE:
+            scheduler.pause()
+        elif command == RESUME:
+            scheduler.resume()
+        elif command == DAILY_LIMIT:
+            on_daily_limit(*values)
+            # Let a run waiting for the next day re-check the new limit
+            scheduler.wake()
+        elif command == STOP:
+            scheduler.cancel()
+            return
+
+
+def run_campaign(events, commands, daily_limit, **campaign_kwargs):
+    """
+    Entry point of the child process: run a Campaign (see its parameters)
+    with the seats of the settings and report back through `events`.
+    """
+    forward_logs(events)
+
+    from src.database.connection import database
+    from src.database.handlers import log_run_end
+    from src.inmail.campaign import Campaign
+    from src.inmail.campaign import FAILED
+    from src.inmail.seats import get_seats
+
+    limit = daily_limit
+
+    def set_daily_limit(value):
+        nonlocal limit
+        limit = value
+
+    campaign = Campaign(
+        daily_limit=lambda: limit,
+        seats=get_seats(),
+        on_notice=lambda title, message: events.put((NOTICE, title, message)),
+        on_error=lambda message: events.put((ERROR, message)),
+        on_sent_count=lambda count: events.put((SENT_COUNT, count)),
+        on_progress=lambda event: events.put((PROGRESS, event)),
+        **campaign_kwargs,
+    )
+    threading.Thread(
+        target=follow_commands,
+        args=(commands, campaign.scheduler, set_daily_limit),
+        daemon=True,
+    ).start()
+
+    try:
+        status = campaign.run()
+    except Exception as e:
+        logger.exception(f"Run {campaign.run_id} failed: {e}")
+        log_run_end(campaign.run_id, status=FAILED, error_message=str(e))
+        events.put((ERROR, str(e)))
+        status = FAILED
+    finally:
+        database.flush()
+    events.put((DONE, status, campaign.processed_rows))
+
+
+def poll_events(events, limit: int = POLL_BATCH) -> list[tuple]:
+    """
+    Up to `limit` waiting events, without blocking. LOG events are handed
+    to this process's logging instead of being returned.
+    """
+    polled = []
+    for _ in range(limit):
+        try:
+            event = events.get_nowait()
+        except queue.Empty:
+            break
+        if event[0] == LOG:
+            record = event[1]
+            logging.getLogger(record.name).handle(record)
+        else:
+            polled.append(event)
+    return polled
+
+
+class AutomationProcess:
+    """
+    Handle on an automation running in a child process.
+
+    `target` is called in the child as target(events, commands, **kwargs);
+    run_campaign by default.
+    """
+
+    def __init__(self, target=run_campaign, **kwargs):
+        context = multiprocessing.get_context('spawn')
+        self.events = context.Queue()
+        self.commands = context.Queue()
+        self.process = context.Process(
+            target=target,
+            args=(self.events, self.commands),
+            kwargs=kwargs,
+            name='automation',
+        )
+        # (status, processed rows) once the child reported its end
+        self.outcome = None
+
+    def start(self):
+        self.process.start()
+        logger.info(f"Automation started in process {self.process.pid}.")
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    @property
+    def exitcode(self):
+        return self.process.exitcode
+
+    def send(self, command, *values):
+        if self.is_alive():
+            self.commands.put((command, *values))
+
+    def pause(self):
+        self.send(PAUSE)
+
+    def resume(self):
+        self.send(RESUME)
+
+    def stop(self):
+        """Stop the run at its next wait or send."""
+        self.send(STOP)
+
+    def set_daily_limit(self, daily_limit):
+        self.send(DAILY_LIMIT, daily_limit)
+
+    def poll(self, limit: int = POLL_BATCH) -> list[tuple]:
+        events = poll_events(self.events, limit)
+        for event in events:
+            if event[0] == DONE:
+                self.outcome = event[1:]
+        return events
+
+    def join(self, timeout: float = STOP_TIMEOUT):
+        """Wait for the child to exit, killing it after `timeout`."""
+        self.process.join(timeout)
+        if self.process.is_alive():
+            logger.warning('Automation did not stop in time, killing it.')
+            self.process.kill()
+            self.process.join()
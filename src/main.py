@@ -1,6 +1,7 @@
+import argparse
 import logging
+import multiprocessing
 import os
-import subprocess
 import sys
 from pathlib import Path
 
@@ -60,7 +61,7 @@ def setup_logging():
     logging.getLogger('undetected_chromedriver').setLevel(logging.WARNING)
 
 
-def main():
+def main(startup_report=False, latency_report=False):
     # Setup logging first
     setup_logging()
     logger = logging.getLogger(__name__)  # Get a logger for this module
@@ -76,9 +77,13 @@ def main():
             ),
         )
 
-        # Now import other modules
+        # Now import other modules. The automation stacks (pandas,
+        # Selenium, LangChain) are only imported on first use, so the
+        # window does not wait for them.
         from src.database.setup import create_database
         from src.ui.main_window import LinkedInAutomationApp
+        from src.utils.latency import report_latency
+        from src.utils.startup import watch_startup
 
         # Initialize the database
         logger.info('Initializing the database...')
@@ -88,6 +93,14 @@ def main():
         # Launch the main application window
         logger.info('Launching the main application window.')
         app = LinkedInAutomationApp()
+        report_path = None
+        if startup_report:
+            report_path = get_application_path() / 'logs' / 'startup.jsonl'
+        watch_startup(app, report_path=report_path)
+        if latency_report:
+            report_latency(
+                app, get_application_path() / 'logs' / 'latency.jsonl',
+            )
         app.mainloop()
         logger.info('Application closed gracefully.')
 
@@ -96,32 +109,36 @@ def main():
         sys.exit(1)
 
 
-def run_subprocess():
-    # Prevent recursion by checking an environment variable
-    if os.environ.get('IS_SUBPROCESS'):
-        print('This is a subprocess. Exiting to prevent recursion.')
-        return
-
-    # Set an environment variable to mark subprocesses
-    env = os.environ.copy()
-    env['IS_SUBPROCESS'] = '1'
-
-    # Run the subprocess
-    args = [sys.executable, __file__]  # Re-invoke the same script
-    subprocess.Popen(args, env=env)
-    print('Started subprocess with PID:', os.getpid())
-
-
 def is_frozen():
     """Check if the application is running as a PyInstaller bundle."""
     return getattr(sys, 'frozen', False)
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='LinkedIn InMail automation')
+    parser.add_argument(
+        '--startup-report', action='store_true',
+        help='measure the cold start, append it to logs/startup.jsonl '
+        'and exit',
+    )
+    parser.add_argument(
+        '--latency-report', action='store_true',
+        help='measure UI latency during a simulated run on a thread and in '
+        'a worker process, append it to logs/latency.jsonl and exit',
+    )
+    return parser.parse_args()
+
+
 if __name__ == '__main__':
+    # The automation runs in a spawned child process of this executable
+    multiprocessing.freeze_support()
+    args = parse_args()
     setup_logging()
     if is_frozen():
         logging.info('Running as a bundled executable.')
-        run_subprocess()
     else:
         logging.info('Running in development mode.')
-        main()
+    main(
+        startup_report=args.startup_report,
+        latency_report=args.latency_report,
+    )
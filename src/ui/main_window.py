@@ -37,7 +37,7 @@ def get_resource_path(relative_path):
 # Replace the direct path with this function
 home_image_path2 = get_resource_path('static/home.png')
 
-print(f"Resolved home image path: {home_image_path2}")
+logging.debug(f"Resolved home image path: {home_image_path2}")
 
 
 class LinkedInAutomationApp(ttk.Window):
@@ -146,14 +146,14 @@ class LinkedInAutomationApp(ttk.Window):
         page = self.pages[page_name]
         page.tkraise()
 
-    def on_upload(self, data, run_id):
-        # Handle the uploaded data if needed
+    def on_upload(self, file_path, run_id):
+        # Handle the uploaded file if needed
         pass
 
     def on_close(self):
         """
         Handles the window close event.
-        Signals the automation thread to stop and waits for it to terminate.
+        Signals the automation process to stop and waits for it to exit.
         """
         if messagebox.askokcancel(
             'Quit',
@@ -163,6 +163,10 @@ class LinkedInAutomationApp(ttk.Window):
                 'Quit signal received. Attempting to stop automation.',
             )
 
-            # Wait for the automation thread to finish
+            # Stop the automation at its next wait or send, and let it log
+            # the end of its run before the app exits
+            self.pages['main'].cancel_automation()
+            self.withdraw()
+            self.pages['main'].wait_for_automation()
 
             self.destroy()
@@ -1,4 +1,4 @@
-import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import BOTH
 from tkinter import END
 from tkinter import LEFT
@@ -9,19 +9,136 @@ from tkinter import Y
 
 import ttkbootstrap as ttk
 
-DB_PATH = 'run_history.db'
+from src.database.handlers import fetch_emails_page
+from src.database.handlers import fetch_runs_page
+from src.database.handlers import get_email_text
+from src.database.search import search_emails
+
+# Load the next page once the visible part of a list reaches this fraction
+LOAD_MORE_THRESHOLD = 0.9
+
+
+class PagedTreeview:
+    """
+    Fills a Treeview one keyset page at a time as the user scrolls.
+
+    `fetch_page(after)` runs on the `loader` executor and returns the next
+    rows; `cursor_of(row)` gives the keyset cursor of a row. Results are
+    handed back to the Tk thread with `after()`, and pages belonging to a
+    list that has since been reset are dropped.
+    """
+
+    def __init__(self, tree, scrollbar, cursor_of, loader):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.cursor_of = cursor_of
+        self.loader = loader
+        self.fetch_page = None
+        self.generation = 0
+        self.cursor = None
+        self.loading = False
+        self.exhausted = True
+        self.on_error = None
+        tree.configure(yscrollcommand=self.on_scroll)
+
+    def clear(self):
+        self.generation += 1
+        self.cursor = None
+        self.loading = False
+        self.exhausted = True
+        self.tree.delete(*self.tree.get_children())
+
+    def reset(self, fetch_page):
+        self.clear()
+        self.fetch_page = fetch_page
+        self.exhausted = False
+        self.load_more()
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(last) >= LOAD_MORE_THRESHOLD:
+            self.load_more()
+
+    def load_more(self):
+        if self.loading or self.exhausted:
+            return
+        self.loading = True
+        generation, fetch_page, cursor = (
+            self.generation, self.fetch_page, self.cursor,
+        )
+
+        def worker():
+            try:
+                rows = fetch_page(cursor)
+            except Exception as e:
+                self.tree.after(0, self.fail, generation, e)
+            else:
+                self.tree.after(0, self.append, generation, rows)
+
+        self.loader.submit(worker)
+
+    def append(self, generation, rows):
+        if generation != self.generation:
+            return
+        self.loading = False
+        for row in rows:
+            self.tree.insert('', END, values=row)
+        if rows:
+            self.cursor = self.cursor_of(rows[-1])
+        else:
+            self.exhausted = True
+            return
+        # Keep filling until the list is scrollable or the data runs out
+        if self.scrollbar.get()[1] >= LOAD_MORE_THRESHOLD:
+            self.load_more()
+
+    def fail(self, generation, error):
+        if generation != self.generation:
+            return
+        self.loading = False
+        self.exhausted = True
+        if self.on_error:
+            self.on_error(error)
 
 
 class HistoryPage(ttk.Frame):
     def __init__(self, parent):
         super().__init__(parent)
+        # One thread runs every page fetch and email text load in order
+        self.loader = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='history-loader',
+        )
+        self.bind('<Destroy>', self.on_destroy)
         self.create_widgets()
 
+    def on_destroy(self, event):
+        if event.widget is self:
+            self.loader.shutdown(wait=False, cancel_futures=True)
+
     def create_widgets(self):
         # Title Label
         label_title = ttk.Label(self, text='Run History', font=('Arial', 16))
         label_title.pack(pady=10)
 
+        # Search box over all logged emails
+        frame_search = ttk.Frame(self)
+        frame_search.pack(fill='x', padx=10)
+
+        self.search_var = ttk.StringVar()
+        entry_search = ttk.Entry(frame_search, textvariable=self.search_var)
+        entry_search.pack(side=LEFT, fill='x', expand=True, padx=(0, 5))
+        entry_search.bind('<Return>', lambda event: self.search())
+
+        button_search = ttk.Button(
+            frame_search, text='Search', command=self.search,
+        )
+        button_search.pack(side=LEFT, padx=(0, 5))
+
+        button_refresh = ttk.Button(
+            frame_search, text='Refresh', command=self.load_runs,
+        )
+        button_refresh.pack(side=LEFT)
+
         # Frame for Runs and Emails Treeviews
         frame_trees = ttk.Frame(self)
         frame_trees.pack(fill=BOTH, expand=True, padx=10, pady=10)
@@ -37,7 +154,16 @@ class HistoryPage(ttk.Frame):
         for col in columns:
             self.tree_runs.heading(col, text=col.replace('_', ' ').title())
             self.tree_runs.column(col, width=100, anchor='center')
-        self.tree_runs.pack(side=LEFT, fill=BOTH, expand=True, padx=(0, 5))
+        scrollbar_runs = Scrollbar(frame_trees, command=self.tree_runs.yview)
+        self.tree_runs.pack(side=LEFT, fill=BOTH, expand=True)
+        scrollbar_runs.pack(side=LEFT, fill=Y, padx=(0, 5))
+        # Runs are ordered by (timestamp, run_id)
+        self.runs_pager = PagedTreeview(
+            self.tree_runs, scrollbar_runs,
+            cursor_of=lambda run: (run[1], run[0]),
+            loader=self.loader,
+        )
+        self.runs_pager.on_error = self.show_load_error
 
         # Bind the selection event for runs
         self.tree_runs.bind('<<TreeviewSelect>>', self.on_run_selected)
@@ -46,15 +172,16 @@ class HistoryPage(ttk.Frame):
         frame_emails = ttk.Frame(frame_trees)
         frame_emails.pack(side=LEFT, fill=BOTH, expand=True)
 
-        # Treeview to display emails for the selected run
+        # Treeview to display emails for the selected run; the email text
+        # is only loaded for the selected email.
         columns_emails = (
             'email_id',
             'run_id',
             'linkedin_profile_url',
-            'email_text',
             'email_status',
             'error_message',
             'timestamp',
+            'snippet',
         )
         self.tree_emails = ttk.Treeview(
             frame_emails,
@@ -62,17 +189,31 @@ class HistoryPage(ttk.Frame):
             show='headings',
             height=10,
         )
+        # The snippet column is only shown for search results
+        self.email_columns = columns_emails[:-1]
+        self.search_columns = columns_emails
         for col in columns_emails:
             self.tree_emails.heading(col, text=col.replace('_', ' ').title())
             # Set appropriate column widths
-            if col == 'email_text':
-                self.tree_emails.column(col, width=200, anchor='w')
-            elif col == 'linkedin_profile_url':
+            if col in ('linkedin_profile_url', 'snippet'):
                 self.tree_emails.column(col, width=150, anchor='w')
             else:
                 self.tree_emails.column(col, width=100, anchor='center')
 
-        self.tree_emails.pack(fill=BOTH, expand=True, padx=(0, 5))
+        scrollbar_emails = Scrollbar(
+            frame_emails, command=self.tree_emails.yview,
+        )
+        self.tree_emails.pack(side=LEFT, fill=BOTH, expand=True)
+        scrollbar_emails.pack(side=LEFT, fill=Y, padx=(0, 5))
+        # Emails are ordered by (timestamp, email_id)
+        self.emails_pager = PagedTreeview(
+            self.tree_emails, scrollbar_emails,
+            cursor_of=lambda email: (email[5], email[0]),
+            loader=self.loader,
+        )
+        self.emails_pager.on_error = self.show_load_error
+        self.tree_emails.configure(displaycolumns=self.email_columns)
+        self.selected_email_id = None
 
         # Bind the selection event for emails
         self.tree_emails.bind('<<TreeviewSelect>>', self.on_email_selected)
@@ -97,21 +238,9 @@ class HistoryPage(ttk.Frame):
         self.load_runs()
 
     def load_runs(self):
-        connection = sqlite3.connect(DB_PATH)
-        cursor = connection.cursor()
-        select_query = 'SELECT * FROM runs ORDER BY timestamp DESC'
-        cursor.execute(select_query)
-        records = cursor.fetchall()
-
-        # Clear existing data in the treeview
-        for row in self.tree_runs.get_children():
-            self.tree_runs.delete(row)
-
-        # Insert new records into the treeview
-        for record in records:
-            self.tree_runs.insert('', END, values=record)
-
-        connection.close()
+        self.runs_pager.reset(fetch_runs_page)
+        self.emails_pager.clear()
+        self.clear_email_text()
 
     def on_run_selected(self, event):
         selected_item = self.tree_runs.selection()
@@ -121,31 +250,50 @@ class HistoryPage(ttk.Frame):
             self.load_emails_for_run(run_id)
 
     def load_emails_for_run(self, run_id):
-        connection = sqlite3.connect(DB_PATH)
-        cursor = connection.cursor()
-        select_query = 'SELECT * FROM emails WHERE run_id = ? ORDER BY timestamp DESC'  # noqa: E501
-        cursor.execute(select_query, (run_id,))
-        records = cursor.fetchall()
-
-        # Clear existing data in the Treeview
-        for row in self.tree_emails.get_children():
-            self.tree_emails.delete(row)
-
-        # Insert new records into the Treeview
-        for record in records:
-            self.tree_emails.insert('', 'end', values=record)
-
-        connection.close()
+        self.tree_emails.configure(displaycolumns=self.email_columns)
+        self.emails_pager.reset(
+            lambda after: fetch_emails_page(run_id, after=after),
+        )
 
         # Clear the email text display when a new run is selected
         self.clear_email_text()
 
+    def search(self):
+        text = self.search_var.get().strip()
+        if not text:
+            return
+        self.tree_runs.selection_remove(self.tree_runs.selection())
+        self.tree_emails.configure(displaycolumns=self.search_columns)
+        # Ranked results come back as a single page
+        self.emails_pager.reset(
+            lambda after: [] if after else search_emails(text),
+        )
+        self.clear_email_text()
+
     def on_email_selected(self, event):
         selected_item = self.tree_emails.selection()
         if selected_item:
-            # Assuming email_text is the fourth column
-            email_text = self.tree_emails.item(selected_item)['values'][3]
-            self.display_full_email_text(email_text)
+            # Assuming email_id is the first column
+            email_id = self.tree_emails.item(selected_item)['values'][0]
+            self.selected_email_id = email_id
+
+            def worker():
+                try:
+                    email_text = get_email_text(email_id)
+                except Exception as e:
+                    self.after(0, self.show_load_error, e)
+                    return
+                self.after(0, self.show_email_text, email_id, email_text)
+
+            self.loader.submit(worker)
+
+    def show_email_text(self, email_id, email_text):
+        # Ignore text arriving after another email was selected
+        if email_id == self.selected_email_id:
+            self.display_full_email_text(email_text or '')
+
+    def show_load_error(self, error):
+        self.display_full_email_text(f'Failed to load history: {error}')
 
     def display_full_email_text(self, email_text):
         self.text_email.config(state='normal')
@@ -154,6 +302,7 @@ class HistoryPage(ttk.Frame):
         self.text_email.config(state='disabled')
 
     def clear_email_text(self):
+        self.selected_email_id = None
         self.text_email.config(state='normal')
         self.text_email.delete(1.0, END)
         self.text_email.config(state='disabled')
@@ -1,32 +1,51 @@
-import sqlite3
-import threading
-import time
 from datetime import datetime
-from datetime import timedelta
 from tkinter import filedialog
 from tkinter import messagebox
+from tkinter import TclError
 from tkinter.scrolledtext import ScrolledText
 
-import pandas as pd
-import pytz
 import ttkbootstrap as ttk
 
+from src.database.checkpoints import get_resume_point
+from src.database.checkpoints import save_checkpoint
+from src.database.connection import database
+from src.database.handlers import count_emails_sent_today
+from src.database.handlers import get_daily_limit
 from src.database.handlers import log_run_end
 from src.database.handlers import log_run_start
-from src.inmail.personalized_email import run_selenium_automation
+from src.database.handlers import reopen_run
+from src.inmail.progress import ProgressStats
+from src.inmail.worker import ERROR
+from src.inmail.worker import NOTICE
+from src.inmail.worker import POLL_INTERVAL_MS
+from src.inmail.worker import PROGRESS
+from src.inmail.worker import SENT_COUNT
 
-DB_PATH = 'run_history.db'
+# How the panel names the stages of ProgressStats
+STAGE_LABELS = {'scrape': 'Scrape', 'draft': 'Draft', 'send': 'Send'}
+
+# Reasons of WaitingForQuota as the panel shows them
+WAIT_LABELS = {
+    'daily_limit': 'Daily limit reached',
+    'send_window': 'Outside the send window',
+}
+
+TIME_FORMAT = '%a %d %b %H:%M %Z'
 
 
 class HomePage(ttk.Frame):
     def __init__(self, parent, upload_callback=None):
         super().__init__(parent)
         self.upload_callback = upload_callback
-        self.csv_data = None  # To store the loaded CSV data
+        self.csv_path = None  # Path of the validated lead CSV
         self.run_id = None    # To store the current run_id
+        self.start_row = 0    # First CSV row of the run, after a resume
 
-        # Thread reference for Selenium automation
-        self.automation_thread = None
+        # Child process running the current automation
+        self.automation = None
+        # Progress of the current run and the scheduler its ETA follows
+        self.progress = ProgressStats()
+        self.scheduler = None
 
         # Initialize variables for daily limit and emails sent today
         self.daily_limit_var = ttk.IntVar()
@@ -181,6 +200,50 @@ class HomePage(ttk.Frame):
             row=5, column=1, sticky='w', padx=5, pady=10, columnspan=2,
         )
 
+        # -----------------------------
+        # Use LLM Cache Checkbox
+        # -----------------------------
+        label_use_cache = ttk.Label(
+            form, text='Reuse Cached Drafts:',
+            font=('Helvetica', 12),
+        )
+        label_use_cache.grid(
+            row=6, column=0, sticky='e', padx=5, pady=10,
+        )
+
+        self.use_cache_var = ttk.BooleanVar(value=True)
+        checkbox_use_cache = ttk.Checkbutton(
+            form,
+            text='',
+            variable=self.use_cache_var,
+            bootstyle='success-round-toggle',
+        )
+        checkbox_use_cache.grid(
+            row=6, column=1, sticky='w', padx=5, pady=10, columnspan=2,
+        )
+
+        # -----------------------------
+        # Single-Shot Drafting Checkbox
+        # -----------------------------
+        label_single_shot = ttk.Label(
+            form, text='Single-Shot Drafting:',
+            font=('Helvetica', 12),
+        )
+        label_single_shot.grid(
+            row=7, column=0, sticky='e', padx=5, pady=10,
+        )
+
+        self.single_shot_var = ttk.BooleanVar(value=False)
+        checkbox_single_shot = ttk.Checkbutton(
+            form,
+            text='',
+            variable=self.single_shot_var,
+            bootstyle='success-round-toggle',
+        )
+        checkbox_single_shot.grid(
+            row=7, column=1, sticky='w', padx=5, pady=10, columnspan=2,
+        )
+
         # -----------------------------
         # Start Button
         # -----------------------------
@@ -190,50 +253,130 @@ class HomePage(ttk.Frame):
             command=self.start_process,
             bootstyle='primary',
         )
-        self.start_button.pack(pady=20)
+        self.start_button.pack(pady=(20, 5))
+
+        controls = ttk.Frame(form_frame)
+        controls.pack(pady=(0, 20))
+        self.pause_button = ttk.Button(
+            controls,
+            text='Pause',
+            command=self.toggle_pause,
+            bootstyle='secondary',
+            state='disabled',
+        )
+        self.pause_button.pack(side='left', padx=5)
+        self.stop_button = ttk.Button(
+            controls,
+            text='Stop',
+            command=self.cancel_automation,
+            bootstyle='danger',
+            state='disabled',
+        )
+        self.stop_button.pack(side='left', padx=5)
+
+        self.create_progress_panel(form_frame)
 
         # Let the reference email text area expand if the window is resized
         form.rowconfigure(4, weight=1)
 
+    def create_progress_panel(self, parent):
+        panel = ttk.Labelframe(parent, text='Progress', padding=(20, 10))
+        panel.pack(fill='x')
+        self.progress_vars = {}
+        rows = [
+            ('status', 'Status:'),
+            ('rows', 'Rows:'),
+            ('rate', 'Throughput:'),
+            *(
+                (stage, f"{label} p50 / p95:")
+                for stage, label in STAGE_LABELS.items()
+            ),
+            ('eta', 'ETA:'),
+        ]
+        for row_index, (key, text) in enumerate(rows):
+            ttk.Label(panel, text=text).grid(
+                row=row_index, column=0, sticky='e', padx=5, pady=2,
+            )
+            self.progress_vars[key] = ttk.StringVar(value='-')
+            ttk.Label(panel, textvariable=self.progress_vars[key]).grid(
+                row=row_index, column=1, sticky='w', padx=5, pady=2,
+            )
+        self.progress_vars['status'].set('Idle')
+
+    def refresh_progress(self):
+        """Show the current run's ProgressStats in the panel."""
+        stats = self.progress
+        if stats.waiting:
+            until = datetime.fromtimestamp(
+                stats.waiting.until, self.scheduler.timezone,
+            )
+            status = (
+                f"{WAIT_LABELS.get(stats.waiting.reason, 'Waiting')}, "
+                f"waiting until {until.strftime(TIME_FORMAT)}"
+            )
+        elif self.pause_button.cget('text') == 'Resume':
+            status = 'Paused'
+        else:
+            status = 'Running'
+        self.progress_vars['status'].set(status)
+
+        total = (
+            '?' if stats.total_rows is None
+            else stats.total_rows - stats.start_row
+        )
+        self.progress_vars['rows'].set(
+            f"{stats.completed} of {total} done ({stats.sent} sent, "
+            f"{stats.failed} failed, {stats.skipped} skipped, "
+            f"{stats.dropped} already handled)",
+        )
+
+        rate = stats.rows_per_hour()
+        self.progress_vars['rate'].set(
+            '-' if rate is None else f"{rate:.1f} rows/hour",
+        )
+        for stage in STAGE_LABELS:
+            latency = stats.stage_latency(stage)
+            self.progress_vars[stage].set(
+                '-' if latency is None
+                else f"{latency[0]:.1f}s / {latency[1]:.1f}s",
+            )
+
+        eta = stats.eta(
+            self.scheduler,
+            daily_limit=self.daily_limit,
+            sent_today=self.emails_sent_today_var.get(),
+        )
+        self.progress_vars['eta'].set(
+            '-' if eta is None else eta.strftime(TIME_FORMAT),
+        )
+
     def load_daily_limit(self):
         """Load the daily limit from the database (settings table)."""
-        connection = sqlite3.connect(DB_PATH)
-        cursor = connection.cursor()
-        cursor.execute("SELECT value FROM settings WHERE key = 'daily_limit'")
-        result = cursor.fetchone()
-        if result:
-            self.daily_limit_var.set(int(result[0]))
-        else:
-            # If not set, default to 100 (or any default you want)
-            self.daily_limit_var.set(100)
-        connection.close()
+        # The last valid limit, used while the entry holds something else
+        self.daily_limit = get_daily_limit()
+        self.daily_limit_var.set(self.daily_limit)
 
     def save_daily_limit(self):
         """Save the daily limit to the database (settings table)."""
-        daily_limit = self.daily_limit_var.get()
-        connection = sqlite3.connect(DB_PATH)
-        cursor = connection.cursor()
-        cursor.execute(
+        database.write(
             'INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)',
-            ('daily_limit', str(daily_limit)),
+            ('daily_limit', str(self.daily_limit)),
         )
-        connection.commit()
-        connection.close()
 
     def update_emails_sent_today(self):
-        """Get the number of emails sent today from the emails table."""
-        connection = sqlite3.connect(DB_PATH)
-        cursor = connection.cursor()
-        cursor.execute(
-            "SELECT COUNT(*) FROM emails WHERE DATE(timestamp) = DATE('now', 'localtime')",
-        )
-        result = cursor.fetchone()
-        emails_sent_today = result[0] if result else 0
-        connection.close()
+        """Get the number of emails sent today from the daily counters."""
+        emails_sent_today = count_emails_sent_today()
         self.emails_sent_today_var.set(emails_sent_today)
 
     def on_daily_limit_changed(self, *args):
+        try:
+            self.daily_limit = self.daily_limit_var.get()
+        except TclError:
+            # Empty or not a number while being edited
+            return
         self.save_daily_limit()
+        if self.automation:
+            self.automation.set_daily_limit(self.daily_limit)
 
     def upload_csv(self):
         """Let user select a CSV and validate it."""
@@ -241,33 +384,21 @@ class HomePage(ttk.Frame):
             filetypes=[('CSV files', '*.csv')],
         )
         if file_path:
+            from src.inmail.leads import validate_lead_columns
+
             self.file_path_var.set(file_path)
             try:
-                data = pd.read_csv(file_path)
-
-                # We check required column(s); in your example, "Person Linkedin Url"
-                if 'Person Linkedin Url' in data.columns:
-                    messagebox.showinfo('Success', 'CSV file is valid.')
-                    self.csv_data = data  # Store the data
-
-                    # Log the start of the run and get run_id
-                    run_id = log_run_start(file_name=file_path)
-                    self.run_id = run_id
-
-                    # Call the upload callback if needed
-                    if self.upload_callback:
-                        self.upload_callback(data, run_id)
-                else:
-                    messagebox.showwarning(
-                        'Validation Error',
-                        "CSV must contain 'Person Linkedin Url' column.",
-                    )
-                    # Log the run as Error due to missing columns
-                    run_id = log_run_start(file_name=file_path)
-                    log_run_end(
-                        run_id, status='Error',
-                        error_message='Missing required columns.',
-                    )
+                # Only the header is read here; rows are streamed during
+                # the run.
+                validate_lead_columns(file_path)
+            except ValueError as e:
+                messagebox.showwarning('Validation Error', str(e))
+                # Log the run as Error due to missing columns
+                run_id = log_run_start(file_name=file_path)
+                log_run_end(
+                    run_id, status='Error',
+                    error_message='Missing required columns.',
+                )
             except Exception as e:
                 messagebox.showerror(
                     'Error',
@@ -276,13 +407,37 @@ class HomePage(ttk.Frame):
                 # Log the run as Error due to exception
                 run_id = log_run_start(file_name=file_path)
                 log_run_end(run_id, status='Error', error_message=str(e))
+            else:
+                messagebox.showinfo('Success', 'CSV file is valid.')
+                self.csv_path = file_path  # Store the file path
+
+                resume_point = get_resume_point(file_path)
+                if resume_point and messagebox.askyesno(
+                    'Resume Run',
+                    f"Run {resume_point[0]} of this file stopped before "
+                    f"row {resume_point[1] + 1}. Resume it?\n\n"
+                    'Leads it already sent to or skipped are not visited '
+                    'again.',
+                ):
+                    run_id, self.start_row = resume_point
+                    reopen_run(run_id)
+                else:
+                    # Log the start of the run and get run_id
+                    run_id = log_run_start(file_name=file_path)
+                    self.start_row = 0
+                    save_checkpoint(run_id, file_path, next_row=0)
+                self.run_id = run_id
+
+                # Call the upload callback if needed
+                if self.upload_callback:
+                    self.upload_callback(file_path, run_id)
 
     def start_process(self):
         """
         Start processing the entire CSV, respecting the daily limit.
         We do not ask for partial runs or a start row anymore.
         """
-        if self.csv_data is None:
+        if self.csv_path is None:
             messagebox.showwarning(
                 'No CSV File', 'Please upload a CSV file before starting.',
             )
@@ -302,154 +457,108 @@ class HomePage(ttk.Frame):
         reference_email = reference_email_text if reference_email_text else None
 
         control_email_sending = self.control_email_sending_var.get()
+        use_cache = self.use_cache_var.get()
+        single_shot = self.single_shot_var.get()
+
+        from src.inmail.scheduler import Scheduler
+        from src.inmail.worker import AutomationProcess
+
+        self.progress = ProgressStats()
+        self.scheduler = Scheduler()
+        self.progress_vars['status'].set('Starting')
+        # The run reads this process's queued writes (e.g. its checkpoint)
+        database.flush()
+        self.automation = AutomationProcess(
+            daily_limit=self.daily_limit,
+            file_path=self.csv_path,    # streamed during the run
+            run_id=self.run_id,
+            start_row=self.start_row,
+            visible_mode=visible_mode,
+            prompt=prompt,
+            reference_email=reference_email,
+            control_email_sending=control_email_sending,
+            use_cache=use_cache,
+            single_shot=single_shot,
+        )
+        self.automation.start()
+        self.pause_button.config(state='normal', text='Pause')
+        self.stop_button.config(state='normal')
+        self.after(POLL_INTERVAL_MS, self.poll_automation)
 
-        # We run everything in a separate thread
-        self.automation_thread = threading.Thread(
-            target=self.run_selenium_thread,
-            args=(
-                self.csv_data,               # the entire data
-                visible_mode,
-                prompt,
-                reference_email,
-                control_email_sending,
-                self.run_id,
-            ),
-            daemon=True,
-        )
-        self.automation_thread.start()
-
-    def run_selenium_thread(
-        self,
-        data,
-        visible_mode,
-        prompt,
-        reference_email,
-        control_email_sending,
-        run_id,
-    ):
+    def poll_automation(self):
         """
-        Process all rows in 'data' chunk by chunk.
-        For each day:
-          - Send up to (daily_limit - emails_sent_today) rows.
-          - If more rows remain, sleep until next day, then continue.
-        We do NOT modify run_selenium_automation; we just pass in subsets of data.
+        Handle the automation's events on the Tk thread, until its process
+        has exited and nothing is left to read.
         """
-        total_rows = len(data)
-        current_index = 0
-        print(f'{total_rows=}')
-        print(f'{current_index=}')
-
+        automation = self.automation
+        events = automation.poll()
+        running = bool(events) or automation.is_alive()
         try:
-            while current_index < total_rows:
-                # Refresh how many emails we've sent today
-                self.after(0, self.update_emails_sent_today)
-                # Wait a tiny bit to ensure emails_sent_today_var is updated
-                time.sleep(0.1)
-
-                emails_sent_today = self.emails_sent_today_var.get()
-                daily_limit = self.daily_limit_var.get()
-
-                # If we are already at or above today's limit, wait until next day
-                if emails_sent_today >= daily_limit:
-                    self.show_info_message(
-                        'Daily Limit Reached',
-                        f"You've reached today's limit of {daily_limit}. "
-                        'Waiting until next day to continue...',
-                    )
-                    self.wait_until_next_day()
-                    continue
-
-                # Figure out how many rows we can process "today"
-                chunk_size = daily_limit - emails_sent_today
-                print(f'{chunk_size=}')
-                remaining = total_rows - current_index
-                print(f'{remaining=}')
-                if chunk_size > remaining:
-                    chunk_size = remaining
-                print(f'{chunk_size=}')
-
-                # Slice the data for today's chunk
-                chunk_data = data.iloc[current_index: current_index + chunk_size]
-
-                # We'll define a callback that runs after run_selenium_automation finishes
-                # but to keep the flow simpler, we can pass a callback that does nothing special:
-                def automation_callback(success, message):
-                    if not success:
-                        self.show_error_message('Automation Error', message)
-
-                # Pass the chunk to run_selenium_automation
-                run_selenium_automation(
-                    data=chunk_data,
-                    visible_mode=visible_mode,
-                    prompt=prompt,
-                    reference_email=reference_email,
-                    control_email_sending=control_email_sending,
-                    run_id=run_id,
-                    callback=automation_callback,
-                )
-
-                # Now we've used chunk_size rows for today
-                current_index += chunk_size
-
-                # Update "emails_sent_today" label (the DB is updated by run_selenium_automation)
-                self.after(0, self.update_emails_sent_today)
-                time.sleep(0.1)
-
-                # If we still have more rows to go and we've used up today's limit, sleep
-                if current_index < total_rows:
-                    # Check how many we have now (in case chunk < daily_limit)
-                    self.after(0, self.update_emails_sent_today)
-                    time.sleep(0.1)
-                    if self.emails_sent_today_var.get() >= daily_limit:
-                        print(
-                            "Today's limit is fully used. Waiting until next day...",
-                        )
-                        self.wait_until_next_day()
-
-            # All rows processed
-            self.show_info_message(
-                'Process Completed',
-                f'Successfully processed all {total_rows} rows.',
-            )
-
-        except Exception as e:
-            self.show_error_message('Process Error', str(e))
+            for event, *values in events:
+                if event == PROGRESS:
+                    self.progress.add(*values)
+                elif event == SENT_COUNT:
+                    self.emails_sent_today_var.set(*values)
+                elif event == NOTICE:
+                    self.show_info_message(*values)
+                elif event == ERROR:
+                    self.show_error_message('Automation Error', *values)
+            if events:
+                self.refresh_progress()
         finally:
-            # Re-enable the buttons once we're done
-            self.enable_start_button()
+            # An event that failed to show must not stop the polling
+            if running:
+                self.after(POLL_INTERVAL_MS, self.poll_automation)
+        if running:
+            return
 
-    def wait_until_next_day(self):
-        """
-        Sleep (block) until 9 AM CET.
-        This stops processing in this thread until the specified time.
-        """
-        # Get current time in UTC
-        now_utc = datetime.now(pytz.utc)
-
-        # Convert to CET
-        cet_timezone = pytz.timezone('CET')
-        now_cet = now_utc.astimezone(cet_timezone)
-
-        # Calculate next 5 AM CET
-        if now_cet.hour >= 5:
-            # If it's past 6 AM today, set to 5 AM next day
-            next_cet = (now_cet + timedelta(days=1)).replace(
-                hour=5, minute=0, second=0, microsecond=0,
+        automation.join()
+        if automation.outcome is None:
+            # The process died without reporting, e.g. it crashed
+            message = (
+                'The automation process exited unexpectedly '
+                f"(exit code {automation.exitcode})."
             )
+            log_run_end(self.run_id, status='Failed', error_message=message)
+            self.show_error_message('Process Error', message)
         else:
-            # If it's before 5 AM today, set to 5 AM today
-            next_cet = now_cet.replace(
-                hour=5, minute=0, second=0, microsecond=0,
-            )
-
-        # Convert the target time back to UTC
-        next_utc = next_cet.astimezone(pytz.utc)
+            status, processed_rows = automation.outcome
+            if status == 'Completed':
+                self.show_info_message(
+                    'Process Completed',
+                    f'Successfully processed all {processed_rows} rows.',
+                )
+        self.automation = None
+        self.pause_button.config(state='disabled', text='Pause')
+        self.stop_button.config(state='disabled')
+        self.progress_vars['status'].set(
+            automation.outcome[0] if automation.outcome else 'Failed',
+        )
+        # Re-enable the buttons once we're done
+        self.enable_start_button()
 
-        # Calculate the time to wait in seconds
-        seconds_to_wait = (next_utc - now_utc).total_seconds()
-        print(f'{next_cet=}')
-        print(f'{seconds_to_wait=}')
-        time.sleep(seconds_to_wait)
+    def toggle_pause(self):
+        """Hold or continue sending; a paused run finishes its current send."""
+        if not self.automation:
+            return
+        if self.pause_button.cget('text') == 'Pause':
+            self.automation.pause()
+            self.pause_button.config(text='Resume')
+        else:
+            self.automation.resume()
+            self.pause_button.config(text='Pause')
+        self.refresh_progress()
+
+    def cancel_automation(self):
+        """Stop the running automation at its next wait or send."""
+        if self.automation:
+            self.automation.stop()
+            self.stop_button.config(state='disabled')
+
+    def wait_for_automation(self):
+        """Wait for a stopped automation to exit, killing it if it hangs."""
+        if self.automation:
+            self.automation.join()
 
     def disable_start_button(self):
         self.start_button.config(state='disabled')
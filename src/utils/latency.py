@@ -0,0 +1,199 @@
+"""
+UI latency under a running automation.
+
+LatencyProbe measures how late the Tk loop runs a callback it scheduled,
+which is the stutter users see while the automation works. A simulated
+run (profile HTML parsing with no browser or LLM) can be hosted on a
+thread of the UI process, as the app used to do, or in the automation
+worker process, to compare the two:
+
+    python src/main.py --latency-report
+
+appends one line per hosting to logs/latency.jsonl and exits.
+"""
+import logging
+import queue
+import statistics
+import threading
+import time
+
+from src.inmail.worker import AutomationProcess
+from src.inmail.worker import DONE
+from src.inmail.worker import follow_commands
+from src.inmail.worker import poll_events
+from src.inmail.worker import POLL_INTERVAL_MS
+from src.inmail.worker import SENT_COUNT
+
+logger = logging.getLogger(__name__)
+
+PROBE_INTERVAL_MS = 20
+
+SIMULATED_ROWS = 100
+
+# Repeated sections of the synthetic profile page; about 150 KB of HTML
+SIMULATED_SECTIONS = 60
+
+
+def build_simulated_page(sections: int = SIMULATED_SECTIONS) -> str:
+    section = (
+        '<section><div id="experience"></div><h2>Experience</h2><ul>'
+        + ''.join(
+            f'<li><span aria-hidden="true">Engineer {position} at Company '
+            f'{position}</span><span class="visually-hidden">Engineer '
+            f'{position}</span><p>Built systems, led teams and shipped '
+            f'products used by many people, year {position}.</p></li>'
+            for position in range(10)
+        )
+        + '</ul></section>'
+    )
+    return (
+        '<html><body><header>' + 'x' * 10000 + '</header><main>'
+        '<h1>Jane Doe</h1>' + section * sections + '</main></body></html>'
+    )
+
+
+def run_simulation(events, commands, rows: int = SIMULATED_ROWS):
+    """
+    A stand-in for run_campaign: parse one profile page per row and report
+    each as sent, obeying pause and stop.
+    """
+    from src.inmail.html_parsing import parse_main_tags
+    from src.inmail.page_text import extract_profile_text
+    from src.inmail.scheduler import Scheduler
+
+    scheduler = Scheduler()
+    threading.Thread(
+        target=follow_commands,
+        args=(commands, scheduler, lambda limit: None),
+        daemon=True,
+    ).start()
+    page = build_simulated_page()
+    processed_rows = 0
+    for _ in range(rows):
+        if not scheduler.wait_while_paused():
+            break
+        extract_profile_text(parse_main_tags(page))
+        processed_rows += 1
+        events.put((SENT_COUNT, processed_rows))
+    status = 'Interrupted' if scheduler.cancelled else 'Completed'
+    events.put((DONE, status, processed_rows))
+
+
+class SimulationThread:
+    """The simulated run hosted on a thread of the UI process."""
+
+    def __init__(self, rows: int = SIMULATED_ROWS):
+        self.events = queue.Queue()
+        self.commands = queue.Queue()
+        self.thread = threading.Thread(
+            target=run_simulation,
+            args=(self.events, self.commands),
+            kwargs={'rows': rows},
+            daemon=True,
+        )
+
+    def start(self):
+        self.thread.start()
+
+    def is_alive(self) -> bool:
+        return self.thread.is_alive()
+
+    def poll(self) -> list[tuple]:
+        return poll_events(self.events)
+
+
+class LatencyProbe:
+    """
+    Schedules a Tk callback every `interval_ms` and records how late each
+    one runs.
+    """
+
+    def __init__(self, widget, interval_ms: int = PROBE_INTERVAL_MS):
+        self.widget = widget
+        self.interval_ms = interval_ms
+        self.delays_ms = []
+        self._due = None
+        self._job = None
+
+    def start(self):
+        self.delays_ms = []
+        self._schedule()
+
+    def _schedule(self):
+        self._due = time.perf_counter() + self.interval_ms / 1000
+        self._job = self.widget.after(self.interval_ms, self._tick)
+
+    def _tick(self):
+        self.delays_ms.append(
+            max(time.perf_counter() - self._due, 0) * 1000,
+        )
+        self._schedule()
+
+    def stop(self) -> dict:
+        """Stop probing and summarize the delays in milliseconds."""
+        if self._job:
+            self.widget.after_cancel(self._job)
+            self._job = None
+        delays = sorted(self.delays_ms) or [0]
+        return {
+            'samples': len(self.delays_ms),
+            'p50_ms': round(statistics.median(delays), 1),
+            'p95_ms': round(delays[int(len(delays) * 0.95)], 1),
+            'max_ms': round(delays[-1], 1),
+        }
+
+
+def measure_simulated_run(window, hosting: str, on_done, rows=SIMULATED_ROWS):
+    """
+    Run the simulation hosted on a 'thread' or in a 'process', probing the
+    Tk loop meanwhile; on_done(result) gets the latency summary.
+    """
+    if hosting == 'process':
+        automation = AutomationProcess(target=run_simulation, rows=rows)
+    else:
+        automation = SimulationThread(rows=rows)
+    probe = LatencyProbe(window)
+    started = time.perf_counter()
+
+    def poll():
+        # Hand events to the UI as HomePage does, one label update each
+        events = automation.poll()
+        for event in events:
+            if event[0] == SENT_COUNT:
+                window.title(f"Simulated run: {event[1]}/{rows}")
+        if events or automation.is_alive():
+            window.after(POLL_INTERVAL_MS, poll)
+            return
+        result = {
+            'hosting': hosting,
+            'rows': rows,
+            'run_seconds': round(time.perf_counter() - started, 2),
+            **probe.stop(),
+        }
+        logger.info(f"UI latency during a simulated run: {result}")
+        on_done(result)
+
+    probe.start()
+    automation.start()
+    window.after(POLL_INTERVAL_MS, poll)
+
+
+def report_latency(window, report_path, rows=SIMULATED_ROWS):
+    """
+    Measure a simulated run on a thread, then in a worker process, append
+    both results to `report_path` and close the window.
+    """
+    from src.utils.startup import write_report
+
+    def measure(hostings):
+        if not hostings:
+            window.destroy()
+            return
+
+        def on_done(result):
+            write_report(report_path, result)
+            measure(hostings[1:])
+
+        measure_simulated_run(window, hostings[0], on_done, rows=rows)
+
+    window.after(1000, measure, ['thread', 'process'])
@@ -0,0 +1,107 @@
+"""
+Cold-start measurements of the desktop app.
+
+Every start logs the time from process start to the first painted window
+and the memory held once the app is idle, along with any heavy stack that
+was imported before it was needed. To benchmark a build, run it with
+--startup-report: it appends the measurement to logs/startup.jsonl and
+exits once idle.
+
+    python src/main.py --startup-report
+    dist/main.exe --startup-report
+
+For a per-module breakdown of import time in script mode, add
+-X importtime (python -X importtime src/main.py --startup-report).
+"""
+import json
+import logging
+import sys
+import time
+from datetime import datetime
+from datetime import timezone
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# Time given to the app after its first paint before it counts as idle
+IDLE_DELAY_MS = 2000
+
+# Packages only the automation needs; none should be loaded at idle
+HEAVY_MODULES = (
+    'pandas',
+    'selenium',
+    'undetected_chromedriver',
+    'bs4',
+    'langchain_core',
+    'langchain_openai',
+    'openai',
+)
+
+
+def get_process_start() -> float:
+    """
+    Epoch time the app was launched at. A one-file PyInstaller build runs
+    in a child of its bootloader, so the unpacking it waits for counts too.
+    """
+    process = psutil.Process()
+    if getattr(sys, 'frozen', False):
+        try:
+            parent = process.parent()
+            if parent and parent.exe() == process.exe():
+                process = parent
+        except psutil.Error:
+            pass
+    return process.create_time()
+
+
+def get_loaded_heavy_modules() -> list[str]:
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+def watch_startup(window, report_path=None):
+    """
+    Measure the start of `window`: time to its first paint and RSS once
+    idle. With `report_path`, append the result there as a JSON line and
+    close the window.
+    """
+    started_at = get_process_start()
+    result = {}
+
+    def on_first_paint(event):
+        if event.widget is not window or result:
+            return
+        result['first_window_seconds'] = round(time.time() - started_at, 3)
+        window.after(IDLE_DELAY_MS, on_idle)
+
+    def on_idle():
+        result['idle_rss_mb'] = round(
+            psutil.Process().memory_info().rss / 2 ** 20, 1,
+        )
+        result['heavy_modules'] = get_loaded_heavy_modules()
+        logger.info(
+            f"Window shown {result['first_window_seconds']:.2f}s after "
+            f"launch; {result['idle_rss_mb']:.0f} MB in use when idle.",
+        )
+        if result['heavy_modules']:
+            logger.warning(
+                'Loaded before first use: '
+                f"{', '.join(result['heavy_modules'])}.",
+            )
+        if report_path:
+            write_report(report_path, result)
+            window.destroy()
+
+    window.bind('<Map>', on_first_paint, add='+')
+
+
+def write_report(report_path, result):
+    record = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'mode': 'frozen' if getattr(sys, 'frozen', False) else 'script',
+        'python': sys.version.split()[0],
+        **result,
+    }
+    with open(report_path, 'a', encoding='utf-8') as report:
+        report.write(json.dumps(record) + '\n')
+    print(json.dumps(record))
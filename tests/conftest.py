@@ -0,0 +1,609 @@
+"""Fakes and fixtures shared by the tests."""
+import asyncio
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from functools import partial
+from pathlib import Path
+from string import Template
+
+import lxml.html
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+from langchain_core.outputs import ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from selenium.common.exceptions import ElementNotInteractableException
+from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.remote.webelement import WebElement
+
+from src.agents import email_writer
+from src.agents import linkedin_info
+from src.agents import single_shot
+from src.agents import subject_writer
+from src.agents.cache import llm_cache
+from src.database import checkpoints
+from src.database import contacts
+from src.database import handlers
+from src.database import search
+from src.database import setup
+from src.database.connection import Database
+from src.inmail import personalized_email
+from src.inmail.driver import DriverManager
+from src.inmail.leads import Lead
+from src.inmail.pipeline import DraftPipeline
+from src.inmail.waits import WaitPolicy
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+
+BLANK_PAGE = '<html><head></head><body></body></html>'
+
+# Simple CSS selectors: a tag, then classes and attribute tests, e.g.
+# "input[aria-label='Message subject']" or ".ql-editor[contenteditable]"
+CSS_SELECTOR_PATTERN = re.compile(r'([\w-]*)((?:\.[\w-]+|\[[^\]]+\])*)')
+CSS_PART_PATTERN = re.compile(
+    r"\.([\w-]+)|\[([\w-]+)(?:=['\"]([^'\"]*)['\"])?\]",
+)
+
+
+def css_to_xpath(selector):
+    match = CSS_SELECTOR_PATTERN.fullmatch(selector.strip())
+    if not match:
+        raise NotImplementedError(f"Unsupported CSS selector {selector!r}")
+    tag, parts = match.groups()
+    tests = []
+    for class_name, attribute, value in CSS_PART_PATTERN.findall(parts):
+        if class_name:
+            tests.append(
+                "contains(concat(' ', normalize-space(@class), ' '), "
+                f"' {class_name} ')",
+            )
+        elif value:
+            tests.append(f"@{attribute}='{value}'")
+        else:
+            tests.append(f"@{attribute}")
+    return f".//{tag or '*'}" + ''.join(f"[{test}]" for test in tests)
+
+
+def to_xpath(by, value):
+    if by == By.XPATH:
+        return value
+    if by == By.ID:
+        return f".//*[@id='{value}']"
+    if by == By.TAG_NAME:
+        return f".//{value}"
+    if by == By.CLASS_NAME:
+        return css_to_xpath(f".{value}")
+    if by == By.CSS_SELECTOR:
+        return css_to_xpath(value)
+    raise NotImplementedError(f"Unsupported locator {by!r}")
+
+
+class FakeElement(WebElement):
+    """
+    An element of a FakeDriver page, stale once the driver left the page.
+    Clicks and typing run the little page behaviour the fixtures declare
+    with data-* attributes.
+    """
+
+    def __init__(self, driver, node):
+        self._parent = driver
+        self._id = f"{id(driver.document)}-{id(node)}"
+        self.node = node
+        self.document = driver.document
+
+    def live_node(self):
+        self._parent.sync()
+        if self._parent.document is not self.document:
+            raise StaleElementReferenceException('The page was left.')
+        return self.node
+
+    @property
+    def tag_name(self):
+        return self.live_node().tag
+
+    @property
+    def text(self):
+        if not self.is_displayed():
+            return ''
+        return ' '.join(self.live_node().text_content().split())
+
+    def is_displayed(self):
+        node = self.live_node()
+        while node is not None:
+            if 'hidden' in node.attrib:
+                return False
+            if 'display: none' in node.get('style', ''):
+                return False
+            node = node.getparent()
+        return True
+
+    def is_enabled(self):
+        return 'disabled' not in self.live_node().attrib
+
+    def get_attribute(self, name):
+        node = self.live_node()
+        if name == 'disabled':
+            return 'true' if name in node.attrib else None
+        return node.get(name)
+
+    def click(self):
+        if not self.is_displayed() or not self.is_enabled():
+            raise ElementNotInteractableException(
+                f"<{self.tag_name}> cannot be clicked.",
+            )
+        self._parent.click(self.node)
+
+    def send_keys(self, *value):
+        node = self.live_node()
+        text = ''.join(value)
+        typed = text.replace(Keys.ENTER, '')
+        if node.get('contenteditable') == 'true':
+            node.text = (node.text or '') + typed
+        else:
+            node.set('value', node.get('value', '') + typed)
+        if Keys.ENTER in text:
+            self._parent.press_enter(node)
+
+    def find_elements(self, by=By.ID, value=None):
+        return [
+            FakeElement(self._parent, node)
+            for node in self.live_node().xpath(to_xpath(by, value))
+            if self._parent.rendered(node)
+        ]
+
+    def find_element(self, by=By.ID, value=None):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"No element at {by}={value!r}.")
+        return elements[0]
+
+
+class FakeDriver:
+    """
+    Stands in for Chrome, remembering the profile it was launched with.
+
+    With a `site` it browses the site's local HTML pages. get() and
+    refresh() return once the new page has loaded, after
+    `site.navigation_seconds`. A reload started from a script returns at
+    once: the old page stays current for `site.load_seconds`, then the new
+    one reads 'loading' for as long again. Elements marked data-late render
+    `site.render_seconds` after their page loaded.
+    """
+
+    def __init__(self, visible_mode=False, user_data_dir=None, site=None):
+        self.user_data_dir = user_data_dir
+        self.site = site
+        self.closed = False
+        self.current_url = None
+        self.source = BLANK_PAGE
+        self.document = lxml.html.document_fromstring(BLANK_PAGE)
+        self.navigations = []
+        self.loaded_at = self.ready_at = time.perf_counter()
+        # (url, when it replaces the page) of a reload still in flight
+        self.pending = None
+        if site:
+            site.drivers.append(self)
+
+    @property
+    def page_source(self):
+        self.sync()
+        return self.source
+
+    def sync(self):
+        """Replace the page once a pending reload reaches it."""
+        if self.pending and time.perf_counter() >= self.pending[1]:
+            url, _ = self.pending
+            self.pending = None
+            self.load(url, loading_seconds=self.site.load_seconds)
+
+    def load(self, url, loading_seconds=0):
+        self.current_url = url
+        self.source = self.site.page(url) if self.site else BLANK_PAGE
+        self.document = lxml.html.document_fromstring(self.source)
+        self.loaded_at = time.perf_counter()
+        self.ready_at = self.loaded_at + loading_seconds
+
+    def rendered(self, node):
+        if 'data-late' not in node.attrib:
+            return True
+        return time.perf_counter() >= (
+            self.loaded_at + self.site.render_seconds
+        )
+
+    def navigate(self, url):
+        self.navigations.append(url)
+        if self.site:
+            time.sleep(self.site.navigation_seconds)
+        self.pending = None
+        self.load(url)
+
+    def get(self, url):
+        self.navigate(url)
+
+    def refresh(self):
+        self.navigate(self.current_url)
+
+    def reload(self):
+        self.navigations.append(self.current_url)
+        delay = self.site.load_seconds if self.site else 0
+        self.pending = (self.current_url, time.perf_counter() + delay)
+
+    def execute_script(self, script, *args):
+        self.sync()
+        if script == 'return document.readyState':
+            if time.perf_counter() < self.ready_at:
+                return 'loading'
+            return 'complete'
+        if 'location.reload' in script:
+            return self.reload()
+        if 'scrollIntoView' in script:
+            return None
+        if script == 'arguments[0].click();':
+            return args[0].click()
+        raise NotImplementedError(f"Unsupported script {script!r}")
+
+    def find_elements(self, by=By.ID, value=None):
+        self.sync()
+        if by == By.TAG_NAME:
+            xpath = f"descendant-or-self::{value}"
+        else:
+            xpath = to_xpath(by, value)
+        return [
+            FakeElement(self, node)
+            for node in self.document.xpath(xpath)
+            if self.rendered(node)
+        ]
+
+    def find_element(self, by=By.ID, value=None):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"No element at {by}={value!r}.")
+        return elements[0]
+
+    def node_by_id(self, element_id):
+        return self.document.get_element_by_id(element_id)
+
+    def click(self, node):
+        if node.get('data-reveals'):
+            self.node_by_id(node.get('data-reveals')).attrib.pop('hidden')
+        if node.get('data-hides'):
+            self.node_by_id(node.get('data-hides')).set('hidden', '')
+        if node.get('data-sends'):
+            subject, = self.document.xpath(
+                ".//input[@aria-label='Message subject']",
+            )
+            editor, = self.document.xpath(".//*[@contenteditable='true']")
+            self.site.send(
+                SentMessage(
+                    profile_id=node.get('data-sends'),
+                    subject=subject.get('value', ''),
+                    body=editor.text_content(),
+                    driver=self,
+                ),
+            )
+
+    def press_enter(self, node):
+        if node.get('data-saves-email'):
+            self.site.save_email(
+                node.get('data-saves-email'), node.get('value'),
+            )
+            node.set('hidden', '')
+
+    def quit(self):
+        self.closed = True
+
+
+@dataclass
+class SentMessage:
+    profile_id: str
+    subject: str
+    body: str
+    driver: FakeDriver
+
+
+class PageChatModel(FakeListChatModel):
+    """
+    A FakeListChatModel for the drafting chains that replies with the
+    prompt's last message, so every draft traces back to its page. Bound
+    to a structured output schema, it fills each field with
+    '<field> for <prompt>' in one tool call. Replies take `seconds`, or
+    `delays[marker]` for prompts containing the marker, and raise for
+    prompts containing a marker in `fail_on`. Prompts are recorded.
+    """
+
+    responses: list[str] = []
+    seconds: float = 0
+    delays: dict[str, float] = {}
+    fail_on: set[str] = set()
+    prompts: list[str] = []
+    in_flight: int = 0
+    max_in_flight: int = 0
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(
+            tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs,
+        )
+
+    def delay(self, prompt):
+        for marker, seconds in self.delays.items():
+            if marker in prompt:
+                return seconds
+        return self.seconds
+
+    def reply(self, messages, tools=None, **kwargs):
+        prompt = messages[-1].content
+        self.prompts.append(prompt)
+        for marker in self.fail_on:
+            if marker in prompt:
+                raise RuntimeError(f"The LLM failed on {marker}.")
+        if tools:
+            function = tools[0]['function']
+            message = AIMessage(
+                content='',
+                tool_calls=[
+                    {
+                        'name': function['name'],
+                        'args': {
+                            field: f"{field} for {prompt}"
+                            for field in function['parameters']['properties']
+                        },
+                        'id': f"call-{len(self.prompts)}",
+                    },
+                ],
+            )
+        else:
+            message = AIMessage(content=prompt)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.delay(messages[-1].content))
+        return self.reply(messages, **kwargs)
+
+    async def _agenerate(
+        self, messages, stop=None, run_manager=None, **kwargs,
+    ):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay(messages[-1].content))
+        finally:
+            self.in_flight -= 1
+        return self.reply(messages, **kwargs)
+
+
+class FakeDrafter:
+    """
+    Stands in for generate_personal_email: each draft takes `seconds` of
+    LLM time and fails for the profile names in `fail_for`.
+    """
+
+    def __init__(self, seconds=0, fail_for=()):
+        self.seconds = seconds
+        self.fail_for = set(fail_for)
+        self.names = []
+
+    def __call__(self, page_summary, **kwargs):
+        name = re.search(r'^Name:\n(.+)$', page_summary, re.MULTILINE)[1]
+        self.names.append(name)
+        time.sleep(self.seconds)
+        if name in self.fail_for:
+            raise RuntimeError(f"The LLM failed to draft for {name}.")
+        return f"Hi {name}, we are hiring.", f"A role for {name}"
+
+
+class FakeRecruiter:
+    """
+    Local HTML stand-ins for LinkedIn, for leads whose profile URLs end in
+    a slug like 'lead-3': profile pages made from the saved
+    profile_page.html and Recruiter pages from talent_profile.html.
+
+    Profiles in `emails_on_file` already have an email address; the others
+    go through 'Add email'. Profiles in `inmail_only` open the composer on
+    InMail and must be switched to email. Saved addresses and sent
+    messages are recorded, with the driver that sent them.
+    """
+
+    profile_page = (FIXTURES / 'profile_page.html').read_text(encoding='utf-8')
+    talent_page = Template(
+        (FIXTURES / 'talent_profile.html').read_text(encoding='utf-8'),
+    )
+
+    def __init__(
+        self,
+        navigation_seconds=0,
+        load_seconds=0,
+        render_seconds=0,
+        emails_on_file=(),
+        inmail_only=(),
+    ):
+        self.navigation_seconds = navigation_seconds
+        self.load_seconds = load_seconds
+        self.render_seconds = render_seconds
+        self.emails_on_file = set(emails_on_file)
+        self.inmail_only = set(inmail_only)
+        self.drafter = FakeDrafter()
+        self.drivers = []
+        self.saved_emails = {}
+        self.sent = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def profile_id(slug):
+        return f"id-{slug}"
+
+    @staticmethod
+    def name(slug):
+        return slug.replace('-', ' ').title()
+
+    def page(self, url):
+        match = re.search(r'/in/([\w-]+)', url or '')
+        if match:
+            slug = match[1]
+            return self.profile_page.replace(
+                'Jane Doe', self.name(slug),
+            ).replace('ACoAAJaneDoe', self.profile_id(slug))
+        match = re.search(r'/talent/profile/id-([\w-]+)', url or '')
+        if match:
+            return self.talent(match[1])
+        return BLANK_PAGE
+
+    def talent(self, slug):
+        profile_id = self.profile_id(slug)
+        email = self.saved_emails.get(profile_id)
+        if slug in self.emails_on_file:
+            email = f"{slug}@example.com"
+        if email:
+            contact = (
+                f"<span data-test-contact-email-address>{email}</span>"
+            )
+        else:
+            contact = (
+                '<button class="button-small-muted-tertiary '
+                'contact-info__add" data-late data-reveals="add-email">'
+                'Add email'
+                '</button><input id="add-email" type="email" hidden '
+                f'data-saves-email="{profile_id}">'
+            )
+        return self.talent_page.substitute(
+            name=self.name(slug),
+            profile_id=profile_id,
+            contact=contact,
+            channel='InMail' if slug in self.inmail_only else 'Email',
+        )
+
+    def save_email(self, profile_id, email):
+        with self._lock:
+            self.saved_emails[profile_id] = email
+
+    def send(self, message):
+        with self._lock:
+            self.sent.append(message)
+
+    def sent_slugs(self):
+        return [
+            message.profile_id.removeprefix('id-') for message in self.sent
+        ]
+
+
+class FakeClock:
+    """
+    Fake time for a Scheduler: waits advance `current` instead of sleeping,
+    unless the event is set first. `during_wait(clock)` runs at the start
+    of every wait, standing in for another thread acting meanwhile.
+    """
+
+    def __init__(self, current, during_wait=None):
+        self.current = current
+        self.during_wait = during_wait
+        self.waits = []
+
+    def now(self, timezone):
+        return self.current.astimezone(timezone)
+
+    def wait(self, event, seconds):
+        self.waits.append(seconds)
+        if self.during_wait:
+            self.during_wait(self)
+        if not event.is_set():
+            self.current += timedelta(seconds=seconds)
+        return event.is_set()
+
+
+def guess_email_per_row(row):
+    """The email guess as it was made row by row before it was vectorized."""
+    first_name = row['First Name'].lower()
+    last_name = row['Last Name'].lower()
+    company_slug = re.sub(
+        r'[^\w\s-]', '', row['Company'],
+    ).lower().replace(' ', '-')
+    return f"{first_name}.{last_name}@{company_slug}.com"
+
+
+def build_leads(count, start=0):
+    return [
+        Lead(
+            index=index,
+            linkedin_url=f"https://www.linkedin.com/in/lead-{index}",
+            email=f"lead-{index}@example.com",
+        )
+        for index in range(start, start + count)
+    ]
+
+
+@pytest.fixture
+def make_leads():
+    """make_leads(count, start=0) builds leads with distinct profiles."""
+    return build_leads
+
+
+@pytest.fixture
+def fake_clock():
+    """A FakeClock at 09:00 UTC on Monday, 4 March 2024."""
+    return FakeClock(datetime(2024, 3, 4, 9, 0, tzinfo=timezone.utc))
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A migrated run_history.db in a temporary directory."""
+    database = Database(str(tmp_path / 'run_history.db'))
+    for module in [checkpoints, contacts, handlers, search, setup]:
+        monkeypatch.setattr(module, 'database', database)
+    setup.create_database()
+    yield database
+    database.flush()
+
+
+def clear_chains():
+    for get_chain in [
+        email_writer.get_email_chain,
+        linkedin_info.get_page_summary_chain,
+        single_shot.get_single_shot_chain,
+        subject_writer.get_subject_chain,
+    ]:
+        get_chain.cache_clear()
+
+
+@pytest.fixture
+def chat_model(db, monkeypatch):
+    """
+    A PageChatModel behind every drafting chain, with the LLM cache kept
+    in `db`.
+    """
+    model = PageChatModel()
+    for module in [email_writer, linkedin_info, single_shot, subject_writer]:
+        monkeypatch.setattr(module, 'get_llm', lambda: model)
+    monkeypatch.setattr(llm_cache, 'db', db)
+    clear_chains()
+    yield model
+    clear_chains()
+
+
+@pytest.fixture
+def recruiter(db, monkeypatch):
+    """
+    Run the real automation on FakeDrivers browsing a FakeRecruiter, with
+    drafts from its FakeDrafter and no human jitter.
+    """
+    site = FakeRecruiter()
+    monkeypatch.setattr(
+        personalized_email, 'DriverManager',
+        partial(DriverManager, factory=partial(FakeDriver, site=site)),
+    )
+    monkeypatch.setattr(
+        personalized_email, 'DraftPipeline',
+        partial(DraftPipeline, draft_func=site.drafter),
+    )
+    monkeypatch.setattr(
+        personalized_email, 'WaitPolicy',
+        partial(WaitPolicy, jitter_scale=0),
+    )
+    return site
@@ -0,0 +1,70 @@
+import logging
+
+from src.agents import main
+from src.agents.main import generate_personal_emails
+
+PAGES = [f"<page {index}>" for index in range(6)]
+
+
+def assert_drafted(result, page):
+    email, subject = result
+    # The email is drafted from the page's summary, the subject from it
+    assert email == f"Here is receiver profile: {page}"
+    assert subject == (
+        f"Here is email you need to generate subject for: {email}"
+    )
+
+
+def test_results_keep_the_order_of_the_pages(chat_model):
+    # Later pages answer first
+    chat_model.delays = {
+        page: 0.01 * (len(PAGES) - index) for index, page in enumerate(PAGES)
+    }
+
+    results = generate_personal_emails(
+        PAGES, max_concurrency=len(PAGES), timeout=5, use_cache=False,
+    )
+
+    assert len(results) == len(PAGES)
+    for result, page in zip(results, PAGES):
+        assert_drafted(result, page)
+
+
+def test_concurrency_is_capped(chat_model):
+    chat_model.seconds = 0.01
+
+    results = generate_personal_emails(
+        PAGES, max_concurrency=2, timeout=5, use_cache=False,
+    )
+
+    assert all(isinstance(result, tuple) for result in results)
+    assert chat_model.max_in_flight == 2
+
+
+def test_a_page_that_times_out_fails_alone(chat_model, caplog):
+    chat_model.delays = {'<page 1>': 1}
+
+    with caplog.at_level(logging.WARNING, logger=main.__name__):
+        results = generate_personal_emails(
+            PAGES, max_concurrency=len(PAGES), timeout=0.2, use_cache=False,
+        )
+
+    assert isinstance(results[1], TimeoutError)
+    for index, page in enumerate(PAGES):
+        if index != 1:
+            assert_drafted(results[index], page)
+    assert 'Drafting page 1 failed: TimeoutError()' in caplog.text
+
+
+def test_a_page_that_raises_fails_alone(chat_model):
+    chat_model.fail_on = {'<page 2>'}
+
+    results = generate_personal_emails(
+        PAGES, max_concurrency=len(PAGES), timeout=5, use_cache=False,
+    )
+
+    assert isinstance(results[2], RuntimeError)
+    assert str(results[2]) == 'The LLM failed on <page 2>.'
+    for index, page in enumerate(PAGES):
+        if index != 2:
+            assert_drafted(results[index], page)
@@ -0,0 +1,177 @@
+from collections import Counter
+
+import pytest
+
+from src.database.checkpoints import DRAFTED
+from src.database.checkpoints import get_completed_profiles
+from src.database.checkpoints import get_resume_point
+from src.database.checkpoints import mark_lead_state
+from src.database.checkpoints import normalize_profile_url
+from src.database.checkpoints import save_checkpoint
+from src.database.handlers import log_email
+from src.database.handlers import log_run_end
+from src.database.handlers import log_run_start
+from src.database.handlers import reopen_run
+from src.inmail import campaign
+from src.inmail import leads
+from src.inmail.campaign import Campaign
+from src.inmail.campaign import COMPLETED
+from src.inmail.leads import iter_new_leads
+from src.inmail.scheduler import Scheduler
+from src.inmail.scheduler import SendWindow
+
+ROWS = 6
+
+
+class Crash(Exception):
+    """The process dying at a given lead and stage."""
+
+
+class FakeAutomation:
+    """
+    Stands in for run_selenium_automation, walking each lead through the
+    states the real one records and crashing once at `crash_at`, a
+    (row index, stage) pair.
+    """
+
+    def __init__(self, crash_at=None):
+        self.crash_at = crash_at
+        self.sent = Counter()
+
+    def crash_point(self, lead, stage):
+        if self.crash_at == (lead.index, stage):
+            self.crash_at = None
+            raise Crash(f"Crashed at row {lead.index} once {stage}")
+
+    def __call__(self, data, run_id, callback, before_send, **kwargs):
+        for lead in data:
+            self.crash_point(lead, 'scraped')
+            mark_lead_state(run_id, lead.linkedin_url, DRAFTED)
+            self.crash_point(lead, 'drafted')
+            assert before_send()
+            self.sent[lead.linkedin_url] += 1
+            log_email(
+                run_id=run_id,
+                linkedin_profile_url=lead.linkedin_url,
+                email_text='Hello',
+                email_status='Sent',
+            )
+            self.crash_point(lead, 'sent')
+        callback(success=True, message='Run completed successfully.')
+
+
+def write_leads(path, urls):
+    lines = ['Person Linkedin Url,Email']
+    lines += [
+        f"{url},lead-{index}@example.com" for index, url in enumerate(urls)
+    ]
+    path.write_text('\n'.join(lines) + '\n')
+    return str(path)
+
+
+@pytest.fixture
+def lead_file(tmp_path):
+    return write_leads(
+        tmp_path / 'leads.csv',
+        [f"https://www.linkedin.com/in/lead-{index}" for index in range(ROWS)],
+    )
+
+
+@pytest.fixture
+def automation(db, monkeypatch):
+    automation = FakeAutomation()
+    monkeypatch.setattr(campaign, 'run_selenium_automation', automation)
+    # Leave resuming to the run's own checkpoint and lead states, not the
+    # cool-down on contacted profiles
+    monkeypatch.setattr(
+        leads, 'get_recently_contacted',
+        lambda profile_keys, cooldown_days: set(),
+    )
+    return automation
+
+
+def start_run(file_path, clock):
+    """Start or resume a run of `file_path` the way the CLI does."""
+    resume_point = get_resume_point(file_path)
+    if resume_point:
+        run_id, start_row = resume_point
+        reopen_run(run_id)
+    else:
+        run_id, start_row = log_run_start(file_name=file_path), 0
+        save_checkpoint(run_id, file_path, next_row=0)
+    return Campaign(
+        file_path,
+        run_id,
+        daily_limit=lambda: 100,
+        scheduler=Scheduler(window=SendWindow(), clock=clock),
+        start_row=start_row,
+    )
+
+
+@pytest.mark.parametrize(
+    'crash_at', [
+        (0, 'scraped'),
+        (2, 'drafted'),
+        (2, 'sent'),
+        (ROWS - 1, 'sent'),
+    ],
+)
+def test_resumed_run_sends_every_lead_once(
+    automation, lead_file, fake_clock, crash_at,
+):
+    automation.crash_at = crash_at
+    crashed = start_run(lead_file, fake_clock)
+    with pytest.raises(Crash):
+        crashed.run()
+    log_run_end(crashed.run_id, status='Failed')
+
+    resumed = start_run(lead_file, fake_clock)
+
+    assert resumed.run_id == crashed.run_id
+    assert resumed.run() == COMPLETED
+    assert automation.sent == {
+        f"https://www.linkedin.com/in/lead-{index}": 1
+        for index in range(ROWS)
+    }
+    # The finished run is no longer offered for resume
+    assert get_resume_point(lead_file) is None
+
+
+def test_resume_starts_at_the_checkpoint(automation, lead_file, fake_clock):
+    first = start_run(lead_file, fake_clock)
+    save_checkpoint(first.run_id, lead_file, next_row=4)
+
+    resumed = start_run(lead_file, fake_clock)
+
+    assert resumed.start_row == 4
+    assert resumed.run() == COMPLETED
+    assert set(automation.sent) == {
+        'https://www.linkedin.com/in/lead-4',
+        'https://www.linkedin.com/in/lead-5',
+    }
+
+
+def test_other_spellings_of_a_handled_profile_are_skipped(db, tmp_path):
+    run_id = log_run_start(file_name='leads.csv')
+    log_email(
+        run_id=run_id,
+        linkedin_profile_url='https://www.linkedin.com/in/jane-doe/',
+        email_text='Hello',
+        email_status='Sent',
+    )
+    lead_file = write_leads(
+        tmp_path / 'leads.csv', [
+            'http://uk.linkedin.com/in/Jane-Doe?trk=search',
+            'https://www.linkedin.com/in/john-roe',
+            'linkedin.com/in/john-roe/',
+        ],
+    )
+
+    completed = get_completed_profiles(run_id)
+    # Without the cool-down, only the run's own lead states drop leads
+    new_leads = list(
+        iter_new_leads(lead_file, completed=completed, cooldown_days=0),
+    )
+
+    assert completed == {normalize_profile_url('linkedin.com/in/jane-doe')}
+    assert [lead.index for lead in new_leads] == [1]
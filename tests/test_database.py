@@ -0,0 +1,100 @@
+import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import ExitStack
+
+import pytest
+
+from src.database.connection import MAX_IDLE_READERS
+from src.database.connection import MAX_WRITE_BATCH
+
+
+def set_value(key, value):
+    def write(connection):
+        return connection.execute(
+            'INSERT INTO settings (key, value) VALUES (?, ?)', (key, value),
+        ).lastrowid
+    return write
+
+
+def fail_after_writing(connection):
+    connection.execute(
+        "INSERT INTO settings (key, value) VALUES ('partial', 'x')",
+    )
+    raise ValueError('Failed halfway.')
+
+
+def settings_rows(db):
+    return dict(db.query('SELECT key, value FROM settings ORDER BY key'))
+
+
+def test_a_failing_write_rolls_back_only_its_savepoint(db):
+    batch = [
+        (set_value('first', '1'), Future()),
+        (fail_after_writing, Future()),
+        # A constraint error inside SQLite is contained the same way
+        (set_value('first', 'duplicate'), Future()),
+        (set_value('last', '2'), Future()),
+    ]
+    connection = db.connect()
+
+    db._write_batch(connection, batch)
+
+    # The rest of the batch was committed
+    assert settings_rows(db) == {'first': '1', 'last': '2'}
+    first, failed, duplicate, last = [future for _, future in batch]
+    assert first.result() and last.result()
+    with pytest.raises(ValueError, match='Failed halfway.'):
+        failed.result()
+    with pytest.raises(sqlite3.IntegrityError):
+        duplicate.result()
+    assert not connection.in_transaction
+
+
+def test_queued_writes_are_committed_in_batches(db, monkeypatch):
+    batch_sizes = []
+    write_batch = db._write_batch
+
+    def record_batch(connection, batch):
+        batch_sizes.append(len(batch))
+        write_batch(connection, batch)
+
+    monkeypatch.setattr(db, '_write_batch', record_batch)
+    started = threading.Event()
+    release = threading.Event()
+
+    def block(connection):
+        started.set()
+        release.wait(timeout=5)
+
+    db.submit(block)
+    assert started.wait(timeout=5)
+    # Queued while the writer is busy
+    futures = [
+        db.submit(set_value(f"key-{index}", str(index)))
+        for index in range(MAX_WRITE_BATCH + 50)
+    ]
+    release.set()
+
+    assert all(future.result(timeout=5) for future in futures)
+    assert batch_sizes == [1, MAX_WRITE_BATCH, 50]
+    assert len(settings_rows(db)) == MAX_WRITE_BATCH + 50
+
+
+def test_idle_readers_are_capped_and_reused(db):
+    with ExitStack() as stack:
+        # Borrowed at once, as by more threads than the pool keeps
+        connections = [
+            stack.enter_context(db.reader())
+            for _ in range(MAX_IDLE_READERS + 2)
+        ]
+
+    # They are given back last first: readers beyond the cap are closed
+    closed, kept = connections[:2], connections[2:]
+    for connection in closed:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute('SELECT 1')
+    # and the last one kept is the next one borrowed
+    with db.reader() as connection:
+        assert connection is kept[0]
+    assert db.query_one('SELECT 1') == (1,)
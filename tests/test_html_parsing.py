@@ -0,0 +1,56 @@
+import logging
+
+import pytest
+from bs4.builder import builder_registry
+
+from src.inmail import html_parsing
+from src.inmail.html_parsing import get_parser
+from src.inmail.html_parsing import parse_main_tags
+from src.inmail.page_text import extract_profile_text
+from src.utils.latency import build_simulated_page
+from tests.conftest import FIXTURES
+
+PAGES = [
+    (FIXTURES / 'profile_page.html').read_text(encoding='utf-8'),
+    build_simulated_page(sections=3),
+]
+
+
+@pytest.fixture
+def without_lxml(monkeypatch):
+    """bs4 as it is when lxml is not installed."""
+    lookup = builder_registry.lookup
+
+    def lookup_without_lxml(*features):
+        if 'lxml' in features:
+            return None
+        return lookup(*features)
+
+    monkeypatch.setattr(builder_registry, 'lookup', lookup_without_lxml)
+    get_parser.cache_clear()
+    yield
+    get_parser.cache_clear()
+
+
+def test_lxml_is_preferred():
+    get_parser.cache_clear()
+
+    assert get_parser() == 'lxml'
+
+
+def test_falls_back_to_html_parser_without_lxml(without_lxml, caplog):
+    with caplog.at_level(logging.INFO, logger=html_parsing.__name__):
+        parser = get_parser()
+
+    assert parser == 'html.parser'
+    assert "HTML parser 'lxml' is not available." in caplog.text
+    # and profile pages still parse with it
+    main, = parse_main_tags(PAGES[0])
+    assert main.find('h1').get_text(strip=True) == 'Jane Doe'
+
+
+@pytest.mark.parametrize('page', PAGES)
+def test_both_parsers_give_the_same_profile_text(page):
+    assert extract_profile_text(
+        parse_main_tags(page, parser='lxml'),
+    ) == extract_profile_text(parse_main_tags(page, parser='html.parser'))
@@ -0,0 +1,170 @@
+import csv
+
+import pandas as pd
+import pytest
+
+from src.inmail.leads import guess_emails
+from src.inmail.leads import iter_lead_batches
+from src.inmail.leads import iter_leads
+from src.inmail.leads import validate_lead_columns
+from tests.conftest import guess_email_per_row
+
+COLUMNS = [
+    'First Name', 'Last Name', 'Title', 'Company', 'Email',
+    'Person Linkedin Url', 'City',
+]
+# Rows of lead_file without a LinkedIn URL
+NO_URL = {3, 11, 20}
+# (first name, last name, company) with awkward characters
+NAMES = [
+    ('Jane', 'Doe', 'Example'),
+    ('JOHN', "O'Connor", 'Acme Corp.'),
+    ('Élise', 'Müller', 'Café Noir GmbH'),
+    ('Li', 'Wei', 'AT&T'),
+    ('Ann', 'Lee', 'Procter & Gamble'),
+    ('Bob', 'Ray', 'Two  Spaces\tand a tab'),
+    ('Ivan', 'Petrenko', 'ДТЕК'),
+    ('Sam', 'Hill', 'under_score-dash (EU)'),
+]
+
+
+def lead_row(index, **values):
+    return {
+        'First Name': f"First{index}",
+        'Last Name': f"Last{index}",
+        'Title': 'CTO',
+        'Company': 'Example',
+        'Email': f"lead-{index}@example.com",
+        'Person Linkedin Url': f"https://www.linkedin.com/in/lead-{index}",
+        'City': 'Kyiv',
+        **values,
+    }
+
+
+def write_csv(path, rows, columns=COLUMNS):
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, columns, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+    return str(path)
+
+
+@pytest.fixture
+def lead_file(tmp_path):
+    """25 leads, the NO_URL rows without a LinkedIn URL."""
+    return write_csv(
+        tmp_path / 'leads.csv',
+        [
+            lead_row(
+                index,
+                **({'Person Linkedin Url': ''} if index in NO_URL else {}),
+            )
+            for index in range(25)
+        ],
+    )
+
+
+def test_only_the_header_is_validated(tmp_path):
+    path = write_csv(
+        tmp_path / 'leads.csv', [lead_row(0)],
+        columns=['City', 'Email', 'Person Linkedin Url'],
+    )
+
+    # Lead columns in the file, in LEAD_COLUMNS order
+    assert validate_lead_columns(path) == ['Person Linkedin Url', 'Email']
+
+
+@pytest.mark.parametrize(
+    ('content', 'message'),
+    [
+        ('Email,Company\nlead@example.com,Example\n', "'Person Linkedin Url'"),
+        ('', 'No columns to parse'),
+    ],
+)
+def test_files_without_the_url_column_are_rejected(
+    tmp_path, content, message,
+):
+    path = tmp_path / 'leads.csv'
+    path.write_text(content)
+
+    with pytest.raises(ValueError, match=message):
+        validate_lead_columns(path)
+
+
+def test_rows_without_a_url_are_dropped_keeping_file_indexes(lead_file):
+    batches = list(iter_lead_batches(lead_file, chunksize=10))
+
+    assert [len(batch) for batch in batches] == [9, 9, 4]
+    leads = [lead for batch in batches for lead in batch]
+    assert [lead.index for lead in leads] == [
+        index for index in range(25) if index not in NO_URL
+    ]
+    for lead in leads:
+        assert lead.linkedin_url.endswith(f"/lead-{lead.index}")
+        assert lead.email == f"lead-{lead.index}@example.com"
+        assert lead.first_name == f"First{lead.index}"
+
+
+def test_batches_resume_from_a_start_row(lead_file):
+    batches = list(iter_lead_batches(lead_file, chunksize=10, start_row=12))
+
+    # Chunks count file rows, before rows without a URL are dropped
+    assert [len(batch) for batch in batches] == [9, 3]
+    assert [lead.index for batch in batches for lead in batch] == [
+        12, 13, 14, 15, 16, 17, 18, 19, 21, 22, 23, 24,
+    ]
+    assert [
+        lead.index for lead in iter_leads(lead_file, start_row=12)
+    ] == [12, 13, 14, 15, 16, 17, 18, 19, 21, 22, 23, 24]
+
+
+def test_missing_lead_columns_are_empty(tmp_path):
+    path = write_csv(
+        tmp_path / 'leads.csv', [lead_row(0)],
+        columns=['Person Linkedin Url', 'Email'],
+    )
+
+    lead, = iter_leads(path)
+
+    assert lead.email == 'lead-0@example.com'
+    assert lead.first_name is lead.last_name is lead.company is None
+    assert not lead.email_guessed
+
+
+def test_guessed_emails_match_the_per_row_guess():
+    frame = pd.DataFrame(
+        NAMES, columns=['First Name', 'Last Name', 'Company'],
+    ).astype('string')
+
+    assert guess_emails(frame).tolist() == [
+        guess_email_per_row(row) for _, row in frame.iterrows()
+    ]
+
+
+def test_only_missing_emails_are_guessed(tmp_path):
+    rows = [
+        lead_row(
+            index, **{
+                'First Name': first_name,
+                'Last Name': last_name,
+                'Company': company,
+                'Email': '' if index % 2 else f"lead-{index}@example.com",
+            },
+        )
+        for index, (first_name, last_name, company) in enumerate(NAMES)
+    ]
+    # Nothing to guess from
+    rows.append(lead_row(len(NAMES), **{'Email': '', 'Company': ''}))
+    path = write_csv(tmp_path / 'leads.csv', rows)
+
+    leads = list(iter_leads(path, chunksize=3))
+
+    for lead, row in zip(leads[:-1], rows):
+        if lead.index % 2:
+            assert lead.email == guess_email_per_row(row)
+            assert lead.email_guessed
+        else:
+            assert lead.email == row['Email']
+            assert not lead.email_guessed
+    assert leads[-1].email is None
+    assert not leads[-1].email_guessed
@@ -0,0 +1,110 @@
+from pathlib import Path
+
+from src.inmail.html_parsing import parse_main_tags
+from src.inmail.page_text import estimate_tokens
+from src.inmail.page_text import extract_profile_text
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+PROFILE_PAGE = (FIXTURES / 'profile_page.html').read_text(encoding='utf-8')
+
+ABOUT_LINE = (
+    'I build data platforms that turn billions of raw events a day into '
+    'trustworthy analytics.'
+)
+
+
+def blocks(profile_text):
+    """The profile text as {title: lines}."""
+    parsed = {}
+    for block in profile_text.split('\n\n'):
+        title, *lines = block.split('\n')
+        parsed[title.rstrip(':')] = lines
+    return parsed
+
+
+def test_keeps_the_profile_sections_in_order():
+    text = extract_profile_text(parse_main_tags(PROFILE_PAGE))
+
+    assert list(blocks(text)) == [
+        'Name', 'Headline', 'About', 'Experience', 'Skills',
+    ]
+    assert blocks(text)['Name'] == ['Jane Doe']
+    assert blocks(text)['Headline'] == [
+        'Staff Data Engineer at Acme Analytics | Kafka, Spark, Python',
+    ]
+    assert blocks(text)['Skills'] == ['Apache Kafka', 'Apache Spark']
+
+
+def test_drops_other_sections_and_page_chrome():
+    text = extract_profile_text(parse_main_tags(PROFILE_PAGE))
+
+    for removed in [
+        # Sections the summarizer does not need
+        'Kyiv Polytechnic Institute',
+        'Hiring! We are looking',
+        'People also viewed',
+        'Mary Major',
+        # Navigation and the sidebar outside <main>
+        'My Network',
+        'Richard Miles',
+        # Buttons, counters and links
+        'Endorse',
+        'endorsement',
+        'Show all',
+        'see more',
+        'connections',
+    ]:
+        assert removed not in text
+
+
+def test_deduplicates_lines():
+    text = extract_profile_text(parse_main_tags(PROFILE_PAGE))
+    experience = blocks(text)['Experience']
+
+    # Screen-reader copies and long lines repeated in another section
+    assert text.count(ABOUT_LINE) == 1
+    assert experience.count('Staff Data Engineer') == 1
+    # Short lines only go when repeated back to back
+    assert experience.count('Acme Analytics · Full-time') == 2
+    assert experience.count('Globex') == 1
+
+
+def test_cuts_whole_lines_to_the_token_budget():
+    text = extract_profile_text(parse_main_tags(PROFILE_PAGE), token_budget=50)
+
+    assert list(blocks(text)) == ['Name', 'Headline', 'About']
+    assert blocks(text)['About'] == [ABOUT_LINE]
+    # Titles and separators count towards the budget too
+    for token_budget in range(5, 400, 5):
+        text = extract_profile_text(
+            parse_main_tags(PROFILE_PAGE), token_budget=token_budget,
+        )
+        assert estimate_tokens(text) <= token_budget
+
+
+def test_falls_back_to_the_whole_main_without_sections():
+    page = (
+        '<main><div>Open to work</div><div>Open to work</div>'
+        '<div>Backend engineer who likes boring, reliable systems.</div>'
+        '<button>Message</button></main>'
+    )
+
+    text = extract_profile_text(parse_main_tags(page))
+
+    assert blocks(text) == {
+        'Profile': [
+            'Open to work',
+            'Backend engineer who likes boring, reliable systems.',
+        ],
+    }
+
+
+def test_uses_far_fewer_tokens_than_the_whole_main():
+    whole_main = '\n'.join(
+        main.get_text(separator=' ', strip=True)
+        for main in parse_main_tags(PROFILE_PAGE)
+    )
+
+    text = extract_profile_text(parse_main_tags(PROFILE_PAGE))
+
+    assert estimate_tokens(text) < estimate_tokens(whole_main) * 0.75
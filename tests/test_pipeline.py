@@ -0,0 +1,172 @@
+import threading
+import time
+
+import pytest
+
+from src.database.handlers import log_run_start
+from src.inmail.personalized_email import run_selenium_automation
+from src.inmail.pipeline import DraftPipeline
+from src.inmail.progress import RowScraped
+from src.inmail.progress import RowSent
+
+ROWS = 8
+# Each row loads three pages: the profile, the Recruiter profile and its
+# refresh before composing
+NAVIGATION_SECONDS = 0.03
+DRAFT_SECONDS = 0.1
+
+
+def run_rows(leads, lookahead, **kwargs):
+    outcome = {}
+    started = time.perf_counter()
+    run_selenium_automation(
+        data=leads,
+        visible_mode=False,
+        control_email_sending=False,
+        lookahead=lookahead,
+        callback=lambda success, message: outcome.update(success=success),
+        **kwargs,
+    )
+    return outcome, (time.perf_counter() - started) / len(leads)
+
+
+@pytest.fixture
+def site(recruiter):
+    recruiter.navigation_seconds = NAVIGATION_SECONDS
+    recruiter.drafter.seconds = DRAFT_SECONDS
+    return recruiter
+
+
+def test_rows_are_sent_in_order_with_their_drafts(site, make_leads):
+    outcome, _ = run_rows(make_leads(ROWS), lookahead=2, finalize_run=False)
+
+    assert outcome == {'success': True}
+    assert site.sent_slugs() == [f"lead-{index}" for index in range(ROWS)]
+    for message in site.sent:
+        name = site.name(message.profile_id.removeprefix('id-'))
+        assert message.subject == f"A role for {name}"
+        assert message.body == f"Hi {name}, we are hiring."
+
+
+def test_drafting_overlaps_with_the_browser(site, make_leads):
+    browser_seconds = 3 * NAVIGATION_SECONDS
+    _, serial = run_rows(make_leads(ROWS), lookahead=0, finalize_run=False)
+    _, pipelined = run_rows(
+        make_leads(ROWS, start=ROWS), lookahead=2, finalize_run=False,
+    )
+
+    # Without lookahead every row pays for the browser and the LLM
+    assert serial >= browser_seconds + DRAFT_SECONDS
+    # With it a row costs about max(browser, LLM), not their sum; the
+    # first draft cannot be hidden and is spread over the rows
+    assert pipelined < max(browser_seconds, DRAFT_SECONDS) * 1.4
+    assert pipelined < serial * 0.7
+
+
+def test_lookahead_bounds_the_rows_scraped_ahead(site, make_leads):
+    counts = {'scraped': 0, 'sent': 0}
+    ahead_at_scrape = []
+
+    def on_progress(event):
+        if isinstance(event, RowScraped):
+            ahead_at_scrape.append(counts['scraped'] - counts['sent'])
+            counts['scraped'] += 1
+        elif isinstance(event, RowSent):
+            counts['sent'] += 1
+
+    run_rows(
+        make_leads(ROWS),
+        lookahead=2,
+        finalize_run=False,
+        on_progress=on_progress,
+    )
+
+    # Never more than the row being sent plus two scraped ahead
+    assert max(ahead_at_scrape) == 2
+
+
+def test_a_failed_draft_is_logged_and_the_run_goes_on(
+    site, db, make_leads,
+):
+    site.drafter.seconds = 0
+    site.drafter.fail_for = {'Lead 2'}
+
+    outcome, _ = run_rows(
+        make_leads(ROWS),
+        lookahead=2,
+        run_id=log_run_start('leads.csv'),
+    )
+
+    assert outcome == {'success': True}
+    assert site.sent_slugs() == [
+        f"lead-{index}" for index in range(ROWS) if index != 2
+    ]
+    db.flush()
+    assert db.query(
+        "SELECT linkedin_profile_url, email_text, error_message "
+        "FROM emails WHERE email_status = 'Failed'",
+    ) == [
+        (
+            'https://www.linkedin.com/in/lead-2',
+            '',
+            'The LLM failed to draft for Lead 2.',
+        ),
+    ]
+
+
+def test_stopping_before_a_send_interrupts_the_run(
+    site, db, make_leads,
+):
+    sends_allowed = iter([True, True])
+    run_id = log_run_start('leads.csv')
+
+    outcome, _ = run_rows(
+        make_leads(ROWS),
+        lookahead=2,
+        run_id=run_id,
+        before_send=lambda: next(sends_allowed, False),
+    )
+
+    assert outcome == {'success': False}
+    assert site.sent_slugs() == ['lead-0', 'lead-1']
+    # Rows past the lookahead were never scraped, let alone drafted
+    assert len(site.drafter.names) <= 2 + 3
+    db.flush()
+    assert db.query_one(
+        'SELECT status FROM runs WHERE run_id = ?', (run_id,),
+    ) == ('Interrupted',)
+
+
+def test_shutdown_cancels_the_drafts_still_queued():
+    started = threading.Event()
+    release = threading.Event()
+
+    def draft(page_summary, **kwargs):
+        started.set()
+        release.wait(timeout=5)
+        return f"Email for {page_summary}", 'Subject'
+
+    pipeline = DraftPipeline(draft_func=draft, max_workers=1)
+    queued = [
+        pipeline.submit(
+            index=index,
+            linkedin_profile=f"https://www.linkedin.com/in/lead-{index}",
+            profile_email_address=f"lead-{index}@example.com",
+            profile_id=f"id-lead-{index}",
+            page_text=f"Name:\nLead {index}",
+        )
+        for index in range(3)
+    ]
+    assert started.wait(timeout=5)
+
+    pipeline.shutdown()
+    release.set()
+
+    assert len(pipeline) == 0
+    # The draft already running finishes; the ones behind it never start
+    assert queued[0].draft.result(timeout=5) == (
+        'Email for Name:\nLead 0', 'Subject',
+    )
+    assert [scraped.draft.cancelled() for scraped in queued] == [
+        False, True, True,
+    ]
@@ -0,0 +1,105 @@
+import html
+import json
+import time
+
+import pytest
+from bs4 import BeautifulSoup
+
+from src.inmail.personalized_email import extract_profile_id
+
+MARKER = 'identityDashProfilesByMemberIdentity'
+PROFILE_ID = 'ACoAAB1234XYZ'
+BLOBS = 40
+ROUND_TRIP_SECONDS = 0.002
+
+
+def code_tag(payload):
+    return f"<code style=\"display: none\">{html.escape(payload)}</code>"
+
+
+def profile_page(with_profile=True):
+    """A profile page with many <code> JSON blobs, as LinkedIn serves it."""
+    blobs = [
+        code_tag(json.dumps({'data': {'included': [{'index': index}]}}))
+        for index in range(BLOBS)
+    ]
+    # A truncated payload mentioning the marker must not stop the search
+    blobs.insert(BLOBS // 2, code_tag(f'{{"data": {{"{MARKER}": '))
+    if with_profile:
+        payload = {
+            'data': {
+                'data': {
+                    MARKER: {
+                        '*elements': [f"urn:li:fsd_profile:{PROFILE_ID}"],
+                    },
+                },
+            },
+        }
+        blobs.append(code_tag(json.dumps(payload)))
+    return (
+        '<html><head><title>Profile</title></head><body>'
+        f"<main><h1>Jane Doe</h1></main>{''.join(blobs)}"
+        '</body></html>'
+    )
+
+
+class RemoteElement:
+    def __init__(self, driver, tag):
+        self.driver = driver
+        self.tag = tag
+
+    def get_attribute(self, name):
+        self.driver.round_trip()
+        return self.tag.get_text()
+
+
+class RemoteDriver:
+    """Serves a page with every WebDriver call costing a round trip."""
+
+    def __init__(self, page_source):
+        self.soup = BeautifulSoup(page_source, 'html.parser')
+        self.round_trips = 0
+
+    def round_trip(self):
+        self.round_trips += 1
+        time.sleep(ROUND_TRIP_SECONDS)
+
+    def find_elements(self, by, value):
+        self.round_trip()
+        return [RemoteElement(self, tag) for tag in self.soup.find_all(value)]
+
+
+def extract_profile_id_per_element(driver):
+    """The lookup as it was before: one innerHTML fetch per <code> tag."""
+    for element in driver.find_elements('tag name', 'code'):
+        content = element.get_attribute('innerHTML')
+        if MARKER in content:
+            try:
+                urn = json.loads(content)['data']['data'][MARKER]['*elements']
+                return urn[0].split(':')[-1]
+            except (json.JSONDecodeError, KeyError, IndexError):
+                continue
+    raise ValueError('Profile ID extraction failed.')
+
+
+def test_profile_id_matches_the_per_element_lookup():
+    page_source = profile_page()
+    driver = RemoteDriver(page_source)
+
+    started = time.perf_counter()
+    legacy = extract_profile_id_per_element(driver)
+    legacy_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    profile_id = extract_profile_id(page_source)
+    seconds = time.perf_counter() - started
+
+    assert profile_id == legacy == PROFILE_ID
+    # One find_elements plus one innerHTML per blob, against none at all
+    assert driver.round_trips == BLOBS + 3
+    assert seconds < legacy_seconds
+
+
+def test_missing_profile_id_raises():
+    with pytest.raises(ValueError):
+        extract_profile_id(profile_page(with_profile=False))
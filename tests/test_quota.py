@@ -0,0 +1,110 @@
+import threading
+from datetime import datetime
+from datetime import timezone
+
+import pytest
+
+from src.config import settings
+from src.database import handlers
+from src.database.handlers import count_emails_sent_today
+from src.database.handlers import get_quota_day
+from src.database.handlers import get_quota_state
+from src.database.handlers import log_email
+from src.database.handlers import log_run_start
+
+WRITERS = 8
+EMAILS_PER_WRITER = 25
+SEATS = ['', 'seat-a', 'seat-b']
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Pins datetime.now() in the handlers to `clock.now_value`."""
+
+    class FrozenDatetime(datetime):
+        now_value = None
+
+        @classmethod
+        def now(cls, tz=None):
+            return cls.now_value.astimezone(tz)
+
+    monkeypatch.setattr(handlers, 'datetime', FrozenDatetime)
+    return FrozenDatetime
+
+
+def log_sent(run_id, index, sender_seat=None, email_status='Sent'):
+    return log_email(
+        run_id=run_id,
+        linkedin_profile_url=f"https://www.linkedin.com/in/lead-{index}",
+        email_text='Hello',
+        email_status=email_status,
+        sender_seat=sender_seat,
+    )
+
+
+def test_quota_day_follows_the_quota_timezone(monkeypatch):
+    moment = datetime(2024, 3, 1, 23, 30, tzinfo=timezone.utc)
+
+    monkeypatch.setattr(settings, 'QUOTA_TIMEZONE', 'UTC')
+    assert get_quota_day(moment) == '2024-03-01'
+    monkeypatch.setattr(settings, 'QUOTA_TIMEZONE', 'Europe/Kyiv')
+    assert get_quota_day(moment) == '2024-03-02'
+    monkeypatch.setattr(settings, 'QUOTA_TIMEZONE', 'America/New_York')
+    assert get_quota_day(moment) == '2024-03-01'
+
+
+def test_quota_rolls_over_at_midnight(db, clock, monkeypatch):
+    monkeypatch.setattr(settings, 'QUOTA_TIMEZONE', 'America/New_York')
+    run_id = log_run_start('leads.csv')
+
+    # 23:50 in New York, already the next day in UTC
+    clock.now_value = datetime(2024, 3, 2, 4, 50, tzinfo=timezone.utc)
+    for index in range(3):
+        log_sent(run_id, index)
+    log_sent(run_id, 3, email_status='Failed')
+    before_midnight = get_quota_state()
+
+    clock.now_value = datetime(2024, 3, 2, 5, 10, tzinfo=timezone.utc)
+    log_sent(run_id, 4)
+    after_midnight = get_quota_state()
+
+    assert before_midnight == {
+        'day': '2024-03-01',
+        'total': 4,
+        'by_status': {'Sent': 3, 'Failed': 1},
+    }
+    assert after_midnight == {
+        'day': '2024-03-02',
+        'total': 1,
+        'by_status': {'Sent': 1},
+    }
+
+
+def test_concurrent_writers_keep_the_counters_exact(db):
+    run_id = log_run_start('leads.csv')
+    start = threading.Barrier(WRITERS)
+
+    def writer(number):
+        start.wait()
+        for offset in range(EMAILS_PER_WRITER):
+            index = number * EMAILS_PER_WRITER + offset
+            log_sent(run_id, index, sender_seat=SEATS[index % len(SEATS)])
+
+    threads = [
+        threading.Thread(target=writer, args=(number,))
+        for number in range(WRITERS)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    total = get_quota_state()['total']
+    assert total == WRITERS * EMAILS_PER_WRITER
+    assert total == db.query_one('SELECT COUNT(*) FROM emails')[0]
+    for seat in SEATS:
+        logged = db.query_one(
+            "SELECT COUNT(*) FROM emails WHERE COALESCE(sender_seat, '') = ?",
+            (seat,),
+        )[0]
+        assert count_emails_sent_today(sender_seat=seat) == logged
@@ -0,0 +1,156 @@
+from datetime import datetime
+from datetime import time
+from datetime import timezone
+
+import pytest
+
+from src.inmail.scheduler import Scheduler
+from src.inmail.scheduler import SendWindow
+
+WORKDAYS = SendWindow(
+    start=time(9, 0),
+    end=time(17, 0),
+    weekdays=frozenset(range(5)),
+)
+
+
+def at(day, hour, minute=0):
+    """`hour`:`minute` UTC on `day` March 2024; the 4th is a Monday."""
+    return datetime(2024, 3, day, hour, minute, tzinfo=timezone.utc)
+
+
+def make_scheduler(clock, window=WORKDAYS, spread_quota=False):
+    return Scheduler(
+        window=window,
+        timezone='UTC',
+        spread_quota=spread_quota,
+        clock=clock,
+    )
+
+
+def test_waits_over_the_weekend(fake_clock):
+    fake_clock.current = at(9, 12)  # Saturday
+    scheduler = make_scheduler(fake_clock)
+
+    assert not scheduler.in_window()
+    assert scheduler.wait_for_window()
+    assert fake_clock.current == at(11, 9)
+
+
+def test_inside_the_window_does_not_wait(fake_clock):
+    fake_clock.current = at(5, 16, 59)
+    scheduler = make_scheduler(fake_clock)
+
+    assert scheduler.wait_for_window()
+    assert fake_clock.current == at(5, 16, 59)
+    assert fake_clock.waits == []
+
+
+def test_next_day_skips_to_the_next_sending_day(fake_clock):
+    fake_clock.current = at(8, 16)  # Friday
+    scheduler = make_scheduler(fake_clock)
+
+    assert scheduler.wait_for_next_day()
+    assert fake_clock.current == at(11, 9)
+
+
+def test_cancel_ends_the_wait(fake_clock):
+    fake_clock.current = at(9, 12)
+    scheduler = make_scheduler(fake_clock)
+    fake_clock.during_wait = lambda clock: (
+        len(clock.waits) == 3 and scheduler.cancel()
+    )
+
+    assert not scheduler.wait_for_window()
+    assert len(fake_clock.waits) == 3
+    # Later waits return at once
+    assert not scheduler.wait_for_next_day()
+    assert len(fake_clock.waits) == 3
+
+
+def test_wake_ends_the_wait_early(fake_clock):
+    fake_clock.current = at(9, 12)
+    scheduler = make_scheduler(fake_clock)
+    fake_clock.during_wait = lambda clock: (
+        len(clock.waits) == 2 and scheduler.wake()
+    )
+
+    assert scheduler.wait_for_window()
+    assert len(fake_clock.waits) == 2
+    assert fake_clock.current == at(9, 12, 1)
+
+
+def test_wake_before_a_wait_is_ignored(fake_clock):
+    fake_clock.current = at(9, 12)
+    scheduler = make_scheduler(fake_clock)
+
+    scheduler.wake()
+
+    assert scheduler.wait_for_window()
+    assert fake_clock.current == at(11, 9)
+
+
+def test_overnight_window(fake_clock):
+    window = SendWindow(
+        start=time(22, 0),
+        end=time(6, 0),
+        weekdays=frozenset([0]),
+    )
+    fake_clock.current = at(4, 12)
+    scheduler = make_scheduler(fake_clock, window=window)
+
+    # Monday's window runs into Tuesday morning
+    assert scheduler.in_window(at(4, 23))
+    assert scheduler.in_window(at(5, 5, 59))
+    assert not scheduler.in_window(at(5, 6))
+    assert not scheduler.in_window(at(5, 23))
+    assert scheduler.current_window(at(5, 2)) == (at(4, 22), at(5, 6))
+    assert scheduler.next_day_start(at(5, 2)) == at(11, 22)
+
+    assert scheduler.wait_for_window()
+    assert fake_clock.current == at(4, 22)
+
+    fake_clock.current = at(5, 4)
+    assert scheduler.send_interval(remaining_quota=4) == 30 * 60
+
+
+def test_empty_window_is_rejected():
+    with pytest.raises(ValueError):
+        SendWindow(start=time(9, 0), end=time(9, 0))
+
+
+def test_spread_quota_paces_the_sends(fake_clock):
+    fake_clock.current = at(4, 9)
+    window = SendWindow(start=time(9, 0), end=time(12, 0))
+    scheduler = make_scheduler(fake_clock, window=window, spread_quota=True)
+
+    send_times = []
+    for remaining_quota in [3, 2, 1]:
+        assert scheduler.wait_for_send_slot(remaining_quota)
+        send_times.append(fake_clock.current)
+
+    assert send_times == [at(4, 9), at(4, 10), at(4, 11)]
+
+
+def test_pause_holds_sends_until_resumed(fake_clock):
+    fake_clock.current = at(4, 10)
+    scheduler = make_scheduler(fake_clock)
+    scheduler.pause()
+    fake_clock.during_wait = lambda clock: (
+        len(clock.waits) == 5 and scheduler.resume()
+    )
+
+    assert scheduler.paused
+    assert scheduler.wait_for_send_slot(remaining_quota=10)
+    assert not scheduler.paused
+    assert len(fake_clock.waits) == 5
+
+
+def test_cancel_while_paused(fake_clock):
+    fake_clock.current = at(4, 10)
+    scheduler = make_scheduler(fake_clock)
+    scheduler.pause()
+    fake_clock.during_wait = lambda clock: scheduler.cancel()
+
+    assert not scheduler.wait_for_send_slot(remaining_quota=10)
+    assert len(fake_clock.waits) == 1
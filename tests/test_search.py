@@ -0,0 +1,118 @@
+import sqlite3
+import sys
+
+import pytest
+
+from src.database import migrations
+from src.database import search
+from src.database.handlers import log_email
+from src.database.handlers import log_run_start
+from src.database.search import build_match_query
+from src.database.search import search_emails
+
+
+def log(run_id, slug, email_text, subject=None):
+    return log_email(
+        run_id=run_id,
+        linkedin_profile_url=f"https://www.linkedin.com/in/{slug}",
+        email_text=email_text,
+        email_status='Sent',
+        subject=subject,
+    ).result()
+
+
+def found(text):
+    return [row[0] for row in search_emails(text)]
+
+
+@pytest.fixture
+def no_fts5(monkeypatch):
+    """Migrate as on an SQLite built without FTS5."""
+    def create_email_search(connection):
+        raise sqlite3.OperationalError('no such module: fts5')
+
+    monkeypatch.setattr(
+        migrations, 'create_email_search', create_email_search,
+    )
+
+
+@pytest.fixture
+def db_without_fts5(no_fts5, db):
+    return db
+
+
+def test_match_query_quotes_words_and_prefixes_the_last():
+    assert build_match_query('rust "backend') == '"rust" """backend"*'
+    assert build_match_query('  ') is None
+
+
+def test_search_follows_inserts_updates_and_deletes(db):
+    run_id = log_run_start('leads.csv')
+    rust = log(run_id, 'jane-doe', 'We need a Rust engineer')
+    python = log(
+        run_id, 'john-roe', 'Hi John', subject='Python backend role',
+    )
+
+    # Email text, subject and profile URL are indexed
+    assert found('rust') == [rust]
+    assert found('python') == [python]
+    assert found('jane') == [rust]
+    # The last word matches while it is being typed
+    assert found('eng') == [rust]
+
+    db.write(
+        'UPDATE emails SET email_text = ? WHERE email_id = ?',
+        ('We need a Go engineer', rust),
+    ).result()
+    assert found('rust') == []
+    assert found('go engineer') == [rust]
+
+    db.write('DELETE FROM emails WHERE email_id = ?', (python,)).result()
+    assert found('python') == []
+    assert found('hi') == []
+
+
+def test_search_ranks_and_snippets_matches(db):
+    run_id = log_run_start('leads.csv')
+    once = log(run_id, 'jane-doe', 'Kotlin or Java, and more Kotlin later')
+    twice = log(run_id, 'john-roe', 'Kotlin Kotlin Kotlin')
+
+    rows = search_emails('kotlin')
+
+    assert [row[0] for row in rows] == [twice, once]
+    assert rows[1][6].startswith('[Kotlin] or Java')
+
+
+def test_search_falls_back_to_like_without_fts5(db_without_fts5):
+    with db_without_fts5.reader() as connection:
+        assert not search.has_email_search(connection)
+    run_id = log_run_start('leads.csv')
+    rust = log(run_id, 'jane-doe', 'We need a Rust engineer at 100%')
+    log(run_id, 'john-roe', 'Hi John', subject='Python backend role')
+
+    assert found('rust engineer') == [rust]
+    assert found('jane') == [rust]
+    # LIKE wildcards in the search box are matched literally
+    assert found('100%') == [rust]
+    assert found('_') == []
+    assert found('rust python') == []
+
+
+def test_rebuild_from_the_command_line(db, monkeypatch, capsys):
+    run_id = log_run_start('leads.csv')
+    email_id = log(run_id, 'jane-doe', 'We need a Rust engineer')
+    db.write(
+        "INSERT INTO emails_fts (emails_fts) VALUES ('delete-all')",
+    ).result()
+    assert found('rust') == []
+
+    monkeypatch.setattr(
+        sys, 'argv', ['search.py', '--rebuild', 'rust', 'engineer'],
+    )
+    search.main()
+
+    rebuilt, result = capsys.readouterr().out.splitlines()
+    assert rebuilt.startswith('Email search index rebuilt in ')
+    assert result.startswith(f"{email_id} | ")
+    assert '[Rust] [engineer]' in result
+    assert found('rust') == [email_id]
@@ -0,0 +1,121 @@
+import time
+from collections import Counter
+
+import pytest
+
+from src.database.handlers import count_emails_sent_today
+from src.database.handlers import log_email
+from src.database.handlers import log_run_start
+from src.inmail.seats import get_seats
+from src.inmail.seats import run_seat_pool
+from src.inmail.seats import shard_rows
+
+ROWS = 12
+# Page loads are the browser time a seat spends per row
+NAVIGATION_SECONDS = 0.02
+
+
+def test_shard_rows_deals_round_robin():
+    positions, assigned = shard_rows(list(range(7)), {'a': 5, 'b': 5})
+
+    assert positions == {'a': [0, 2, 4, 6], 'b': [1, 3, 5]}
+    assert assigned == 7
+
+
+def test_shard_rows_respects_capacity():
+    positions, assigned = shard_rows(
+        list(range(10)), {'a': 1, 'b': 3, 'c': 0},
+    )
+
+    assert positions == {'a': [0], 'b': [1, 2, 3], 'c': []}
+    # Rows past the seats' capacity wait for the next day
+    assert assigned == 4
+
+
+@pytest.fixture
+def site(recruiter):
+    recruiter.navigation_seconds = NAVIGATION_SECONDS
+    return recruiter
+
+
+def run_seats(leads, seats):
+    run_id = log_run_start('leads.csv')
+    outcome = {}
+    started = time.perf_counter()
+    assigned = run_seat_pool(
+        data=leads,
+        seats=seats,
+        visible_mode=False,
+        control_email_sending=False,
+        run_id=run_id,
+        callback=lambda success, message: outcome.update(success=success),
+    )
+    assert outcome == {'success': True}
+    return assigned, time.perf_counter() - started
+
+
+def make_seats(tmp_path, count, daily_limit=100):
+    return get_seats(
+        profile_dirs=[tmp_path / f"seat-{index}" for index in range(count)],
+        daily_limit=daily_limit,
+    )
+
+
+def sent_by_seat(site):
+    return Counter(
+        message.driver.user_data_dir.name for message in site.sent
+    )
+
+
+def test_seats_send_in_parallel(site, db, make_leads, tmp_path):
+    _, one_seat = run_seats(make_leads(ROWS), make_seats(tmp_path, 1))
+    site.sent.clear()
+    assigned, three_seats = run_seats(
+        make_leads(ROWS, start=ROWS), make_seats(tmp_path, 3),
+    )
+
+    assert assigned == ROWS
+    assert one_seat / three_seats > 2
+    # Every lead got its own email, exactly once
+    assert sorted(site.sent_slugs()) == sorted(
+        f"lead-{index}" for index in range(ROWS, 2 * ROWS)
+    )
+    for message in site.sent:
+        slug = message.profile_id.removeprefix('id-')
+        assert message.body == f"Hi {site.name(slug)}, we are hiring."
+        # after adding the lead's address to the Recruiter profile
+        assert site.saved_emails[message.profile_id] == f"{slug}@example.com"
+    # from one Chrome profile per seat, logged against that seat
+    assert sent_by_seat(site) == {'seat-0': 4, 'seat-1': 4, 'seat-2': 4}
+    # Email logs are written in the background
+    db.flush()
+    assert dict(
+        db.query(
+            'SELECT sender_seat, COUNT(*) FROM emails '
+            "WHERE email_status = 'Sent' AND sender_seat LIKE 'seat-%' "
+            'GROUP BY sender_seat',
+        ),
+    ) == {'seat-0': 4 + ROWS, 'seat-1': 4, 'seat-2': 4}
+    assert all(driver.closed for driver in site.drivers)
+
+
+def test_seats_stop_at_their_daily_limit(site, db, make_leads, tmp_path):
+    seats = make_seats(tmp_path, 2, daily_limit=4)
+    # seat-0 already sent three emails today
+    run_id = log_run_start('earlier.csv')
+    for index in range(3):
+        log_email(
+            run_id=run_id,
+            linkedin_profile_url=f"https://linkedin.com/in/earlier-{index}",
+            email_text='Hello',
+            email_status='Sent',
+            sender_seat='seat-0',
+        )
+
+    assigned, _ = run_seats(make_leads(ROWS), seats)
+
+    assert assigned == 5
+    assert sent_by_seat(site) == {'seat-0': 1, 'seat-1': 4}
+    db.flush()
+    assert count_emails_sent_today(sender_seat='seat-0') == 4
+    assert count_emails_sent_today(sender_seat='seat-1') == 4
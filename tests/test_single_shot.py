@@ -0,0 +1,53 @@
+from src.agents.main import generate_personal_email
+from src.agents.main import generate_personal_emails
+from src.agents.single_shot import generate_personal_email_single_shot
+
+PAGES = ['Name:\nJane Doe', 'Name:\nJohn Roe']
+
+
+def prompt(page):
+    return f"Here is receiver LinkedIn page: {page}"
+
+
+def test_single_shot_drafts_both_fields_in_one_call(chat_model):
+    email, subject = generate_personal_email(
+        PAGES[0], use_cache=False, single_shot=True,
+    )
+
+    assert email == f"body for {prompt(PAGES[0])}"
+    assert subject == f"subject for {prompt(PAGES[0])}"
+    assert chat_model.prompts == [prompt(PAGES[0])]
+
+
+def test_the_three_stage_chain_takes_three_calls(chat_model):
+    email, subject = generate_personal_email(PAGES[0], use_cache=False)
+
+    assert email == f"Here is receiver profile: {PAGES[0]}"
+    assert chat_model.prompts == [
+        PAGES[0],
+        email,
+        f"Here is email you need to generate subject for: {email}",
+    ]
+
+
+def test_single_shot_outputs_are_cached(chat_model, db):
+    first = generate_personal_email_single_shot(PAGES[0])
+    # The cache is written in the background
+    db.flush()
+    second = generate_personal_email_single_shot(PAGES[0])
+
+    assert second == first
+    assert first.summary == f"summary for {prompt(PAGES[0])}"
+    assert len(chat_model.prompts) == 1
+
+
+def test_single_shot_drafts_concurrently(chat_model):
+    results = generate_personal_emails(
+        PAGES, use_cache=False, single_shot=True,
+    )
+
+    assert results == [
+        (f"body for {prompt(page)}", f"subject for {prompt(page)}")
+        for page in PAGES
+    ]
+    assert len(chat_model.prompts) == len(PAGES)
@@ -0,0 +1,195 @@
+import logging
+import time
+from types import SimpleNamespace
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+
+from src.database.handlers import log_run_start
+from src.inmail import waits as waits_module
+from src.inmail.personalized_email import send_personal_email
+from src.inmail.waits import current_page
+from src.inmail.waits import document_ready
+from src.inmail.waits import page_replaced
+from src.inmail.waits import StepPolicy
+from src.inmail.waits import WaitPolicy
+from tests.conftest import FakeDriver
+
+STEPS = {
+    'ready': StepPolicy(timeout=1, jitter=(2, 4)),
+    'missing': StepPolicy(timeout=0),
+}
+LOAD_SECONDS = 0.3
+RENDER_SECONDS = 0.2
+
+
+@pytest.fixture
+def sleeps():
+    return []
+
+
+def test_until_returns_the_result_then_pauses(sleeps):
+    waits = WaitPolicy(STEPS, jitter_scale=0.5, sleep=sleeps.append)
+
+    assert waits.until(FakeDriver(), 'ready', lambda driver: 'ok') == 'ok'
+
+    # One pause within the step's jitter range, scaled by jitter_scale
+    assert len(sleeps) == 1
+    assert 1 <= sleeps[0] <= 2
+    # timed apart from the wait itself
+    assert sorted(waits.timings) == ['ready', 'ready jitter']
+
+
+def test_zero_jitter_scale_skips_the_pauses(sleeps):
+    waits = WaitPolicy(STEPS, jitter_scale=0, sleep=sleeps.append)
+
+    waits.until(FakeDriver(), 'ready', lambda driver: True)
+    waits.pause('ready')
+
+    assert sleeps == []
+    assert list(waits.timings) == ['ready']
+
+
+def test_unknown_steps_get_the_default_policy():
+    assert WaitPolicy().policy('unknown') == StepPolicy()
+
+
+def test_timeouts_raise_unless_the_step_is_optional(sleeps, caplog):
+    waits = WaitPolicy(STEPS, sleep=sleeps.append)
+    driver = FakeDriver()
+
+    with pytest.raises(TimeoutException):
+        waits.until(driver, 'missing', lambda driver: False)
+    with caplog.at_level(logging.WARNING, logger=waits_module.__name__):
+        result = waits.until(
+            driver, 'missing', lambda driver: False, required=False,
+        )
+
+    assert result is None
+    assert "Timed out waiting for step 'missing'." in caplog.text
+    # Both attempts were timed
+    assert len(waits.timings['missing']) == 2
+
+
+def test_summary_ranks_steps_by_total_time(monkeypatch):
+    clock = iter([0, 1, 1, 5, 5, 7])
+    monkeypatch.setattr(
+        waits_module, 'time', SimpleNamespace(perf_counter=clock.__next__),
+    )
+    waits = WaitPolicy()
+
+    with waits.timed('composer'):
+        pass
+    with waits.timed('typing'):
+        pass
+    # A step that fails is timed all the same
+    with pytest.raises(TimeoutException), waits.timed('composer'):
+        raise TimeoutException()
+
+    assert waits.summary() == {
+        'typing': {'count': 1, 'mean': 4, 'max': 4, 'total': 4},
+        'composer': {'count': 2, 'mean': 1.5, 'max': 2, 'total': 3},
+    }
+
+
+@pytest.fixture
+def reloading_page(recruiter):
+    """A FakeDriver on a profile whose reloads take LOAD_SECONDS."""
+    recruiter.load_seconds = LOAD_SECONDS
+    driver = FakeDriver(site=recruiter)
+    driver.get('https://www.linkedin.com/in/lead-1')
+    return driver
+
+
+def test_ready_state_alone_still_reads_the_old_page(reloading_page):
+    old_page = current_page(reloading_page)
+    reloading_page.execute_script('location.reload(true);')
+
+    # The old document still reads 'complete' until the reload replaces it
+    assert document_ready(reloading_page)
+    assert not page_replaced(old_page)(reloading_page)
+
+
+def test_page_replaced_waits_for_the_new_page_to_load(reloading_page):
+    old_page = current_page(reloading_page)
+    started = time.perf_counter()
+    reloading_page.execute_script('location.reload(true);')
+
+    WaitPolicy(jitter_scale=0).until(
+        reloading_page, 'profile_reload', page_replaced(old_page),
+    )
+
+    # The page was replaced after LOAD_SECONDS and loaded as long after
+    assert time.perf_counter() - started >= 2 * LOAD_SECONDS
+    assert document_ready(reloading_page)
+    with pytest.raises(StaleElementReferenceException):
+        old_page.tag_name
+
+
+def send(site, slug, waits):
+    driver = FakeDriver(site=site)
+    status = send_personal_email(
+        driver=driver,
+        run_id=log_run_start('leads.csv'),
+        linkedin_profile=f"https://www.linkedin.com/in/{slug}",
+        profile_id=site.profile_id(slug),
+        profile_email_address=f"{slug}@example.com",
+        email='Hi, we are hiring.',
+        subject='A role',
+        control_email_sending=False,
+        waits=waits,
+    )
+    return status, driver
+
+
+@pytest.mark.parametrize(
+    ('emails_on_file', 'inmail_only', 'steps'),
+    [
+        (['lead-1'], [], []),
+        ([], [], ['add_email_button', 'add_email', 'save_email']),
+        (['lead-1'], ['lead-1'], ['settings_button', 'channel_settings']),
+    ],
+)
+def test_composer_flows(recruiter, emails_on_file, inmail_only, steps):
+    recruiter.emails_on_file.update(emails_on_file)
+    recruiter.inmail_only.update(inmail_only)
+    waits = WaitPolicy(jitter_scale=0)
+
+    status, driver = send(recruiter, 'lead-1', waits)
+
+    assert status == ('Sent', None)
+    message, = recruiter.sent
+    assert (message.subject, message.body) == ('A role', 'Hi, we are hiring.')
+    assert recruiter.saved_emails == (
+        {} if emails_on_file else {'id-lead-1': 'lead-1@example.com'}
+    )
+    # Only the steps of this flow were waited for
+    optional = {
+        'add_email_button', 'add_email', 'save_email',
+        'settings_button', 'channel_settings',
+    }
+    assert set(waits.timings) & optional == set(steps)
+    if inmail_only:
+        # The channel was switched and the modal closed again
+        assert not driver.find_element(By.ID, 'channel-modal').is_displayed()
+
+
+def test_composer_waits_for_late_buttons(recruiter):
+    recruiter.render_seconds = RENDER_SECONDS
+    recruiter.inmail_only.add('lead-1')
+    driver = FakeDriver(site=recruiter)
+    driver.get('https://www.linkedin.com/talent/profile/id-lead-1')
+    # A plain lookup right after the page loads misses the button
+    with pytest.raises(NoSuchElementException):
+        driver.find_element(By.CLASS_NAME, 'contact-info__add')
+    waits = WaitPolicy(jitter_scale=0)
+
+    status, _ = send(recruiter, 'lead-1', waits)
+
+    assert status == ('Sent', None)
+    assert recruiter.sent_slugs() == ['lead-1']
+    for step in ['add_email_button', 'settings_button']:
+        assert waits.timings[step][0] >= RENDER_SECONDS